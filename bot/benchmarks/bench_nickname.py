@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the alliance tag nickname parser against the nested
+try/except chain WarCog.on_message used before utils/nickname.py.
+Run from the bot directory: python benchmarks/bench_nickname.py
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.nickname import parseMember, parseNickname
+
+
+class Member:
+    def __init__(self, nick, name):
+        self.nick = nick
+        self.name = name
+
+
+# The display names seen in warpoints channels, most of them tagged
+MEMBERS = [
+    Member('[TEST] Kirk', 'kirk#1'),
+    Member('[TEST]Spock', 'spock#2'),
+    Member(None, '[ABC] McCoy'),
+    Member('(XYZ) Scotty', 'scotty#3'),
+    Member(None, '(XYZ)Uhura'),
+    Member('<KOS> Sulu', 'sulu#4'),
+    Member(None, '<KOS>Chekov'),
+    Member(None, 'Picard'),
+]
+
+
+def legacyParse(member):
+    """The parser WarCog.on_message used, kept verbatim for comparison."""
+    allianceId = ''
+    name = ''
+    test = ''
+    try: #[] RULE
+        test = allianceId = member.nick.split(']')[1]
+        allianceId = member.nick.split(']')[0][1::]
+        name = member.nick.split(' ')[1]
+    except:
+        try:
+            test = allianceId = member.name.split(']')[1]
+            allianceId = member.name.split(']')[0][1::]
+            name = member.name.split(' ')[1]
+        except:
+            try:
+                test = allianceId = member.nick.split(']')[1]
+                allianceId = member.nick.split(']')[0][1::]
+                name = member.nick.split(']')[1]
+            except:
+                try:
+                    test = allianceId = member.name.split(']')[1]
+                    allianceId = member.name.split(']')[0][1::]
+                    name = member.name.split(']')[1]
+                except:
+                    try: #() RULE
+                        test = allianceId = member.nick.split(')')[1]
+                        allianceId = member.nick.split(')')[0][1::]
+                        name = member.nick.split(' ')[1]
+                    except:
+                        try:
+                            test = allianceId = member.name.split(')')[1]
+                            allianceId = member.name.split(')')[0][1::]
+                            name = member.name.split(' ')[1]
+                        except:
+                            try:
+                                test = allianceId = member.name.split(')')[1]
+                                allianceId = member.name.split(')')[0][1::]
+                                name = member.name.split(')')[1]
+                            except:
+                                try: #< RULE
+                                    test = allianceId = member.nick.split('>')[1]
+                                    allianceId = member.nick.split('>')[0][1::]
+                                    name = member.nick.split(' ')[1]
+                                except:
+                                    try:
+                                        test = allianceId = member.name.split('>')[1]
+                                        allianceId = member.name.split('>')[0][1::]
+                                        name = member.name.split(' ')[1]
+                                    except:
+                                        try:
+                                            test = allianceId = member.name.split('>')[1]
+                                            allianceId = member.name.split('>')[0][1::]
+                                            name = member.name.split('>')[1]
+                                        except:
+                                            allianceId = '???'
+                                            name = member.name
+    return allianceId, name
+
+
+def run(label, parse, number):
+    seconds = timeit.timeit(lambda: [parse(m) for m in MEMBERS], number=number)
+    perCall = seconds / (number * len(MEMBERS)) * 1e6
+    print(f"{label:<28} {perCall:8.3f} µs per member")
+    return perCall
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    print("🏁 Nickname parser benchmark")
+    print("=" * 40)
+    for member in MEMBERS:
+        print(f"{str(member.nick):<14} {member.name:<14} legacy={legacyParse(member)} new={parseMember(member)}")
+    print()
+
+    legacy = run('legacy try/except chain', legacyParse, number)
+    cached = run('regex parser (cached)', parseMember, number)
+
+    def uncached(member):
+        parseNickname.cache_clear()
+        return parseMember(member)
+    cold = run('regex parser (cold cache)', uncached, number)
+
+    print()
+    print(f"speedup: {legacy / cached:.1f}x cached, {legacy / cold:.1f}x cold")
+
+
+if __name__ == '__main__':
+    main()
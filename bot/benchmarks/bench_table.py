@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the utils/table.py formatters against the character by character
+padding loops they replaced, on lists of 10,000 rows.
+Run from the bot directory: python benchmarks/bench_table.py [rows]
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.functions import (
+    getFormattedMemberKillCounts,
+    getFormattedPlayersList,
+    getFormattedROEViolations,
+    getFormattedResourceResults,
+)
+from utils.table import chunkLines, EMBED_DESCRIPTION_LIMIT
+
+
+def legacyMemberKillCounts(playerKills):
+    """The formatters as they were, kept verbatim for comparison."""
+    resultStr = ''
+    for player in playerKills:
+        i = len(player[0])
+        resultStr += '`{}'.format(player[0])
+        while i < 5:
+            i += 1
+            resultStr += '.'
+        resultStr += '` '
+
+        i = len(player[1])
+        resultStr += '`{}'.format(player[1])
+        while i < 18:
+            i += 1
+            resultStr += '.'
+        resultStr += '` '
+        resultStr += '`{}`\n'.format(player[2])
+
+    return resultStr
+
+
+def legacyPlayersList(players):
+    resultStr = ''
+    for player in players:
+        i = len(player[2]) if player[2] else 4
+        resultStr += '`{}'.format(player[2] if player[2] else '????')
+        while i < 5:
+            i += 1
+            resultStr += '.'
+        resultStr += '` '
+
+        i = len(player[3])
+        resultStr += '`{}'.format(player[3])
+        while i < 18:
+            i += 1
+            resultStr += '.'
+        resultStr += '` '
+
+        strpDate = player[6].split('/')
+        strpDate = '{}/{}/{}'.format(strpDate[0], strpDate[1], strpDate[2][2:])
+        resultStr += '**{}**\n'.format(strpDate if strpDate else 'Unknown')
+    return resultStr
+
+
+def legacyROEViolations(resp):
+    roeList = ''
+    for r in resp:
+        roeList += '`[{}]'.format(r[0].upper() if r[0].lower() != 'n/a' else '????')
+        i = len(r[0]) if r[0].lower() and r[0].lower() != 'n/a' else 4
+        while i < 5:
+            roeList += '.'
+            i += 1
+        roeList += '` '
+        roeList += '`{}'.format(r[2] if r[2] != None else '.')
+        i = len(r[2]) if r[2] != None else 1
+        while i < 15:
+            roeList += '.'
+            i += 1
+        roeList += '`'
+        roeList += ' `{} count`\n'.format(r[1])
+    return roeList
+
+
+def legacyResourceResults(vals):
+    # prepareResourceResults without a server's emojis
+    resource      = '`{}{}`'.format(vals[4], '.' * (10 - len(vals[4])))
+    tier          = '`{}*`'.format(vals[5]) if vals[5] else '`..`'
+    region        = '`{}`'.format(vals[3])
+    systemName = '`{}({})'.format(vals[1], vals[2])
+    i = len(vals[1])
+    while i < 14:
+        systemName += '.'
+        i += 1
+    systemName += '`'
+    return '{} {} {} {}{}\n'.format(str(resource), str(tier), systemName, region, '')
+
+
+def legacyResources(rows):
+    resourceList = ''
+    for result in rows:
+        resourceList += legacyResourceResults(result)
+    return resourceList
+
+
+def newResources(rows):
+    return getFormattedResourceResults([], rows)
+
+
+def makeRows(n):
+    tags = ['TEST', 'ABC', 'XYZW', 'N/A', 'KOS12']
+    names = ['Kirk', 'Spock', 'McCoy', 'Montgomery Scott', 'Uhura', 'Christopher Pike']
+    kills = [(tags[i % 5], '{}{}'.format(names[i % 6], i), i * 7 % 500) for i in range(n)]
+    players = [(i, 1, tags[i % 5] if i % 7 else None, '{}{}'.format(names[i % 6], i), None, None, '{:02}/{:02}/2024'.format(i % 12 + 1, i % 28 + 1)) for i in range(n)]
+    roe = [(tags[i % 5], i % 9 + 1, '{}{}'.format(names[i % 6], i) if i % 11 else None) for i in range(n)]
+    resources = [(i, 'Sys{}'.format(i), 'Federation', 'federation', ['ore', 'gas', 'crystal', 'dilithium'][i % 4], i % 3 + 2 if i % 5 else None) for i in range(n)]
+    return kills, players, roe, resources
+
+
+def run(label, legacy, new, rows, number):
+    assert legacy(rows) == new(rows), label
+    old = timeit.timeit(lambda: legacy(rows), number=number) / number
+    now = timeit.timeit(lambda: new(rows), number=number) / number
+    print(f"{label:<22} {old * 1e3:9.2f} ms {now * 1e3:9.2f} ms {old / now:7.1f}x")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    number = 5
+    kills, players, roe, resources = makeRows(n)
+
+    print(f"🏁 Table formatter benchmark, {n} rows")
+    print("=" * 58)
+    print(f"{'':<22} {'legacy':>12} {'table':>12} {'speedup':>8}")
+    run('member kill counts', legacyMemberKillCounts, getFormattedMemberKillCounts, kills, number)
+    run('intel players', legacyPlayersList, getFormattedPlayersList, players, number)
+    run('ROE violations', legacyROEViolations, getFormattedROEViolations, roe, number)
+    run('resources', legacyResources, newResources, resources, number)
+
+    chunks = chunkLines(getFormattedMemberKillCounts(kills).splitlines(), EMBED_DESCRIPTION_LIMIT)
+    print()
+    print(f"{n} kill count rows fit in {len(chunks)} embed descriptions of at most {max(map(len, chunks))} characters")
+
+
+if __name__ == '__main__':
+    main()
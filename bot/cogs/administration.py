@@ -3,6 +3,11 @@ from discord.ext import commands
 import sys, asyncio, os
 from utils.functions import databaseReset, getSettings, getSetupSummary, isInAlliance
 from utils.data_database import deleteServerSettings
+from utils.db import getPoolStats, getStatementCacheStats, getQueryProfile
+from utils.async_db import db
+from utils.guild_settings import getGuildSettingsStats
+from utils.intel_snapshot import getIntelCacheStats
+from utils.resource_pages import getResourcePageStats
 
 # Get config file path
 config_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config')
@@ -36,10 +41,78 @@ class AdministrationCog(commands.Cog):
         if (ctx.message.author.id != int(config['OWNER']['id'])):
             return
 
-        databaseReset()
+        await db.run(databaseReset)
         await ctx.send('{}, database reset'.format(ctx.message.author.mention))
 
 
+    # Can be used by bot owner only.
+    # Command reports database executor load and connection pool reuse
+    @commands.command()
+    async def dbstats(self, ctx):
+        if (ctx.message.author.id != int(config['OWNER']['id'])):
+            return
+
+        executor = db.stats()
+        pool = getPoolStats()
+        statements = getStatementCacheStats()
+        settings = getGuildSettingsStats()
+        intel = getIntelCacheStats()
+        pages = getResourcePageStats()
+        stats  = '**Executor**\n'
+        stats += '× Workers: {}\n× Queued: {} (peak {})\n× Running: {}\n× Completed: {}\n\n'.format(
+            executor['workers'], executor['queued'], executor['peakQueued'], executor['running'], executor['completed']
+        )
+        stats += '**Connection Pool**\n'
+        stats += '× Opened: {}\n× Reused: {} ({:.0%})\n× Idle: {}\n'.format(
+            pool['opened'], pool['reused'], pool['reuseRatio'], pool['idle']
+        )
+        stats += '\n**Statement Cache**\n'
+        stats += '× Hits: {} ({:.0%})\n× Misses: {}\n'.format(statements['hits'], statements['hitRatio'], statements['misses'])
+        stats += '\n**Guild Settings Cache**\n'
+        stats += '× Guilds: {}\n× Hits: {} ({:.0%})\n× Misses: {}\n× Evictions: {}\n'.format(
+            settings['size'], settings['hits'], settings['hitRatio'], settings['misses'], settings['evictions']
+        )
+        stats += '\n**Intel Cache**\n'
+        stats += '× Guilds: {}\n× Hits: {} ({:.0%})\n× Misses: {}\n× Evictions: {}\n'.format(
+            intel['size'], intel['hits'], intel['hitRatio'], intel['misses'], intel['evictions']
+        )
+        stats += '\n**Resource Page Cache**\n'
+        stats += '× Pages: {}\n× Hits: {} ({:.0%})\n× Misses: {}\n× Evictions: {}\n× Invalidations: {}\n'.format(
+            pages['pages'], pages['hits'], pages['hitRatio'], pages['misses'], pages['evictions'], pages['invalidations']
+        )
+        embed = discord.Embed(title='**Database Stats**', description=stats, color=1234123)
+        await ctx.message.author.send(embed=embed)
+
+
+    # Can be used by bot owner only.
+    # Command lists the statements that spent the most time in the database
+
+    # PARAMAS
+    #  - limit: How many statements to list
+    @commands.command()
+    async def dbprofile(self, ctx, limit: int = 10):
+        if (ctx.message.author.id != int(config['OWNER']['id'])):
+            return
+
+        profile = getQueryProfile(min(max(limit, 1), 20))
+        if not profile:
+            await ctx.message.author.send('No database statements have been profiled yet.')
+            return
+
+        report = ''
+        for idx, entry in enumerate(profile, 1):
+            sql = entry['sql'] if len(entry['sql']) <= 90 else entry['sql'][:87] + '...'
+            report += '**{}. {}**\n'.format(idx, entry['name'] if entry['name'] != entry['sql'] else 'sql')
+            report += '`{}`\n'.format(sql)
+            report += '× Calls: {} | Total: {:.1f} ms | Slow: {}\n'.format(entry['count'], entry['totalMs'], entry['slow'])
+            report += '× p50: {:.2f} ms | p95: {:.2f} ms | p99: {:.2f} ms\n'.format(entry['p50Ms'], entry['p95Ms'], entry['p99Ms'])
+            if entry['fullScans']:
+                report += '× Full scan: {}\n'.format(', '.join(entry['fullScans']))
+            report += '\n'
+        embed = discord.Embed(title='**Database Profile**', description=report[:4096], color=1234123)
+        await ctx.message.author.send(embed=embed)
+
+
     # Gets the alliance settings associated with this server. The results are made 
     # into an embed, and set privately to the author. Command can only be used by
     # a user with admin perms on the given server
@@ -71,7 +144,7 @@ class AdministrationCog(commands.Cog):
             try:
                 ans = await self.bot.wait_for('message', timeout=240.0, check=checkUser)
                 if ans.content.lower() == 'confirm':
-                    deleteServerSettings(ctx.guild.id)
+                    await db.run(deleteServerSettings, ctx.guild.id)
                     await ctx.send('**{}, your settings have been erased**').format(ctx.message.author.mention)
                     return
 
@@ -89,17 +162,17 @@ class AdministrationCog(commands.Cog):
             await ctx.send(err)
             return
 
-        if not isInAlliance(ctx.guild.id, allianceId):
+        if not await db.run(isInAlliance, ctx.guild.id, allianceId):
             err =  '{}, that allianceId is not registered for your server'.format(ctx.message.author.mention)
             await ctx.send(err)
             return
 
         title = 'DATA Bot Settings'
         footerText = '*DATA Bot Setup: url-to-code, bot-help-server*'
-        settings = getSettings(ctx.guild.id, ctx.guild.roles, ctx.guild.categories) 
+        settings = await db.run(getSettings, ctx.guild.id, ctx.guild.roles, ctx.guild.categories) 
         summary = '[DECRYPTING] sensitive data... ...\n\n'
         
-        summary += getSetupSummary(
+        summary += await db.run(getSetupSummary,
             '{} Settings'.format(ctx.guild.name),
             ctx.guild.id,
             ctx.guild.name,
@@ -2,6 +2,7 @@ import discord
 from discord.ext import commands
 import sys, asyncio
 from utils.functions import getAllianceIdFromNick, hasAdminPermission, isAllianceMember
+from utils.async_db import db
 from utils.constants import GITHUB
 
 
@@ -48,8 +49,8 @@ class HelpCog(commands.Cog):
             isMember = False
             if type and type.lower() != 'resources':
                 allianceId = getAllianceIdFromNick(ctx.message.author.nick)
-                isAdmin = hasAdminPermission(ctx.guild.id, allianceId, ctx.message.author.roles)
-                isMember = isAllianceMember(ctx.guild.id, ctx.message.author.roles)
+                isAdmin = await db.run(hasAdminPermission, ctx.guild.id, allianceId, ctx.message.author.roles)
+                isMember = await db.run(isAllianceMember, ctx.guild.id, ctx.message.author.roles)
 
                 if ctx.message.author.guild_permissions.administrator:
                     isAdmin = True
@@ -110,14 +111,22 @@ class HelpCog(commands.Cog):
             adminCommands += '```×  number: Number of messages to delete in current channel```'
             adminCommands += '**Examples:**\n`.clear 5`\n\n'
 
-            resourceCommands = '__**Resources Command**: [resource] [grade] [region]__\n'
+            resourceCommands = '__**Resources Command**: [resource...] [grade...] [region...] [level]__\n'
             resourceCommands += '*returns an interactive list of resources. Works better if you have the '
-            resourceCommands += 'STFC custom emojis. When running the command, select the **"?"** emoji '
+            resourceCommands += 'STFC custom emojis. When running the command, select the **"?"** button '
             resourceCommands += 'for more information on how to use it.*\n'
             resourceCommands += '```×  resource: A valid STFC resource: "gas", "ore", "crystal", or "dilithium"\n'
             resourceCommands += '×  grade: A valid STFC resource grade: "2", "3", or "4"\n'
-            resourceCommands += '×  region: A valid STFC region: "neutral", "federation", "romulan", or "klingon"```'
-            resourceCommands += '**Examples:**\n`.resources` or `.resources klingon 3` or `.resources gas 2 neutral`\n\n'
+            resourceCommands += '×  region: A valid STFC region: "neutral", "federation", "romulan", or "klingon"\n'
+            resourceCommands += '×  level: The system level, such as "level>=20", "lvl<30" or "level=20-30"\n'
+            resourceCommands += '×  several values of a kind are alternatives ("gas ore"), a grade can be a range ("3+", "2-3", '
+            resourceCommands += '"grade>=3"), and a leading "-" leaves a value out ("-neutral")```'
+            resourceCommands += '**Examples:**\n`.resources` or `.resources klingon 3` or `.resources gas ore 3+ -neutral level>=20`\n\n'
+
+            resourceCommands += '__**Resources Emojis Command**: get emojis | install emojis__\n'
+            resourceCommands += '*"get emojis" sends the STFC emoji files. "install emojis" adds the STFC emojis '
+            resourceCommands += 'this server is missing. Needs the Manage Emojis permission.*\n'
+            resourceCommands += '**Examples:**\n`.resources get emojis` or `.resources install emojis`\n\n'
 
             resourceCommands += '__**Add Resource Command**__\n'
             resourceCommands += '*Sends the user a private message, where through interacting with me, '
@@ -4,44 +4,29 @@ import sys, asyncio
 from utils.functions import (
     hasAdminPermission,
     getAllianceIds,
-    getRoeRules,
-    getAlliesInfo,
-    getNapInfo,
-    getHomeInfo,
     getAllianceName,
-    getAllies,
-    getPlayerKos,
-    getAllianceKos,
-    getGalacticKos,
-    getNaps,
-    getWar,
-    getCOG,
-    getWarInfo,
-    getKosInfo,
-    getCogInfo,
-    hasIntel,
-    hasGeneralInfo,
-    getROEViolations,
+    getROEViolationPages,
     getFormattedROEViolations,
     isAllianceMember,
     getFieldIntel,
     getPlayerIntel,
-    getIntelPlayers,
+    getIntelPlayerPages,
     getFormattedPlayersList,
     getMasterAllianceId,
     isAllyWithIntelPermission
 )
 from utils.db import saveIntellegence, saveROE, removeROE, savePlayerIntelligence,removePlayerIntelligence
+from utils.async_db import db
+from utils.intel_snapshot import getIntelSnapshot, STANDINGS, GENERAL
 from utils.constants import GITHUB
-import math as m
+from utils.paginator import Paginator, KeysetPageSource
+from utils.table import addFieldChunks
 
 
 class IntelCog(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
-        self.next = '\N{BLACK RIGHTWARDS ARROW}'
-        self.prev = '\N{LEFTWARDS BLACK ARROW}'
     
     # INTEL CLASS COMMAND #
     # the intel class command allows the user to add and view intel on the alliance
@@ -62,7 +47,7 @@ class IntelCog(commands.Cog):
             return
         
         # ERROR CHECKING
-        aIds = getAllianceIds(ctx.guild.id)
+        aIds = await db.run(getAllianceIds, ctx.guild.id)
         if not len(aIds):
             msg = '{}, your server has not been set up with me. To use this command, a '.format(ctx.message.author.mention)
             msg += 'server administrator must perform the **.setup <AllianceID>** command first.'
@@ -70,7 +55,7 @@ class IntelCog(commands.Cog):
             return
 
         # ERROR CHECK -> Unless only one argument given, and it be ROE, must be a member to use this command
-        if not isAllianceMember(ctx.guild.id, ctx.message.author.roles) and not isAllyWithIntelPermission(ctx.guild.id, ctx.message.author.roles) and (len(args) != 1 or args[0].lower() != 'roe'):
+        if not await db.run(isAllianceMember, ctx.guild.id, ctx.message.author.roles) and not await db.run(isAllyWithIntelPermission, ctx.guild.id, ctx.message.author.roles) and (len(args) != 1 or args[0].lower() != 'roe'):
     
             msg = '{}, For all intel commands other than **.intel ROE**, '.format(ctx.message.author.mention)
             msg += 'you must be a member to use on this server. '
@@ -80,21 +65,23 @@ class IntelCog(commands.Cog):
 
         #variables
         serverId   = ctx.guild.id
-        allianceId = getMasterAllianceId(serverId)
+        allianceId = await db.run(getMasterAllianceId, serverId)
         roles      = ctx.message.author.roles
-        isAdmin    = hasAdminPermission(serverId, roles)
+        isAdmin    = await db.run(hasAdminPermission, serverId, roles)
         if ctx.message.author.guild_permissions.administrator:
             isAdmin = True
-        title      = getAllianceName(serverId)
-        descDict = {
-            "roe": getRoeRules(serverId),
-            "ally": getAlliesInfo(serverId),
-            "nap": getNapInfo(serverId),
-            "home": getHomeInfo(serverId),
-            "kos": getKosInfo(serverId),
-            "war": getWarInfo(serverId),
-            "cog": getCogInfo(serverId)
-        }
+        title      = await db.run(getAllianceName, serverId)
+
+        # only read the intel the requested view renders. Overviews need both the
+        # alliance lists and the general info, ROE rules and home only the latter,
+        # and the remaining sub commands neither
+        parts = ()
+        if not args or (len(args) == 1 and args[0].lower() not in ('roe', 'home')):
+            parts = (STANDINGS, GENERAL)
+        elif len(args) == 1:
+            parts = (GENERAL,)
+        intel = await db.run(getIntelSnapshot, serverId, *parts)
+        descDict = intel.descriptions() if GENERAL in parts else {}
         allianceStandingDict = {
             "ally": 0,
             "nap": 0,
@@ -104,15 +91,7 @@ class IntelCog(commands.Cog):
             "war": 0,
             "cog": 0
         }
-        infoDict = {
-            "aoa": getAllies(serverId),
-            "nap": getNaps(serverId),
-            "playerKos": getPlayerKos(serverId),
-            "allianceKos": getAllianceKos(serverId),
-            "galacticKos": getGalacticKos(serverId),
-            "war": getWar(serverId),
-            "cog": getCOG(serverId)
-        }
+        infoDict = intel.intelLists() if STANDINGS in parts else {}
         intro = '[OPENING] Secure connection...\n'
         intro += '*Transmitting sensitive data.. ...*\n\n'
         footerText = 'SECURE CONNECTION: true'
@@ -121,19 +100,19 @@ class IntelCog(commands.Cog):
 
         # General intel command. SHow them everything we have on the alliance
         if not args:
-            if not hasIntel(serverId) and not hasGeneralInfo(serverId):
+            if not intel.hasIntel and not intel.hasGeneralInfo:
                 info = '{}\n**No Current Intel.....**\n{}'.format(spacer, spacer)
             else:
                 embed = discord.Embed(title='Confidential Intel for {}\n'.format(allianceId), description='{}'.format(intro), color=000000)
                 embed.set_author(name=title, icon_url=ctx.guild.icon_url)
                 embed.add_field(name='**{} Home System**'.format(allianceId), value=descDict["home"]+'\n**{}**'.format(spacer) if descDict["home"] else '*No home system*\n', inline=False)
-                embed.add_field(name='**Allies**', value=getFieldIntel(infoDict["aoa"], 10) if infoDict["aoa"] else '*No Allied Alliances*', inline=False)
-                embed.add_field(name='**NAPs**', value=getFieldIntel(infoDict["nap"], 10) if infoDict["nap"] else '*No NAPs*', inline=False)
-                embed.add_field(name='**COG NAPs**', value=getFieldIntel(infoDict["cog"], 10) if infoDict["cog"] else '*No COG NAPs*', inline=False)
-                embed.add_field(name='**Player KOS List**', value=getFieldIntel(infoDict["playerKos"], 100) if infoDict["playerKos"] else '*No KOS Players*', inline=False)
-                embed.add_field(name='**Alliance KOS List**', value=getFieldIntel(infoDict["allianceKos"], 100) if infoDict["allianceKos"] else '*No KOS Alliances*', inline=False)
-                embed.add_field(name='**Galactic KOS List**', value=getFieldIntel(infoDict["galacticKos"], 100) if infoDict["galacticKos"] else '*No Galactic KOS*', inline=False)
-                embed.add_field(name='**Decl. of War**', value=getFieldIntel(infoDict["war"], 10) if infoDict["war"] else '*No Ongoing Wars*', inline=False)
+                addFieldChunks(embed, '**Allies**', getFieldIntel(infoDict["aoa"], 10) if infoDict["aoa"] else '*No Allied Alliances*')
+                addFieldChunks(embed, '**NAPs**', getFieldIntel(infoDict["nap"], 10) if infoDict["nap"] else '*No NAPs*')
+                addFieldChunks(embed, '**COG NAPs**', getFieldIntel(infoDict["cog"], 10) if infoDict["cog"] else '*No COG NAPs*')
+                addFieldChunks(embed, '**Player KOS List**', getFieldIntel(infoDict["playerKos"], 100) if infoDict["playerKos"] else '*No KOS Players*')
+                addFieldChunks(embed, '**Alliance KOS List**', getFieldIntel(infoDict["allianceKos"], 100) if infoDict["allianceKos"] else '*No KOS Alliances*')
+                addFieldChunks(embed, '**Galactic KOS List**', getFieldIntel(infoDict["galacticKos"], 100) if infoDict["galacticKos"] else '*No Galactic KOS*')
+                addFieldChunks(embed, '**Decl. of War**', getFieldIntel(infoDict["war"], 10) if infoDict["war"] else '*No Ongoing Wars*')
                 embed.add_field(name=spacer, value='.', inline=False)
                 embed.set_footer(text=footerText)
                 await ctx.send(embed=embed)
@@ -162,9 +141,9 @@ class IntelCog(commands.Cog):
             elif args[0].lower() == 'kos':
                 embed = discord.Embed(title='Confidential Intel for {}\n'.format(allianceId), description=descDict["kos"], color=000000)
                 embed.set_author(name=title, icon_url=ctx.guild.icon_url)
-                embed.add_field(name='**Player KOS List**', value=getFieldIntel(infoDict["playerKos"], 100) if infoDict["playerKos"] else '*No KOS Players*', inline=False)
-                embed.add_field(name='**Alliance KOS List**', value=getFieldIntel(infoDict["allianceKos"], 100) if infoDict["allianceKos"] else '*No KOS Alliances*', inline=False)
-                embed.add_field(name='**Galactic KOS List**', value=getFieldIntel(infoDict["galacticKos"], 100) if infoDict["galacticKos"] else '*No Galactic KOS*', inline=False)
+                addFieldChunks(embed, '**Player KOS List**', getFieldIntel(infoDict["playerKos"], 100) if infoDict["playerKos"] else '*No KOS Players*')
+                addFieldChunks(embed, '**Alliance KOS List**', getFieldIntel(infoDict["allianceKos"], 100) if infoDict["allianceKos"] else '*No KOS Alliances*')
+                addFieldChunks(embed, '**Galactic KOS List**', getFieldIntel(infoDict["galacticKos"], 100) if infoDict["galacticKos"] else '*No Galactic KOS*')
                 embed.add_field(name=spacer, value='.', inline=False)
                 embed.set_footer(text=footerText)
                 await ctx.send(embed=embed)
@@ -208,15 +187,7 @@ class IntelCog(commands.Cog):
                     await ctx.send(msg)
                     return
 
-            # function to check that reaction is from user who called this command
-            def checkUser(reaction, user):
-                return user == ctx.message.author
-            
-            # violations is paged, so we need some variables to help do that correctly
-            idx = 0
-            maxPage = 10
-            page = 1
-            numPages = 1
+            # violations are paged, only the page being shown is formatted
             intro = '[OPENING] Secure connection...\n*Transmitting* sensitive data.. ...\n\n'
 
             # check to see if a specific player or alliance was mentioned, to add to the query
@@ -224,58 +195,18 @@ class IntelCog(commands.Cog):
             if len(args) == 3:
                 query = args[2].upper()
 
-            # get this servers violations, and determine number of pages
-            results = getROEViolations(serverId, query)
-            numPages = m.ceil(len(results) / maxPage)
-            pageEnd = maxPage if len(results) >= maxPage else len(results)
-
-
-            roeList = getFormattedROEViolations(results[idx:pageEnd])
-            embed = discord.Embed(title='**ROE Violation Counts**', description=intro+spacer+roeList+spacer[1::], color=000000)
-            embed.set_author(name=title, icon_url=ctx.guild.icon_url)
-            embed.set_footer(text='SECURE CONNECTION: true | {}/{}'.format(page, numPages))
-            msg = await ctx.send(embed=embed)
-
-            try:
-                while True:
-                    roeList = getFormattedROEViolations(results[idx:pageEnd])
-                    embed = discord.Embed(title='**ROE Violation Counts**', description=intro+spacer+roeList+spacer[1::], color=000000)
-                    embed.set_author(name=title, icon_url=ctx.guild.icon_url)
-                    embed.set_footer(text='SECURE CONNECTION: true | {}/{}'.format(page, numPages))
-                    await msg.edit(embed=embed)
-
+            # get this servers violations, read one page at a time
+            pages = await db.run(getROEViolationPages, serverId, query)
 
-                    if page > 1:
-                        await msg.add_reaction(self.prev)
-                    if page * maxPage < len(results):
-                        await msg.add_reaction(self.next)
-
-                    reaction, user = await self.bot.wait_for('reaction_add', timeout=120.0, check=checkUser)
-
-                    # page the results forward, reset page number, page end, and the index
-                    if reaction.emoji == self.next:
-                        page += 1
-                        idx = pageEnd
-                        pageEnd = (page * maxPage) if len(results) >= (page * maxPage) else len(results)
-
-                    # page the results backwards, reset page number, page end, and the index
-                    if reaction.emoji == self.prev:
-                        page -= 1
-                        pageEnd = idx
-                        idx = pageEnd - maxPage
-
-                    # clear ALL reactions, reset state of interface.
-                    await msg.clear_reactions()
-                return
-
-            # UH OH TIMED OUT
-            except asyncio.TimeoutError:
+            def formatPage(entries, page, pageCount):
+                roeList = getFormattedROEViolations(entries) if entries else '**No ROE Violations**\n'
                 embed = discord.Embed(title='**ROE Violation Counts**', description=intro+spacer+roeList+spacer[1::], color=000000)
                 embed.set_author(name=title, icon_url=ctx.guild.icon_url)
-                embed.set_footer(text='CONNECTION CLOSED: Session timed out')
-                msg = await msg.edit(embed=embed)
-                await msg.clear_reactions()
-                return
+                embed.set_footer(text='SECURE CONNECTION: true | {}/{}'.format(page + 1, pageCount))
+                return embed
+
+            await Paginator(KeysetPageSource(pages, formatPage), ctx.message.author).start(ctx)
+            return
 
             
 
@@ -310,10 +241,10 @@ class IntelCog(commands.Cog):
                 violator = args[2].upper()
                 success = False
                 if len(args) == 4:
-                    success = removeROE(serverId, args[3].upper()) 
+                    success = await db.run(removeROE, serverId, args[3].upper()) 
                 if len(args) == 5:
                     violator = '[{}] {}'.format(args[3].upper(), args[4])
-                    success = removeROE(serverId, args[3].upper(), args[4])   
+                    success = await db.run(removeROE, serverId, args[3].upper(), args[4])   
 
                 if not success:
                     msg = '{}, **Improper use of command!**\n'.format(ctx.message.author.mention)
@@ -346,10 +277,10 @@ class IntelCog(commands.Cog):
 
             violator = args[2].upper()
             if len(args) == 3:
-                saveROE(serverId, args[2].upper()) 
+                await db.run(saveROE, serverId, args[2].upper()) 
             if len(args) == 4:
                 violator = '[{}] {}'.format(args[2].upper(), args[3])
-                saveROE(serverId, args[2].upper(), args[3])   
+                await db.run(saveROE, serverId, args[2].upper(), args[3])   
             await ctx.send('{},I have saved the ROE violation by {}.'.format(ctx.message.author.mention, violator))  
             return  
 
@@ -409,7 +340,7 @@ class IntelCog(commands.Cog):
                         else:
                             allianceStandingDict["galacticKos"] = 1
                     print(allianceStandingDict)
-                    saveIntellegence(serverId, args[3], allianceStandingDict)
+                    await db.run(saveIntellegence, serverId, args[3], allianceStandingDict)
                     await ctx.send('{}, **{} entry {} {} Saved**.'.format(ctx.message.author.mention,args[0].upper(), args[2].upper(), args[3].upper()))  
                     return
 
@@ -425,9 +356,9 @@ class IntelCog(commands.Cog):
                             allianceStandingDict["allianceKos"] = 0
                         else:
                             allianceStandingDict["allianceKos"] = 1                       
-                    saveIntellegence(serverId, args[2], allianceStandingDict)
+                    await db.run(saveIntellegence, serverId, args[2], allianceStandingDict)
             else:
-                saveIntellegence(serverId, args[2], allianceStandingDict)
+                await db.run(saveIntellegence, serverId, args[2], allianceStandingDict)
 
             await ctx.send('{}, **{} entry {} Saved**.'.format(ctx.message.author.mention,args[0].upper(), args[2].upper()))  
             return
@@ -435,72 +366,24 @@ class IntelCog(commands.Cog):
 
         # shows a list of players for which intel exists
         elif (args[0].lower() == 'on') and len(args) == 2 and args[1].lower() == 'players':
-            # function to check that reaction is from user who called this command
-            def checkUser(reaction, user):
-                return user == ctx.message.author
-            
-            # players intel is paged, so we need some variables to help do that correctly
-            idx = 0
-            maxPage = 15
-            page = 1
-            numPages = 1
+            # players intel is paged, only the page being shown is formatted
             intro += 'Use command ***.intel on player <playername>***\nto get info on specific player, such as location\n\n'
             header = '`AID..` `Player............` `Date`'
             spacer = '\n------------------------------------------------\n'
 
-            results = getIntelPlayers(serverId)
-            numPages = m.ceil(len(results) / maxPage)
-            pageEnd = maxPage if len(results) >= maxPage else len(results)
-
-
-            playerList = getFormattedPlayersList(results[idx:pageEnd])
-            embed = discord.Embed(title='**Intel Player List**', description=intro+header+spacer+playerList+spacer[1::], color=000000)
-            embed.set_author(name=title, icon_url=ctx.guild.icon_url)
-            embed.set_footer(text='SECURE CONNECTION: true | {}/{}'.format(page, numPages))
-            msg = await ctx.send(embed=embed)
-
-            try:
-                while True:
-                    playerList = getFormattedPlayersList(results[idx:pageEnd])
-                    if not playerList:
-                        playerList = '**There is no player intel for this server at this time**\n'
-                    embed = discord.Embed(title='**Intel Player List**', description=intro+header+spacer+playerList+spacer[1::], color=000000)
-                    embed.set_author(name=title, icon_url=ctx.guild.icon_url)
-                    embed.set_footer(text='SECURE CONNECTION: true | {}/{}'.format(page, numPages))
-                    await msg.edit(embed=embed)
-
-
-                    if page > 1:
-                        await msg.add_reaction(self.prev)
-                    if page * maxPage < len(results):
-                        await msg.add_reaction(self.next)
+            pages = await db.run(getIntelPlayerPages, serverId)
 
-                    reaction, user = await self.bot.wait_for('reaction_add', timeout=120.0, check=checkUser)
-
-                    # page the results forward, reset page number, page end, and the index
-                    if reaction.emoji == self.next:
-                        page += 1
-                        idx = pageEnd
-                        pageEnd = (page * maxPage) if len(results) >= (page * maxPage) else len(results)
-
-                    # page the results backwards, reset page number, page end, and the index
-                    if reaction.emoji == self.prev:
-                        page -= 1
-                        pageEnd = idx
-                        idx = pageEnd - maxPage
-
-                    # clear ALL reactions, reset state of interface.
-                    await msg.clear_reactions()
-                return
-
-            # UH OH TIMED OUT
-            except asyncio.TimeoutError:
+            def formatPage(entries, page, pageCount):
+                playerList = getFormattedPlayersList(entries)
+                if not playerList:
+                    playerList = '**There is no player intel for this server at this time**\n'
                 embed = discord.Embed(title='**Intel Player List**', description=intro+header+spacer+playerList+spacer[1::], color=000000)
                 embed.set_author(name=title, icon_url=ctx.guild.icon_url)
-                embed.set_footer(text='CONNECTION CLOSED: Session timed out')
-                await msg.edit(embed=embed)
-                await msg.clear_reactions()
-                return
+                embed.set_footer(text='SECURE CONNECTION: true | {}/{}'.format(page + 1, pageCount))
+                return embed
+
+            await Paginator(KeysetPageSource(pages, formatPage), ctx.message.author).start(ctx)
+            return
 
 
         # logic for adding intel to a player. INTEL ON sequence can result in,
@@ -510,7 +393,7 @@ class IntelCog(commands.Cog):
             # intel on specific player
             if args[1].lower() == 'player':
 
-                playerDetails = getPlayerIntel(serverId, allianceId, args[2])
+                playerDetails = await db.run(getPlayerIntel, serverId, allianceId, args[2])
 
                 if not playerDetails and len(args) == 3:
                     intro = ''
@@ -518,7 +401,7 @@ class IntelCog(commands.Cog):
 
                 # delete player intel
                 elif len(args) == 4 and args[3].lower() == 'delete':
-                    success = removePlayerIntelligence(serverId, args[2])
+                    success = await db.run(removePlayerIntelligence, serverId, args[2])
                     if success:
                         await ctx.send('{}, player intel on {} removed.'.format(ctx.message.author.mention, args[2]))
                         return  
@@ -527,23 +410,23 @@ class IntelCog(commands.Cog):
                 elif len(args) == 6 and args[3].lower() == 'add':
 
                     if args[4].lower() == 'location':
-                        savePlayerIntelligence(serverId, allianceId, args[2], location=args[5])
+                        await db.run(savePlayerIntelligence, serverId, allianceId, args[2], location=args[5])
                         await ctx.send('{}, Location intel on {} saved.'.format(ctx.message.author.mention, args[2]))
                         return
 
                     if args[4].lower() == 'coordinates':
 
-                        savePlayerIntelligence(serverId, allianceId, args[2], coords=args[5])
+                        await db.run(savePlayerIntelligence, serverId, allianceId, args[2], coords=args[5])
                         await ctx.send('{}, coordinates intel on {} saved.'.format(ctx.message.author.mention, args[2]))
                         return
 
                     elif args[4].lower() == 'alliance':
-                        savePlayerIntelligence(serverId, allianceId, args[2], playerAlliance=args[5])
+                        await db.run(savePlayerIntelligence, serverId, allianceId, args[2], playerAlliance=args[5])
                         await ctx.send('{}, alliance tag for {} saved.'.format(ctx.message.author.mention, args[2]))
                         return
 
                     elif args[4].lower() == 'note':
-                        savePlayerIntelligence(serverId, allianceId, args[2], newNote=args[5])
+                        await db.run(savePlayerIntelligence, serverId, allianceId, args[2], newNote=args[5])
                         await ctx.send('{}, Note on {} saved.'.format(ctx.message.author.mention, args[2]))
                         return
                     else:
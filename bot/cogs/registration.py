@@ -20,9 +20,10 @@ from utils.functions import (
     getAmbassadorCategory,
     getCategory,
     getChannel,
-    canAccessPrivateChannel,
+    getPrivateChannelRoles,
     getMasterAllianceId
 )
+from utils.async_db import db
 
 
 
@@ -59,7 +60,7 @@ class RegistrationCog(commands.Cog):
         if member == None:
             # if the current user has roles for admin register command, they cannot use
             # command without parameter
-            if hasAdminPermission(ctx.guild.id, ctx.message.author.roles):
+            if await db.run(hasAdminPermission, ctx.guild.id, ctx.message.author.roles):
                 err =  '{}, **No parameters wih command register.**\n'.format(ctx.message.author.mention)
                 err += 'The register command without parameters can only be used by new members. To register '
                 err += 'another user, please include the members name, whether they are a member, ally, or ambassador, '
@@ -69,7 +70,7 @@ class RegistrationCog(commands.Cog):
 
 
         # if server is not in db, command cannot be run
-        if not serverRegistered(ctx.guild.id):
+        if not await db.run(serverRegistered, ctx.guild.id):
             err =  '{}, **You have not registered your server with me yet.**\n'.format(ctx.message.author.mention)
             err += 'To use this command, a server admin must perform the bot setup. Use the command:'
             err += '```.setup <alliance abbreviation``` to setup your server with me.'
@@ -93,7 +94,7 @@ class RegistrationCog(commands.Cog):
         if member != None and type != None and newUserAlliance != None:
 
             # type is member, but provided alliance id is not on server settings as member allianc.
-            if type.lower() == 'member' and not isInAlliance(ctx.guild.id, newUserAlliance):
+            if type.lower() == 'member' and not await db.run(isInAlliance, ctx.guild.id, newUserAlliance):
                 err =  '{}, **Incorrect command:** *type and user alliance*.\n'.format(ctx.message.author.mention)
                 err += '{} is not registered as a member alliance for this server. If this alliance '.format(newUserAlliance.upper())
                 err += 'should be considered a member alliance, please set it up as so with the command'
@@ -102,7 +103,7 @@ class RegistrationCog(commands.Cog):
                 return
 
             # type is ambassador or ally, but provided alliance id is on server settings as member alliance.
-            if (type.lower() == 'ambassador' or type.lower() == 'ally') and isInAlliance(ctx.guild.id, newUserAlliance):
+            if (type.lower() == 'ambassador' or type.lower() == 'ally') and await db.run(isInAlliance, ctx.guild.id, newUserAlliance):
                 err =  '{}, **Incorrect command:** *type and user alliance*.\n'.format(ctx.message.author.mention)
                 err += '{} is registered as a member alliance for this server, and therefore '.format(newUserAlliance.upper())
                 err += 'cannot be used with the "ambassador" or "ally" argument.'
@@ -117,13 +118,13 @@ class RegistrationCog(commands.Cog):
         author             = ctx.message.author                 # the user: default to message sender
         newUser            = None
         allianceId         = getAllianceIdFromNick(author.nick)
-        allianceId         = allianceId if allianceId else getMasterAllianceId(ctx.guild.id)
-        allianceName       = getAllianceName(ctx.guild.id)
+        allianceId         = allianceId if allianceId else await db.run(getMasterAllianceId, ctx.guild.id)
+        allianceName       = await db.run(getAllianceName, ctx.guild.id)
         server             = ctx.guild                          # server the command was used on
-        memberRoles        = getMemberRoles(server.id)
-        ambassadorRoles    = getAmbassadorRoles(server.id)
-        allyRoles          = getAllyRoles(server.id)
-        ambassadorCategory = getAmbassadorCategory(server.id)
+        memberRoles        = await db.run(getMemberRoles, server.id)
+        ambassadorRoles    = await db.run(getAmbassadorRoles, server.id)
+        allyRoles          = await db.run(getAllyRoles, server.id)
+        ambassadorCategory = await db.run(getAmbassadorCategory, server.id)
         channel            = ''                                 # placeholder for new channel name
 
 
@@ -153,7 +154,7 @@ class RegistrationCog(commands.Cog):
 
         # CASE 1
         # Command is being used by an administrator. 
-        if ctx.message.author.guild_permissions.administrator or hasAdminPermission(server.id, userRoles):
+        if ctx.message.author.guild_permissions.administrator or await db.run(hasAdminPermission, server.id, userRoles):
 
             # if admin is user command for other user, a user must be provided
             if len(ctx.message.mentions) > 0:
@@ -200,7 +201,7 @@ class RegistrationCog(commands.Cog):
                 await ctx.send(err)
                 return
 
-            if not manualRegisterAllowed(server.id):
+            if not await db.run(manualRegisterAllowed, server.id):
                 err =  '{}, This server does not allow self registration. Please check with admin.'.format(ctx.message.author.mention)
                 await ctx.send(err)
                 return
@@ -221,7 +222,7 @@ class RegistrationCog(commands.Cog):
                     if ans.content.lower() == 'member':
 
                         # if more than one alliance is saved to database,  need to determine which this new member belongs to
-                        ids = getAllianceIds(server.id)
+                        ids = await db.run(getAllianceIds, server.id)
                         if len(ids) > 1:
                             msg = 'Welcome {} Member. Which member alliance are you a part of? Please choose from '.format(allianceName)
                             msg += 'the list below:\n'
@@ -235,8 +236,8 @@ class RegistrationCog(commands.Cog):
                                 id = id.content
 
                                 # set the roles, set the nickname, and finish
-                                if isInAlliance(server.id, id.upper()):
-                                    memberRoles = getMemberRoles(server.id)
+                                if await db.run(isInAlliance, server.id, id.upper()):
+                                    memberRoles = await db.run(getMemberRoles, server.id)
                                     for role in memberRoles:
                                         await newUser.add_roles(getRole(roles, role)) 
                                     await newUser.edit(nick='[{}] {}'.format(id.upper(), newUser.name))
@@ -265,9 +266,9 @@ class RegistrationCog(commands.Cog):
                     elif ans.content.lower() == 'ambassador' or  ans.content.lower() == 'ally':
 
                         # get values for alliance Id, ambassador and ally roles
-                        allianceId      = getAllianceIds(server.id)[0]
-                        ambassadorRoles = getAmbassadorRoles(server.id)
-                        allyRoles       = getAllyRoles(server.id) 
+                        allianceId      = (await db.run(getAllianceIds, server.id))[0]
+                        ambassadorRoles = await db.run(getAmbassadorRoles, server.id)
+                        allyRoles       = await db.run(getAllyRoles, server.id) 
 
                         # set user role based on DB ambassador role
                         if ans.content.lower() == 'ambassador':
@@ -318,16 +319,16 @@ class RegistrationCog(commands.Cog):
         ### STEP TWO ###
         ### Create private channel for ambassadors
 
-        if not createChannelAllowed(server.id):
+        if not await db.run(createChannelAllowed, server.id):
             return
 
 
         # If user is not an alliance member -> aka an ambassador, we need tp
         # create a new channel for ambassadors and chosen server roles only
-        if not isInAlliance(server.id, newUserAlliance):
+        if not await db.run(isInAlliance, server.id, newUserAlliance):
             
             # new channel name should be a combination of both alliances abbreviations
-            channelName = '{}-{}'.format(newUserAlliance.lower(), getMasterAllianceId(server.id))
+            channelName = '{}-{}'.format(newUserAlliance.lower(), await db.run(getMasterAllianceId, server.id))
 
             # check if channel exists. If so, just give user access to that channel
             if channelExists(server.channels, channelName):
@@ -345,9 +346,8 @@ class RegistrationCog(commands.Cog):
 
             # loop through all server roles. If role according to settings should be allowed to
             # enter channel, give them permissions to do so.
-            for role in roles:
-                if canAccessPrivateChannel(server.id, role):
-                    await channel.set_permissions(role, overwrite=show)
+            for role in await db.run(getPrivateChannelRoles, server.id, roles):
+                await channel.set_permissions(role, overwrite=show)
 
             # finally, give the new user permission to see channel
             await channel.set_permissions(newUser, overwrite=show)
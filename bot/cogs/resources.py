@@ -1,28 +1,35 @@
 import discord
 from discord.ext import commands
 import sys, asyncio
-from concurrent.futures import FIRST_COMPLETED
-from contextlib import suppress
 from utils.functions import (
     getResourceReliability,
-    getSearchQuerys,
-    getResourceResults,
-    prepareResourceResults,
-    getEmoji,
-    checkForSTFCEmoji,
-    removeSearchParam,
-    hasSTFCEmojis
+    getSearchFilter,
+    getEmoji
 )
-import math as m
 from utils.db import saveResource
+from utils.resource_pages import ResourcePageSource, resourcePages
+from utils.emoji_registry import emojiRegistries
+from utils.emoji_assets import emojiAssets, provisionEmojis
+from utils.async_db import db
+from utils.paginator import Paginator
 
 
 class ResourcesCog(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
-        self.next = '\N{BLACK RIGHTWARDS ARROW}'
-        self.prev = '\N{LEFTWARDS BLACK ARROW}'
+
+
+    # keep the guild's STFC emojis current, pages rendered with its old emojis can no longer be shown
+    @commands.Cog.listener()
+    async def on_guild_emojis_update(self, guild, before, after):
+        old = emojiRegistries.update(guild, after)
+        if old is not None:
+            resourcePages.dropEmojis(old.fingerprint)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        emojiRegistries.remove(guild.id)
 
 
 
@@ -161,8 +168,9 @@ class ResourcesCog(commands.Cog):
                 if ans.content.lower() == 'confirm':
                     msg = '**Committing resource... ...**\n.'
                     await user.send(msg)
-                    saveResource(system, lvl, region, resource, tier)
-                    reliabilityScore = getResourceReliability(resource, tier, system)
+                    # every report of the same resource confirms it once more
+                    reliabilityScore = await db.run(getResourceReliability, resource, tier, system) + 1
+                    await db.run(saveResource, resource, tier, system, region, reliabilityScore, level=lvl)
                     if reliabilityScore > 1:
                         msg = '**Resource **[SAVED].\n[RESOURCE] **exists, and is confirmed... ...** This resource will appear '
                         msg += 'with **.resource** command results. Thank you for this information... ... **goodbye**\n[CLOSED]\n'
@@ -185,9 +193,9 @@ class ResourcesCog(commands.Cog):
 
 
     # Command presents a list of resources from the database that match the users search parameters. In addition,
-    # the results are shown in an imbed, with reactions that represent the current filters. The user can add additional
-    # filters by adding more data-stfc-emojis to the embed, and can remove filters by removing data-stfc-emojis from
-    # the embed. Results are also paged to make it easier for the user to read.
+    # the results are shown in an imbed, with menus that represent the current filters. The user can change the
+    # filters by picking a resource, grade or region from the menus, and pages the results with the arrow buttons.
+    # Results are also paged to make it easier for the user to read.
 
     # PARAMAS
     #  -  *args: a list of string search parameters, representing desired filters to place on the resources results.
@@ -206,217 +214,188 @@ class ResourcesCog(commands.Cog):
         
 
         if len(args) == 2 and args[0].lower() == 'get' and args[1].lower() == 'emojis':
-            emojiFile = discord.File('img/data_stfc_emojis.zip')
+            emojiFile = emojiAssets.zipFile()
+            if emojiFile is None:
+                await ctx.send('**The emoji files are not available right now.**')
+                return
             await ctx.send('Here they are!', file=emojiFile)
             return
 
-        # function to check that reaction is from user who called this command
-        def checkUser(reaction, user):
-            return user == ctx.message.author
-
-        # VARIABLES
-        footer      = 'FILTERS:'   # embed footer text
-        page        = 1            # current page user is on
-        pages       = 1            # total pages returned from query
-        pageMax     = 15
-        idx         = 0            # keep track of where we are at in the results list
-        resource    = ''           # filter by resource name
-        tier        = ''           # filter by resource tier number
-        region      = ''           # filter by region name
-        hasEmojis   = hasSTFCEmojis(ctx.guild.emojis)
+        if len(args) == 2 and args[0].lower() == 'install' and args[1].lower() == 'emojis':
+            await self.installEmojis(ctx)
+            return
+
+        hasEmojis = emojiRegistries.get(ctx.guild).complete
 
         # Information at the top of the resources list. Dependent on a few things
         if hasEmojis:
             information = '\n[DECRYPTING] Resource Intel... ...\n\n'
-            information += '***Select the "?" emoji at the bottom for\nadditional info on how to use this interface.***\n\n\n'
+            information += '***Select the "?" button at the bottom for\nadditional info on how to use this interface.***\n\n\n'
         else:
-            information = '\n[DECRYPTING] Resource Intel... ...\n\n *Select the arrow emojis to page the results.*\n\n'
+            information = '\n[DECRYPTING] Resource Intel... ...\n\n *Select the arrow buttons to page the results.*\n\n'
             information += '⚠️ **NO STFC EMOJIS DETECTED**\n *Loading basic resource table...*\n '
-            information += '**Resources works better with the STFC emojis...**\nRun the command **.resources '
-            information += 'get emojis** to get the emoji files.\n\n'
-
-        # loop through search parameters, and set resource, region, and tier variable
-        footer, resource, region, tier = getSearchQuerys(args, footer, resource, region, tier)
+            information += '**Resources works better with the STFC emojis...**\nAn admin can run the command **.resources '
+            information += 'install emojis** to add them, or run **.resources get emojis** to get the emoji files.\n\n'
 
         # THE MAIN GAME! send in the search paramaters and query the database for a list of results!
-        results = getResourceResults(resource.title(), tier, region.title())
-
-        # now that you have results, determine the actual number of pages we need to show (MAX PER PAGE = pageMax)
-        pages = m.ceil(len(results) / pageMax)
-
-        # finally, determine how many results to show on the upcoming embed page
-        pageEnd = pageMax if len(results) >= pageMax else len(results)
-
-
-        firstPass = True
-        try:
-            while True:
+        paginator = ResourcePaginator(ctx, args, information)
+        await paginator.search()
+        await paginator.start(ctx)
 
-                # loop through results and format them in a user friendly way. 
-                # Check for custom-emoji representations of the results, and show
-                # them if they exist on this server
-                resourceList = ''
-                for i in range(idx, pageEnd):
-                    resourceList += prepareResourceResults(ctx.guild.emojis, results[i])
 
+    # .resources install emojis: uploads the STFC emojis this server is missing. Must be able to manage emojis
+    async def installEmojis(self, ctx):
+        if not ctx.message.author.guild_permissions.manage_emojis:
+            await ctx.send('**You need the Manage Emojis permission to install the STFC emojis.**')
+            return
+        if not ctx.guild.me.guild_permissions.manage_emojis:
+            await ctx.send('**I need the Manage Emojis permission to install the STFC emojis.**')
+            return
 
-                # prepare the embed
-                embed = discord.Embed(title='**STFC Resources**', description=information+resourceList, color=000000)
-                embed.set_footer(text=footer + ' | page: {}/{}'.format(page, pages))
-                if firstPass:
-                    msg = await ctx.send(embed=embed)
-                else:
-                    await msg.edit(embed=embed)
-
-                firstPass = False
-
-                if hasEmojis:
-                    await msg.add_reaction('❓')
-
-                # determine which emojis to add to interface, based on page number and current filters
-                if page > 1:
-                    await msg.add_reaction(self.prev)
-                if page * pageMax < len(results):
-                    await msg.add_reaction(self.next)
-                if hasEmojis and resource:
-                    await msg.add_reaction(getEmoji(ctx.guild.emojis, resource))
-                if hasEmojis and tier:
-                    await msg.add_reaction(getEmoji(ctx.guild.emojis, '{}star'.format(tier)))
-                if hasEmojis and region:
-                    await msg.add_reaction(getEmoji(ctx.guild.emojis, region))
-
-                task_1 = asyncio.ensure_future(self.bot.wait_for('reaction_add', timeout=60.0, check=checkUser))
-                task_2 = asyncio.ensure_future(self.bot.wait_for('reaction_remove', timeout=60.0, check=checkUser))
-
-                # Wait first of them done:
-                tasks = (task_1, task_2)
-                done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
-                reaction, user = done.pop().result()
-
-                # Cancel others since they're still running, 
-                # but we don't need them to be finished:
-                for task in pending:
-                    task.cancel()
-                    with suppress(asyncio.CancelledError):
-                        await task
-
-
-                args = list(args)
-                paramaterRemoved = False
-
-                # Need to determine if this was a remove action, by checking which type of filter was interacted with
-                if hasEmojis and checkForSTFCEmoji(reaction) and (region.lower() == reaction.emoji.name.lower()):
-                    paramaterRemoved = True
-                    args = removeSearchParam(args, region) 
-                if hasEmojis and checkForSTFCEmoji(reaction) and (resource.lower() == reaction.emoji.name.lower()):
-                    paramaterRemoved = True
-                    args = removeSearchParam(args, resource) 
-                if hasEmojis and checkForSTFCEmoji(reaction) and (tier.lower() == reaction.emoji.name[0]):
-                    paramaterRemoved = True
-                    args = removeSearchParam(args, '{}star'.format(tier)) 
-
-                if hasEmojis and paramaterRemoved:
-                    # loop through search parameters, and set resource, region, and tier variable
-                    footer, resource, region, tier = getSearchQuerys(args, footer, resource, region, tier)
-                    
-                    # THE MAIN GAME! send in the search paramaters and query the database for a list of results!
-                    results = getResourceResults(resource.title(), tier, region.title())
-
-                    # now that you have results, determine the actual number of pages we need to show (MAX PER PAGE = pageMax)
-                    pages = m.ceil(len(results) / pageMax)
-
-                    # finally, determine how many results to show on the upcoming embed page
-                    pageEnd = pageMax if len(results) >= pageMax else len(results)
-
-                # page the results forward, reset page number, page end, and the index
-                elif reaction.emoji == self.next:
-                    page += 1
-                    idx = pageEnd
-                    pageEnd = (page * pageMax) if len(results) >= (page * pageMax) else len(results)
-
-                # page the results backwards, reset page number, page end, and the index
-                elif reaction.emoji == self.prev:
-                    page -= 1
-                    pageEnd = idx
-                    idx = pageEnd - pageMax
-
-                # HELP EMOJI SELECTED
-                # Show a new custom emoji with directions on how to use the interface. Stay on page until
-                # the return emoji is selected
-                elif reaction.emoji == '❓':
-                    # prepare the embed
-                    await msg.clear_reactions()
-                    help = '**RESOURCES COMMAND HELP**\n\n The results of the resources command are shown on this '
-                    help += 'inteface, and is fully interactive. Below are some notes on how to use this interface:\n\n'
-                    help += '**1)** The presented results are *"paged"*. The footer of the information tells you '
-                    help += 'which page you are on.\n**If there are additional pages:**\n× The {} emoji will appear. '.format(self.next)
-                    help += 'Selecting it will page forward.\n**If their are previous pages:**\n× the {} will appear. '.format(self.prev)
-                    help += 'Selecting it will page backwards.\n\n**2)** The results can be filtered by **resource**, **resource grade**, '
-                    help += 'and **region**. When a filter is active, it will show in the footer under **FILTERS:**, and a corresponding '
-                    help += 'emoji representing the filter will be at the bottom of the interface.\nSome things to note:\n\n**× REMOVE FILTER** '
-                    help += '- Selecting an active emoji removes both the emoji and the filter from the results.\n\n**× ADD FILTER** - Reacting '
-                    help += 'to the interface with a valid STFC emoji adds a new filter to the interface, which is reflected in the results.\n'
-                    help += '\n**Valid STFC emojis are:**\n|{}|{}|{}|{}|{}|{}|{}|{}|{}|{}|{}|\n'.format(
-                        getEmoji(ctx.guild.emojis, 'gas'),
-                        getEmoji(ctx.guild.emojis, 'crystal'),
-                        getEmoji(ctx.guild.emojis, 'ore'),
-                        getEmoji(ctx.guild.emojis, 'dilithium'),
-                        getEmoji(ctx.guild.emojis, '2star'),
-                        getEmoji(ctx.guild.emojis, '3star'),
-                        getEmoji(ctx.guild.emojis, '4star'),
-                        getEmoji(ctx.guild.emojis, 'federation'),
-                        getEmoji(ctx.guild.emojis, 'klingon'),
-                        getEmoji(ctx.guild.emojis, 'romulan'),
-                        getEmoji(ctx.guild.emojis, 'neutral'),
-                    )
-                    embed = discord.Embed(title='**STFC Resources**', description=help, color=000000)
-                    embed.set_footer(text='RESOURCES HELP MENU | Select {} to return'.format('❌'))
-                    await msg.edit(embed=embed)
-                    await msg.add_reaction('❌')
-                    while True:
-                        reaction, user = await self.bot.wait_for('reaction_add', timeout=60.0, check=checkUser)
-                        if reaction.emoji == '❌':
-                            break
-                        else:
-                            await msg.remove_reaction(emoji=reaction.emoji, member=user)
-
-                # In this block, check if STFC reaction was added, and requery results, and if not, remove the reaction
-                else:
-                    if hasEmojis and checkForSTFCEmoji(reaction):
-                        newSearchParam = getEmoji(ctx.guild.emojis, reaction.emoji.name)
-                        args = list(args)
-                        args.append(newSearchParam.name) 
-
-                        # loop through search parameters, and set resource, region, and tier variable
-                        footer, resource, region, tier = getSearchQuerys(args, footer, resource, region, tier)
-
-                        # THE MAIN GAME! send in the search paramaters and query the database for a list of results!
-                        results = getResourceResults(resource.title(), tier, region.title())
-
-                        # now that you have results, determine the actual number of pages we need to show (MAX PER PAGE = pageMax)
-                        pages = m.ceil(len(results) / pageMax)
+        registry = emojiRegistries.get(ctx.guild)
+        if registry.complete:
+            await ctx.send('**This server already has all the STFC emojis.**')
+            return
 
-                        # finally, determine how many results to show on the upcoming embed page
-                        idx = 0
-                        page = 1
-                        pageEnd = pageMax if len(results) >= pageMax else len(results)
-                    else:
-                        await msg.remove_reaction(emoji=reaction.emoji, member=user)
-                
-                # clear ALL reactions, reset state of interface.
-                await msg.clear_reactions()
+        await ctx.send('**Installing {} STFC emojis... ...**'.format(len(registry.missing())))
+        created, failed = await provisionEmojis(ctx.guild, registry, 'STFC emojis installed by {}'.format(ctx.message.author))
+        if created:
+            old = emojiRegistries.update(ctx.guild, list(ctx.guild.emojis) + created)
+            if old is not None:
+                resourcePages.dropEmojis(old.fingerprint)
+
+        msg = '**[EMOJIS INSTALLED]**\n'
+        msg += 'Created: {}\n'.format(' '.join(str(e) for e in created) if created else '*none*')
+        if failed:
+            msg += 'Not created:\n' + ''.join('× {} - {}\n'.format(name, reason) for name, reason in failed)
+        await ctx.send(msg)
+
+
+
+# Filter menus of the resources interface: (filter, placeholder, [(label, value), ...])
+RESOURCE_MENUS = [
+    ('resource', 'Resource', [('Gas', 'gas'), ('Crystal', 'crystal'), ('Ore', 'ore'), ('Dilithium', 'dilithium'), ('Latinum', 'latinum')]),
+    ('tier', 'Grade', [('Grade 2', '2'), ('Grade 3', '3'), ('Grade 4', '4')]),
+    ('region', 'Region', [('Federation', 'federation'), ('Klingon', 'klingon'), ('Romulan', 'romulan'), ('Neutral', 'neutral')]),
+]
+# Value of the "Any ..." choice of every menu, Discord rejects empty option values
+ANY_FILTER = 'any'
+
+
+class ResourceFilter(discord.ui.Select):
+    """Menu that sets one filter of the resources interface."""
+
+    def __init__(self, name, placeholder, choices, current, emojis):
+        self.name = name
+        options = [discord.SelectOption(label='Any {}'.format(placeholder.lower()), value=ANY_FILTER, default=not current)]
+        for label, value in choices:
+            emojiName = '{}star'.format(value) if name == 'tier' else value
+            options.append(discord.SelectOption(label=label, value=value, emoji=getEmoji(emojis, emojiName) or None,
+                                                default=value == str(current).lower()))
+        super().__init__(placeholder=placeholder, options=options)
+
+    async def callback(self, interaction):
+        await self.view.setFilter(self.name, self.values[0], interaction)
+
+
+class ResourcePaginator(Paginator):
+    """Resource search results, paged with buttons and filtered with menus.
+
+    Every button press or menu pick answers its interaction with one edit of
+    the results message.
+    """
+
+    def __init__(self, ctx, args, information):
+        super().__init__(None, ctx.message.author, timeout=60.0)
+        self.emojis = emojiRegistries.get(ctx.guild)
+        self.information = information
+        self.showingHelp = False
+
+        # compile the search parameters, e.g. gas ore 3+ -neutral level>=20
+        self.searchFilter = getSearchFilter(args)
+        self.filters = {}
+        for name, placeholder, choices in RESOURCE_MENUS:
+            self.filters[name] = ResourceFilter(name, placeholder, choices, self.searchFilter.selected(name), self.emojis)
+            self.add_item(self.filters[name])
+
+    async def search(self):
+        """Show the resources matching the current filters, from the first page.
+
+        Pages come from the page cache shared by every guild, a search of the
+        in-memory resource index only runs when they are not cached.
+        """
+        self.source = ResourcePageSource(self.searchFilter, self.emojis, self.formatPage)
+        self.page = 0
+
+    def formatPage(self, resourceList, page, pageCount):
+        # resourceList is the page's results formatted in a user friendly way,
+        # with the custom-emoji representations of this server if it has them
+        embed = discord.Embed(title='**STFC Resources**', description=self.information+resourceList, color=000000)
+        embed.set_footer(text=self.searchFilter.describe() + ' | page: {}/{}'.format(page + 1, pageCount))
+        return embed
+
+    def closingFooter(self):
+        return 'TRANSMISSION CLOSED -- SESSION ENDED | page: {}/{}'.format(self.page + 1, self.pages)
+
+    async def setFilter(self, name, value, interaction):
+        # a menu pick replaces every argument of its kind, e.g. picking Gas turns "gas ore" into "gas"
+        self.searchFilter = self.searchFilter.withValue(name, '' if value == ANY_FILTER else value)
+        for option in self.filters[name].options:
+            option.default = option.value == value
+        await self.search()
+        await self.show(interaction)
+
+    async def render(self):
+        self.showingHelp = False
+        self.helpPage.label = None
+        for menu in self.filters.values():
+            menu.disabled = False
+        return await super().render()
+
+    # HELP BUTTON SELECTED
+    # Show a new embed with directions on how to use the interface, until the button is pressed again
+    @discord.ui.button(emoji='❓', style=discord.ButtonStyle.secondary)
+    async def helpPage(self, interaction, button):
+        if self.showingHelp:
+            await self.show(interaction)
+            return
 
-        # TIMES UP. Avoid error and clear all reactions. Give message in footer to rep state
-        except asyncio.TimeoutError:
-            await msg.clear_reactions()
-            footer = 'TRANSMISSION CLOSED -- SESSION ENDED'
-            embed = discord.Embed(title='**STFC Resources**', description=information+resourceList, color=000000)
-            embed.set_footer(text=footer + ' | page: {}/{}'.format(page, pages))
-            await msg.edit(embed=embed)
+        help = '**RESOURCES COMMAND HELP**\n\n The results of the resources command are shown on this '
+        help += 'inteface, and is fully interactive. Below are some notes on how to use this interface:\n\n'
+        help += '**1)** The presented results are *"paged"*. The footer of the information tells you '
+        help += 'which page you are on.\n**If there are additional pages:**\n× The {} button '.format('\N{BLACK RIGHTWARDS ARROW}')
+        help += 'pages forward.\n**If their are previous pages:**\n× the {} button '.format('\N{LEFTWARDS BLACK ARROW}')
+        help += 'pages backwards.\n\n**2)** The results can be filtered by **resource**, **resource grade**, '
+        help += 'and **region**. When a filter is active, it will show in the footer under **FILTERS:**, and in '
+        help += 'its menu at the bottom of the interface.\nSome things to note:\n\n**× REMOVE FILTER** '
+        help += '- Picking "Any" in a menu removes its filter from the results.\n\n**× ADD FILTER** - Picking '
+        help += 'a resource, grade or region in a menu adds it as a filter, which is reflected in the results.\n'
+        help += '\n**The STFC emojis are:**\n|{}|{}|{}|{}|{}|{}|{}|{}|{}|{}|{}|\n'.format(
+            getEmoji(self.emojis, 'gas'),
+            getEmoji(self.emojis, 'crystal'),
+            getEmoji(self.emojis, 'ore'),
+            getEmoji(self.emojis, 'dilithium'),
+            getEmoji(self.emojis, '2star'),
+            getEmoji(self.emojis, '3star'),
+            getEmoji(self.emojis, '4star'),
+            getEmoji(self.emojis, 'federation'),
+            getEmoji(self.emojis, 'klingon'),
+            getEmoji(self.emojis, 'romulan'),
+            getEmoji(self.emojis, 'neutral'),
+        )
+        embed = discord.Embed(title='**STFC Resources**', description=help, color=000000)
+        embed.set_footer(text='RESOURCES HELP MENU | Select Back to return')
+
+        self.showingHelp = True
+        button.label = 'Back'
+        self.prevPage.disabled = self.nextPage.disabled = True
+        for menu in self.filters.values():
+            menu.disabled = True
+        await self.show(interaction, embed)
 
 
 
 
 # set the cog up
 async def setup(bot):
-    await bot.add_cog(ResourcesCog(bot))
+    await bot.add_cog(ResourcesCog(bot))
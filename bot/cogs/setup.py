@@ -17,6 +17,7 @@ from utils.functions import (
     getMasterAllianceId
 )
 from utils.db import saveSettings, saveGeneralInfo, saveAlliance, setNewMaster, saveRolePermissions
+from utils.async_db import db
 from utils.constants import ORDERED_REACTIONS, IN_MESSAGE_REACTIONS, GITHUB
 
 
@@ -43,7 +44,7 @@ class SetupCog(commands.Cog):
         
 
         # ERROR CHECKING
-        aIds = getAllianceIds(ctx.guild.id)
+        aIds = await db.run(getAllianceIds, ctx.guild.id)
         if not len(aIds):
             msg = '{}, your server has not been set up with me. To use this command, a '.format(ctx.message.author.mention)
             msg += 'server administrator must perform the **.setup <AllianceID>** command first.'
@@ -75,7 +76,7 @@ class SetupCog(commands.Cog):
 
                     #Interpret response
                     if reaction.emoji == '👍':
-                        setNewMaster(ctx.guild.id, args[3].upper())
+                        await db.run(setNewMaster, ctx.guild.id, args[3].upper())
                         explanation = '**SREQUEST COMPLETE**\n\n**{}** Has been set as this servers Master Alliance.'.format(args[3].upper())
                         # prepare embed interface for post
                         embed = discord.Embed(title=title, description=explanation, color=1234123)
@@ -113,18 +114,18 @@ class SetupCog(commands.Cog):
 
         #variables
         serverId   = ctx.guild.id
-        allianceId = getMasterAllianceId(serverId)
-        isAdmin    = hasAdminPermission(serverId, ctx.message.author.roles)
+        allianceId = await db.run(getMasterAllianceId, serverId)
+        isAdmin    = await db.run(hasAdminPermission, serverId, ctx.message.author.roles)
         if ctx.message.author.guild_permissions.administrator:
             isAdmin = True
         user       = ctx.message.author
         infoDict = {
-            "roe": getRoeRules(serverId),
-            "ally": getAlliesInfo(serverId),
-            "nap": getNapInfo(serverId),
-            "kos": getKosInfo(serverId),
-            "war": getWarInfo(serverId),
-            "home": getHomeInfo(serverId)
+            "roe": await db.run(getRoeRules, serverId),
+            "ally": await db.run(getAlliesInfo, serverId),
+            "nap": await db.run(getNapInfo, serverId),
+            "kos": await db.run(getKosInfo, serverId),
+            "war": await db.run(getWarInfo, serverId),
+            "home": await db.run(getHomeInfo, serverId)
         }
         dm = ''
         
@@ -170,7 +171,7 @@ class SetupCog(commands.Cog):
                 infoDict[args[0].lower()] = newContent.content
                 msg = '**Committing description... ...**\n.'
                 await user.send(msg)
-                saveGeneralInfo(serverId, allianceId, infoDict["roe"], infoDict["ally"], infoDict["nap"], infoDict["kos"], infoDict["war"], infoDict["home"])
+                await db.run(saveGeneralInfo, serverId, allianceId, infoDict["roe"], infoDict["ally"], infoDict["nap"], infoDict["kos"], infoDict["war"], infoDict["home"])
                 msg = '*The information has been saved, and will now show in the * **intel** *command*\n**closing connection... ...**\n.'
                 await user.send(msg)
             else:
@@ -252,7 +253,7 @@ class SetupCog(commands.Cog):
 
         # BEFORE RUNNING SETUP, we check to see if this server has already
         # registered another alliance. 
-        existingAllianceID = determineFirstTimeSetup(ctx.guild.id, allianceAcronym)
+        existingAllianceID = await db.run(determineFirstTimeSetup, ctx.guild.id, allianceAcronym)
         if existingAllianceID != None:
             # post explanation to interface to explain how to use this screen
             explanation = 'Initiate setup mode...\n\n'
@@ -283,7 +284,7 @@ class SetupCog(commands.Cog):
 
                     #Interpret response
                     if reaction.emoji == '👍':
-                        saveAlliance(ctx.guild.id, allianceAcronym, isMaster=0)
+                        await db.run(saveAlliance, ctx.guild.id, allianceAcronym, isMaster=0)
                         explanation = '**SETUP COMPLETE**\n\n To review your settings, you can use the command **.settings**. '
                         explanation += 'If at any time you wish to reset the current settings, run **.setup <alliance acronym>** '
                         explanation += 'to do so.\n\n [DESTROYING] Interface...\n[ENCRYPTING] sensitive data...\n\nshutting down... ... ...'
@@ -775,7 +776,7 @@ class SetupCog(commands.Cog):
             # STEP 9
             # Summarize user settings
 
-            summary = getSetupSummary('Summary of Setup', ctx.guild.id, ctx.guild.name, allianceAcronym, allowManualRegister, allowPrivateChannelCreation, allowAllyIntelAccess,
+            summary = await db.run(getSetupSummary, 'Summary of Setup', ctx.guild.id, ctx.guild.name, allianceAcronym, allowManualRegister, allowPrivateChannelCreation, allowAllyIntelAccess,
                                     selectedCategory, memberRoles, ambassadorRoles, allyRoles, registerCommandRoleSelection, privateChannelRoleSelection)
             summary += '\n**To accept these settings, select** {}\n**To cancel setup, select** {}\n'.format('✅', '❌')
             embed = discord.Embed(title=title, description=summary, color=1234123)
@@ -791,35 +792,38 @@ class SetupCog(commands.Cog):
                 
                 # if user reacts with 'NEXT', move to next interface
                 if reaction.emoji == '✅':
-                    # Save server settings
-                    saveSettings(
-                        ctx.guild.id,
-                        allianceAcronym,  # Use alliance acronym instead of guild name
-                        allowManualRegister,
-                        allowPrivateChannelCreation,
-                        selectedCategory.name if selectedCategory else '',
-                        allowAllyIntelAccess
-                    )
+                    # Save server settings and role permissions as one unit of work
+                    def saveSetup():
+                        saveSettings(
+                            ctx.guild.id,
+                            allianceAcronym,  # Use alliance acronym instead of guild name
+                            allowManualRegister,
+                            allowPrivateChannelCreation,
+                            selectedCategory.name if selectedCategory else '',
+                            allowAllyIntelAccess
+                        )
                     
-                    # Save role permissions for each role
-                    for i, role in enumerate(roles):
-                        memberRole = 1 if i < len(memberRoles) and memberRoles[i].get('selected', False) else 0
-                        ambassadorRole = 1 if i < len(ambassadorRoles) and ambassadorRoles[i].get('selected', False) else 0
-                        allyRole = 1 if i < len(allyRoles) and allyRoles[i].get('selected', False) else 0
-                        adminRole = 1 if i < len(registerCommandRoleSelection) and registerCommandRoleSelection[i].get('selected', False) else 0
-                        accessAmbassadorChannels = 1 if i < len(privateChannelRoleSelection) and privateChannelRoleSelection[i].get('selected', False) else 0
+                        # Save role permissions for each role
+                        for i, role in enumerate(roles):
+                            memberRole = 1 if i < len(memberRoles) and memberRoles[i].get('selected', False) else 0
+                            ambassadorRole = 1 if i < len(ambassadorRoles) and ambassadorRoles[i].get('selected', False) else 0
+                            allyRole = 1 if i < len(allyRoles) and allyRoles[i].get('selected', False) else 0
+                            adminRole = 1 if i < len(registerCommandRoleSelection) and registerCommandRoleSelection[i].get('selected', False) else 0
+                            accessAmbassadorChannels = 1 if i < len(privateChannelRoleSelection) and privateChannelRoleSelection[i].get('selected', False) else 0
                         
-                        # Only save if at least one permission is set for this role
-                        if memberRole or ambassadorRole or allyRole or adminRole or accessAmbassadorChannels:
-                            saveRolePermissions(
-                                ctx.guild.id,
-                                role.name,
-                                memberRole,
-                                ambassadorRole,
-                                allyRole,
-                                adminRole,
-                                accessAmbassadorChannels
-                            )
+                            # Only save if at least one permission is set for this role
+                            if memberRole or ambassadorRole or allyRole or adminRole or accessAmbassadorChannels:
+                                saveRolePermissions(
+                                    ctx.guild.id,
+                                    role.name,
+                                    memberRole,
+                                    ambassadorRole,
+                                    allyRole,
+                                    adminRole,
+                                    accessAmbassadorChannels
+                                )
+
+                    await db.transaction(saveSetup)
 
                     explanation = '**SETUP COMPLETE**\n\n To review your settings, you can use the command **.settings**. '
                     explanation += 'If at any time you wish to reset the current settings, run **.setup <alliance acronym>** '
@@ -1,107 +1,96 @@
 import discord
 from discord.ext import commands
-import sys, asyncio
+import sys, asyncio, os, time
 from utils.functions import (
-    getMemberKillCounts,
     getFormattedMemberKillCounts,
+    getFormattedKillTrend,
+    getFormattedWarSeasons,
     getAllianceName,
-    getKillCount,
-    getWarPointsChannel,
-    getTotalKillCounts
+    getLiveBoardMessage,
+    getKillTrend,
+    getSeasonKills,
+    getSeasonStandingPages,
+    getWarSeason,
+    getWarSeasons,
+    getWindowKillCounts,
+    parseKillWindow
 )
-from utils.db import incrementMemberKillCount, setWarPointsChannel #, resetWarPoints
-import math as m
-
+from utils.db import setWarPointsChannel, setLiveBoardMessage, endWarSeason
+from utils.coalescer import Coalescer
+from utils.paginator import Paginator, ListPageSource, KeysetPageSource, LeaderboardPageSource
+from utils.page_sources import PAGE_SIZE
+from utils.async_db import db
+from utils.kill_writer import killWriter, DuplicateScreenshot
+from utils.leaderboard import leaderboards
+from utils.nickname import parseMember
+from utils.screenshots import screenshots, SCREENSHOT_DEDUP
+from utils.warpoints import warChannels, loadWarPointsChannels, getLegacyWarPointsChannels
+
+# How a recorded kill is acknowledged: 'message' replies with the kill count,
+# 'reaction' only reacts to the screenshot, which is one light REST call
+WARPOINTS_ACK = os.getenv('WARPOINTS_ACK', 'message').lower()
+KILL_REACTION = '\N{SMILING FACE WITH HORNS}'
+
+# Window of .warpoints trend when none is given, and the most buckets it shows
+DEFAULT_TREND_WINDOW = ('daily', 7)
+MAX_TREND_BUCKETS = 31
+
+# Least seconds between two edits of a live leaderboard, and how many players it shows
+LIVE_BOARD_INTERVAL = float(os.getenv('LIVE_BOARD_INTERVAL', '10'))
+LIVE_BOARD_ROWS = 15
 
 class WarCog(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
-        self.next = '\N{BLACK RIGHTWARDS ARROW}'
-        self.prev = '\N{LEFTWARDS BLACK ARROW}'
+        # live leaderboard edits, coalesced per guild however many kills arrive
+        self.liveBoards = Coalescer(self.updateLiveBoard, LIVE_BOARD_INTERVAL)
+
+    async def cog_load(self):
+        # warpoints channels are looked up in memory by on_message
+        count = await db.run(loadWarPointsChannels)
+        print(f'Loaded {count} warpoints channels')
+
+    async def cog_unload(self):
+        self.liveBoards.cancel()
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # channels saved by name before channel IDs were stored: look up their ID
+        for serverId, channelName in await db.run(getLegacyWarPointsChannels):
+            guild = self.bot.get_guild(serverId)
+            channel = discord.utils.get(guild.text_channels, name=channelName) if guild else None
+            if channel:
+                await db.run(setWarPointsChannel, serverId, channel.id, channel.name)
     
     @commands.Cog.listener()
     async def on_message(self, message):
-        # Skip if message is not in a guild (e.g., DM)
-        if not message.guild:
+        # Skip if message is not in a guild (e.g., DM) or not in its warpoints channel
+        if not message.guild or not warChannels.isWarChannel(message.guild.id, message.channel.id):
             return
-            
-        channel = getWarPointsChannel(message.guild.id)
-        if message.channel.name == channel and not message.author.bot and message.attachments:
-
-            allianceId = ''
-            name = ''
-            test = ''
-            try: #[] RULE
-                # first assume nickname with [TAG] name
-                test = allianceId = message.author.nick.split(']')[1]
-                allianceId = message.author.nick.split(']')[0][1::]
-                name = message.author.nick.split(' ')[1]
-            except:
-                try:
-                    # If failed assume name with [TAG] name
-                    test = allianceId = message.author.name.split(']')[1]
-                    allianceId = message.author.name.split(']')[0][1::]
-                    name = message.author.name.split(' ')[1]
-                except:
-                    try:
-                        # If failed assume nickname with [TAG]name
-                        test = allianceId = message.author.nick.split(']')[1]
-                        allianceId = message.author.nick.split(']')[0][1::]
-                        name = message.author.nick.split(']')[1]
-                    except:
-                        try:
-                            # If failed assume name with [TAG]name
-                            test = allianceId = message.author.name.split(']')[1]
-                            allianceId = message.author.name.split(']')[0][1::]
-                            name = message.author.name.split(']')[1]
-                        except:
-                            try: #() RULE
-                                # first assume nickname with (TAG) name
-                                test = allianceId = message.author.nick.split(')')[1]
-                                allianceId = message.author.nick.split(')')[0][1::]
-                                name = message.author.nick.split(' ')[1]
-                            except:
-                                try:
-                                    # If failed assume name with (TAG) name
-                                    test = allianceId = message.author.name.split(')')[1]
-                                    allianceId = message.author.name.split(')')[0][1::]
-                                    name = message.author.name.split(' ')[1]
-                                except:
-                                    try:
-                                        # If failed assume name with (TAG)name
-                                        test = allianceId = message.author.name.split(')')[1]
-                                        allianceId = message.author.name.split(')')[0][1::]
-                                        name = message.author.name.split(')')[1]
-                                    except:
-                                        try: #< RULE
-                                            # first assume nickname with <TAG> name
-                                            test = allianceId = message.author.nick.split('>')[1]
-                                            allianceId = message.author.nick.split('>')[0][1::]
-                                            name = message.author.nick.split(' ')[1]
-                                        except:
-                                            try:
-                                                # If failed assume name with <TAG> name
-                                                test = allianceId = message.author.name.split('>')[1]
-                                                allianceId = message.author.name.split('>')[0][1::]
-                                                name = message.author.name.split(' ')[1]
-                                            except:
-                                                try:
-                                                    # If failed assume name with <TAG>name
-                                                    test = allianceId = message.author.name.split('>')[1]
-                                                    allianceId = message.author.name.split('>')[0][1::]
-                                                    name = message.author.name.split('>')[1]
-                                                except:
-                                                    #user is doing somewhere wierd... acccept it
-                                                    allianceId = '???'
-                                                    name = message.author.name
-
-
-            incrementMemberKillCount(message.guild.id, message.author.id, name, allianceId)
-            killCount = getKillCount(message.author.id)
-            msg = '.\n{}, your **kill** has been recorded :smiling_imp:'.format(message.author.mention)
-            msg += '\n```Kill Count: {}```'.format(killCount)
-            await message.channel.send(msg)
+
+        if not message.author.bot and message.attachments:
+
+            # the same screenshot only counts once per guild, whoever posts it; the
+            # screenshots are claimed by the kill writer together with the kill
+            fingerprints = [f for f in await screenshots.fingerprints(message.attachments) if f] if SCREENSHOT_DEDUP else []
+            allianceId, name = parseMember(message.author)
+            try:
+                killCount = await killWriter.record(message.guild.id, message.author.id, name, allianceId,
+                                                    messageId=message.id, createdAt=message.created_at.timestamp(),
+                                                    screenshots=fingerprints, channelId=message.channel.id)
+            except DuplicateScreenshot as duplicate:
+                msg = '.\n{}, this screenshot has already been recorded for <@{}>, no kill was counted.'.format(message.author.mention, duplicate.playerId)
+                msg += '\nhttps://discord.com/channels/{}/{}/{}'.format(message.guild.id, duplicate.channelId, duplicate.messageId)
+                await message.channel.send(msg)
+            else:
+                self.liveBoards.touch(message.guild.id)
+                if WARPOINTS_ACK == 'reaction':
+                    await message.add_reaction(KILL_REACTION)
+                else:
+                    msg = '.\n{}, your **kill** has been recorded :smiling_imp:'.format(message.author.mention)
+                    msg += '\n```Kill Count: {}```'.format(killCount)
+                    await message.channel.send(msg)
 
             await self.bot.process_commands(message)
 
@@ -115,20 +104,10 @@ class WarCog(commands.Cog):
         if len(ctx.message.mentions) > 0:
             member = ctx.message.mentions[0]
 
-            allianceId = ''
-            name = ''
-            try: 
-                allianceId = member.nick.split(']')[0][1::]
-                name = member.nick.split(' ')[1]
-            except:
-                allianceId = member.name.split(']')[0][1::]
-                try:
-                    name = member.name.split(' ')[1]
-                except:
-                    name = member.name.split(']')[1]
-
-            incrementMemberKillCount(ctx.guild.id, member.id, name, allianceId)
-            killCount = getKillCount(member.id)
+            allianceId, name = parseMember(member)
+
+            killCount = await killWriter.record(ctx.guild.id, member.id, name, allianceId, messageId=ctx.message.id)
+            self.liveBoards.touch(ctx.guild.id)
             msg = ".\n{}, {}'s **kill** has been recorded :smiling_imp:".format(ctx.message.author.mention, member.name)
             msg += '\n```{} Kill Count: {}```'.format(member.name, killCount)
             await ctx.message.channel.send(msg)
@@ -139,14 +118,18 @@ class WarCog(commands.Cog):
         if ctx.guild.id != 524400503967187011:
             return
 
-        killCount = getKillCount(ctx.message.author.id)
+        board = await leaderboards.get(ctx.guild.id)
+        standing = board.player(ctx.message.author.id)
         msg = '.\n{}, your **kill** count is below :smiling_imp:'.format(ctx.message.author.mention)
-        msg += '\n```Kill Count: {}```'.format(killCount)
+        if standing:
+            msg += '\n```Kill Count: {} | Rank: {}/{}```'.format(standing[0], standing[1], len(board))
+        else:
+            msg += '\n```Kill Count: No Information Yet!```'
         await ctx.message.channel.send(msg)
 
 
     @commands.command()
-    async def warpoints(self, ctx, allianceId=''):
+    async def warpoints(self, ctx, allianceId='', *args):
 
         isAdmin = ctx.message.author.guild_permissions.administrator
 
@@ -156,96 +139,211 @@ class WarCog(commands.Cog):
                 await ctx.message.channel.send('{}, you must be an admin on this server to spin up warpoints.'.format(ctx.message.author.mention))
                 return
 
-            setWarPointsChannel(ctx.guild.id, ctx.channel.name)
+            await db.run(setWarPointsChannel, ctx.guild.id, ctx.channel.id, ctx.channel.name)
+            if not warChannels.isWarChannel(ctx.guild.id, ctx.channel.id):
+                msg = '{}, your server has not been set up with me. To use warpoints, a '.format(ctx.message.author.mention)
+                msg += 'server administrator must perform the **.setup <AllianceID>** command first.'
+                await ctx.message.channel.send(msg)
+                return
+
             msg = '.\n{}, This channel **({})** has been set up for warpoints.'.format(ctx.message.author.mention, ctx.channel.name)
             msg += '\n`**Screenshots of kills will now be recorded here** :smiling_imp:'
             await ctx.message.channel.send(msg)
             return
 
-        # if allianceId.lower() == 'reset':
-        #     # ERROR: Admin required to spin up warpoints
-        #     if not isAdmin:
-        #         await ctx.message.channel.send('{}, you must be an admin on this server to reset alliance warpoints.'.format(ctx.message.author.mention))
-        #         return
+        # ending a season replaces resetting warpoints, see warSeason
+        if allianceId.lower() == 'season':
+            await self.warSeason(ctx, isAdmin, args)
+            return
 
-        #     resetWarPoints(ctx.guild.id)
-        #     msg = '.\n{}, All warpoints have been reset for your alliance.'.format(ctx.message.author.mention)
-        #     await ctx.message.channel.send(msg)
-        #     return
+        if allianceId.lower() == 'live':
+            await self.liveBoard(ctx, isAdmin, args)
+            return
 
-        title = getAllianceName(ctx.guild.id)
-        spacer = '\n--------------------------------------------------\n'
+        # the live leaderboard already shows the standings in the warpoints channel
+        if not allianceId and not args and warChannels.isWarChannel(ctx.guild.id, ctx.channel.id):
+            messageId = await db.run(getLiveBoardMessage, ctx.guild.id)
+            if messageId:
+                msg = '{}, the live leaderboard is pinned in this channel: {}'.format(
+                    ctx.message.author.mention, ctx.channel.get_partial_message(messageId).jump_url)
+                await ctx.message.channel.send(msg)
+                return
 
-        # function to check that reaction is from user who called this command
-        def checkUser(reaction, user):
-            return user == ctx.message.author
-        
-        # violations is paged, so we need some variables to help do that correctly
-        idx = 0
-        maxPage = 15
-        page = 1
-        numPages = 1
-        intro = '[OPENING] Secure connection...\n*Transmitting* sensitive data.. ...\n\n'
+        # the remaining arguments are an alliance tag and/or a window such as 24h or 7d
+        trend = allianceId.lower() == 'trend'
+        args = list(args) if trend else [allianceId] + list(args)
+        window = next((parseKillWindow(arg) for arg in args if parseKillWindow(arg)), None)
+        allianceId = next((arg for arg in args if arg and not parseKillWindow(arg)), '')
+
+        if trend:
+            await self.killTrend(ctx, allianceId.upper(), window or DEFAULT_TREND_WINDOW)
+            return
 
         # check to see if a specific player or alliance was mentioned, to add to the query
         alliance = ''
         if (allianceId):
             alliance = allianceId.upper()
 
-        # get this servers violations, and determine number of pages
-        results = getMemberKillCounts(ctx.guild.id, alliance)
-        allianceTotal = getTotalKillCounts(ctx.guild.id)
-        numPages = m.ceil(len(results) / maxPage)
-        pageEnd = maxPage if len(results) >= maxPage else len(results)
+        # get this servers kill counts
+        note = ''
+        if window:
+            # recent kills are summed from the rollup buckets of the window
+            results = await db.run(getWindowKillCounts, ctx.guild.id, alliance, *window)
+            allianceTotal = sum(row[2] for row in results)
+            note = '*Kills of the last {}{}*\n\n'.format(window[1], 'h' if window[0] == 'hourly' else 'd')
+            makeSource = lambda formatPage: ListPageSource(results, PAGE_SIZE, formatPage)
+        else:
+            # pages are read from the shared leaderboard as they are shown
+            board = await leaderboards.get(ctx.guild.id)
+            allianceTotal = board.allianceTotal(alliance) if alliance else board.total
+            makeSource = lambda formatPage: LeaderboardPageSource(board, alliance, PAGE_SIZE, formatPage)
 
+        await self.pageKillCounts(ctx, '**Member Kill Counts**', note, allianceTotal, makeSource)
 
-        killList = getFormattedMemberKillCounts(results[idx:pageEnd])
-        embed = discord.Embed(title='**Member Kill Counts**', description=intro+spacer+killList+spacer[1::], color=000000)
-        embed.set_author(name=title, icon_url=ctx.guild.icon_url)
-        embed.set_footer(text='SECURE CONNECTION: true | Total Kills:{} | pg {}/{}'.format(allianceTotal, page, numPages))
-        msg = await ctx.send(embed=embed)
 
-        try:
-            while True:
-                killList = getFormattedMemberKillCounts(results[idx:pageEnd])
-                embed = discord.Embed(title='**Member Kill Counts**', description=intro+spacer+killList+spacer[1::], color=000000)
-                embed.set_author(name=title, icon_url=ctx.guild.icon_url)
-                embed.set_footer(text='SECURE CONNECTION: true | Total Kills:{} | pg {}/{}'.format(allianceTotal, page, numPages))
-                await msg.edit(embed=embed)
-
-
-                if page > 1:
-                    await msg.add_reaction(self.prev)
-                if page * maxPage < len(results):
-                    await msg.add_reaction(self.next)
-
-                reaction, user = await self.bot.wait_for('reaction_add', timeout=120.0, check=checkUser)
-
-                # page the results forward, reset page number, page end, and the index
-                if reaction.emoji == self.next:
-                    page += 1
-                    idx = pageEnd
-                    pageEnd = (page * maxPage) if len(results) >= (page * maxPage) else len(results)
-
-                # page the results backwards, reset page number, page end, and the index
-                if reaction.emoji == self.prev:
-                    page -= 1
-                    pageEnd = idx
-                    idx = pageEnd - maxPage
-
-                # clear ALL reactions, reset state of interface.
-                await msg.clear_reactions()
+    async def warSeason(self, ctx, isAdmin, args):
+        action = args[0].lower() if args else ''
+
+        if action == 'end':
+            # ERROR: Admin required to end a season
+            if not isAdmin:
+                await ctx.message.channel.send('{}, you must be an admin on this server to end a war season.'.format(ctx.message.author.mention))
+                return
+
+            season = await db.run(endWarSeason, ctx.guild.id, time.time())
+            if season is None:
+                msg = '{}, your server has not been set up with me. To use warpoints, a '.format(ctx.message.author.mention)
+                msg += 'server administrator must perform the **.setup <AllianceID>** command first.'
+                await ctx.message.channel.send(msg)
+                return
+
+            msg = '.\n{}, **Season {}** has ended and its standings have been archived.'.format(ctx.message.author.mention, season)
+            msg += '\n```Season {} has begun, all kill counts start from zero.```'.format(season + 1)
+            await ctx.message.channel.send(msg)
+            self.liveBoards.touch(ctx.guild.id)
+            return
+
+        # final standings of an ended season, optionally of one alliance
+        if action.isdigit():
+            season = int(action)
+            alliance = args[1].upper() if len(args) > 1 else ''
+            pages = await db.run(getSeasonStandingPages, ctx.guild.id, season, alliance)
+            if not await db.run(pages.count):
+                await ctx.message.channel.send('{}, there are no archived standings for season {}.'.format(ctx.message.author.mention, season))
+                return
+
+            total = await db.run(getSeasonKills, ctx.guild.id, season, alliance)
+            makeSource = lambda formatPage: KeysetPageSource(pages, formatPage)
+            await self.pageKillCounts(ctx, '**Season {} Kill Counts**'.format(season), '', total, makeSource)
+            return
+
+        # list of ended seasons
+        current = await db.run(getWarSeason, ctx.guild.id)
+        seasons = await db.run(getWarSeasons, ctx.guild.id)
+        note = '*Current season: {}*\n\n'.format(current)
+        total = sum(row[3] for row in seasons)
+        makeSource = lambda formatPage: ListPageSource(seasons, PAGE_SIZE, formatPage)
+        await self.pageKillCounts(ctx, '**War Seasons**', note, total, makeSource, getFormattedWarSeasons)
+
+
+    async def liveBoard(self, ctx, isAdmin, args):
+        # ERROR: Admin required to manage the live leaderboard
+        if not isAdmin:
+            await ctx.message.channel.send('{}, you must be an admin on this server to manage the live leaderboard.'.format(ctx.message.author.mention))
+            return
+
+        channel = self.bot.get_channel(warChannels.get(ctx.guild.id) or 0)
+        if channel is None:
+            msg = '{}, warpoints have not been set up on this server. A server administrator '.format(ctx.message.author.mention)
+            msg += 'must perform the **.warpoints begin** command in the warpoints channel first.'
+            await ctx.message.channel.send(msg)
             return
 
-        # UH OH TIMED OUT
-        except asyncio.TimeoutError:
-            embed = discord.Embed(title='**Member Kill Counts**', description=intro+spacer+killList+spacer[1::], color=000000)
-            embed.set_author(name=title, icon_url=ctx.guild.icon_url)
-            embed.set_footer(text='CONNECTION CLOSED: Session timed out')
-            msg = await msg.edit(embed=embed)
-            await msg.clear_reactions()
+        # stop updating the current live leaderboard, if there is one
+        messageId = await db.run(getLiveBoardMessage, ctx.guild.id)
+        if messageId:
+            await db.run(setLiveBoardMessage, ctx.guild.id, None)
+            try:
+                await channel.get_partial_message(messageId).unpin()
+            except discord.HTTPException:
+                pass
+
+        if args and args[0].lower() == 'off':
+            await ctx.message.channel.send('{}, the live leaderboard has been turned off.'.format(ctx.message.author.mention))
             return
 
+        msg = await channel.send(embed=await self.liveBoardEmbed(ctx.guild))
+        try:
+            await msg.pin()
+        except discord.HTTPException:
+            await ctx.message.channel.send('{}, I could not pin the live leaderboard, it will still be updated.'.format(ctx.message.author.mention))
+        await db.run(setLiveBoardMessage, ctx.guild.id, msg.id)
+
+        msg = '.\n{}, the live leaderboard of **({})** is updated as kills are recorded.'.format(ctx.message.author.mention, channel.name)
+        msg += '\n```At most one update every {:g} seconds```'.format(LIVE_BOARD_INTERVAL)
+        await ctx.message.channel.send(msg)
+
+
+    async def liveBoardEmbed(self, guild):
+        board = await leaderboards.get(guild.id)
+        title = await db.run(getAllianceName, guild.id)
+        spacer = '\n--------------------------------------------------\n'
+        intro = '[OPENING] Secure connection...\n*Transmitting* live data.. ...\n\n'
+
+        killList = getFormattedMemberKillCounts(board.rows(end=LIVE_BOARD_ROWS))
+        embed = discord.Embed(title='**Live Kill Counts**', description=intro+spacer+killList+spacer[1::], color=000000)
+        embed.set_author(name=title, icon_url=guild.icon.url if guild.icon else None)
+        embed.set_footer(text='LIVE CONNECTION: true | Total Kills:{} | Players:{}'.format(board.total, len(board)))
+        embed.timestamp = discord.utils.utcnow()
+        return embed
+
+
+    async def updateLiveBoard(self, serverId):
+        # called by self.liveBoards, at most once every LIVE_BOARD_INTERVAL seconds per guild
+        messageId = await db.run(getLiveBoardMessage, serverId)
+        channel = self.bot.get_channel(warChannels.get(serverId) or 0)
+        if not messageId or channel is None:
+            return
+
+        try:
+            await channel.get_partial_message(messageId).edit(embed=await self.liveBoardEmbed(channel.guild))
+        except discord.NotFound:
+            # the message was deleted, stop updating it
+            await db.run(setLiveBoardMessage, serverId, None)
+
+
+    async def pageKillCounts(self, ctx, heading, note, total, makeSource, formatter=getFormattedMemberKillCounts):
+        # pages of kill counts, browsed with buttons by the member that asked for them.
+        # makeSource(formatPage) returns the page source the pages are read from
+        title = await db.run(getAllianceName, ctx.guild.id)
+        spacer = '\n--------------------------------------------------\n'
+        intro = '[OPENING] Secure connection...\n*Transmitting* sensitive data.. ...\n\n' + note
+
+        def formatPage(entries, page, pageCount):
+            killList = formatter(entries)
+            embed = discord.Embed(title=heading, description=intro+spacer+killList+spacer[1::], color=000000)
+            embed.set_author(name=title, icon_url=ctx.guild.icon.url if ctx.guild.icon else None)
+            embed.set_footer(text='SECURE CONNECTION: true | Total Kills:{} | pg {}/{}'.format(total, page + 1, pageCount))
+            return embed
+
+        await Paginator(makeSource(formatPage), ctx.message.author).start(ctx)
+
+
+    async def killTrend(self, ctx, alliance, window):
+        # kills per hour or day, read from the rollup buckets
+        size, span = window[0], min(window[1], MAX_TREND_BUCKETS)
+        trend = await db.run(getKillTrend, ctx.guild.id, alliance, size, span)
+        title = await db.run(getAllianceName, ctx.guild.id)
+        spacer = '\n--------------------------------------------------\n'
+        intro = '[OPENING] Secure connection...\n*Transmitting* sensitive data.. ...\n\n'
+
+        embed = discord.Embed(title='**Kill Trend{}**'.format(' [{}]'.format(alliance) if alliance else ''),
+                              description=intro+spacer+getFormattedKillTrend(trend, size)+spacer[1::], color=000000)
+        embed.set_author(name=title, icon_url=ctx.guild.icon.url if ctx.guild.icon else None)
+        embed.set_footer(text='SECURE CONNECTION: true | Total Kills:{} | {} {}'.format(
+            sum(kills for _, kills in trend), span, 'hours' if size == 'hourly' else 'days'))
+        await ctx.send(embed=embed)
+
 
 
 
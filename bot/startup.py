@@ -1,5 +1,6 @@
 import os
 import sys
+import asyncio
 import discord
 from discord.ext import commands
 import traceback
@@ -10,7 +11,11 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Import database initialization
-from utils.data_database import createAllianceTables
+from utils.migrations import runMigrations, getSchemaVersion
+from utils.async_db import db
+from utils.kill_writer import killWriter
+from utils.screenshots import screenshots
+from utils.emoji_assets import emojiAssets
 
 # Set up intents for discord.py v2
 intents = discord.Intents.default()
@@ -57,14 +62,18 @@ class StfcBot(commands.Bot):
     
     async def setup_hook(self):
         """Setup hook to load extensions and initialize database."""
-        # Initialize database tables
+        # Bring the database schema up to date
         try:
-            createAllianceTables()
-            print("Database tables initialized successfully.")
+            await db.run(runMigrations)
+            print("Database schema at version {}.".format(await db.run(getSchemaVersion)))
         except Exception as e:
             print(f"Error initializing database: {e}")
             traceback.print_exc()
         
+        # Read the STFC emoji images once, for .resources get/install emojis
+        await asyncio.get_running_loop().run_in_executor(None, emojiAssets.load)
+        print("Loaded {} STFC emoji images.".format(len(emojiAssets.images)))
+
         # Load extensions
         for extension in initial_extensions:
             try:
@@ -74,6 +83,13 @@ class StfcBot(commands.Bot):
                 print(f'Failed to load extension {extension}')
                 traceback.print_exc()
 
+    async def close(self):
+        """Shut down the bot, write queued kill reports, then stop the database threads."""
+        await super().close()
+        await killWriter.close()
+        screenshots.close()
+        db.close()
+
     async def on_ready(self):
         """Event triggered when bot is ready."""
         print('\n\n\nLogged in as {} (ID: {}) | Connected to {} servers'
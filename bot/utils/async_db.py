@@ -0,0 +1,106 @@
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils.db import queryDatabase, executeQuery, pool, runTransaction
+
+# Number of dedicated database worker threads
+DB_THREADS = int(os.getenv('DATABASE_THREADS', '2'))
+
+
+class AsyncDatabase:
+    """Awaitable front end to the synchronous database helpers.
+
+    Every call is handed to a small dedicated thread pool so SQLite work never
+    runs on the discord.py event loop. Any helper from utils.db or
+    utils.functions can be run through run(), while fetch/execute mirror
+    queryDatabase/executeQuery.
+    """
+
+    def __init__(self, workers=DB_THREADS):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._peakQueued = 0
+
+    def _getExecutor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='stfc-db')
+        return self._executor
+
+    def _call(self, func, state):
+        with self._lock:
+            if state['cancelled']:
+                return None
+            state['started'] = True
+            self._queued -= 1
+            self._running += 1
+        try:
+            return func()
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking database helper on the database threads."""
+        loop = asyncio.get_running_loop()
+        state = {'started': False, 'cancelled': False}
+        with self._lock:
+            self._queued += 1
+            self._peakQueued = max(self._peakQueued, self._queued)
+        call = functools.partial(self._call, functools.partial(func, *args, **kwargs), state)
+        try:
+            return await loop.run_in_executor(self._getExecutor(), call)
+        finally:
+            # a call cancelled before a worker picked it up is skipped, and no longer queued
+            with self._lock:
+                if not state['started']:
+                    state['cancelled'] = True
+                    self._queued -= 1
+
+    async def fetch(self, sql, params=None):
+        """Awaitable queryDatabase."""
+        return await self.run(queryDatabase, sql, params)
+
+    async def execute(self, sql, params=None):
+        """Awaitable executeQuery."""
+        return await self.run(executeQuery, sql, params)
+
+    async def transaction(self, func, *args, **kwargs):
+        """Run func as one unit of work: `await db.transaction(saveSetup, ...)`.
+
+        func runs on a single database thread inside utils.db.transaction(), so
+        the write lock is never held while the event loop waits for a worker.
+        """
+        return await self.run(runTransaction, func, *args, **kwargs)
+
+    def queueDepth(self):
+        """Number of database calls waiting for a free worker thread."""
+        with self._lock:
+            return self._queued
+
+    def stats(self):
+        """Snapshot of executor load, useful to spot the database as a bottleneck."""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queued': self._queued,
+                'running': self._running,
+                'completed': self._completed,
+                'peakQueued': self._peakQueued
+            }
+
+    def close(self):
+        """Wait for outstanding calls, stop the worker threads and close pooled connections."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        pool.closeAll()
+
+
+db = AsyncDatabase()
@@ -0,0 +1,55 @@
+import asyncio
+
+
+class Coalescer:
+    """Runs an async callback per key at most once every interval seconds.
+
+    touch(key) asks for the callback to run. The first touch runs it right
+    away; touches that arrive while it runs or within the interval after it
+    are folded into one more run at the end of the interval, so a burst of any
+    size costs at most one call per interval and the last touch is never lost.
+    """
+
+    def __init__(self, callback, interval):
+        self.callback = callback
+        self.interval = interval
+        self._dirty = set()
+        self._tasks = {}
+        self._lastRun = {}
+        self._stats = {'touches': 0, 'runs': 0}
+
+    def touch(self, key):
+        """Ask for the callback to run for key, from the event loop."""
+        self._stats['touches'] += 1
+        self._dirty.add(key)
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.get_running_loop().create_task(self._run(key))
+
+    async def _run(self, key):
+        loop = asyncio.get_running_loop()
+        try:
+            while key in self._dirty:
+                wait = self._lastRun.get(key, float('-inf')) + self.interval - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._dirty.discard(key)
+                self._lastRun[key] = loop.time()
+                self._stats['runs'] += 1
+                try:
+                    await self.callback(key)
+                except Exception as e:
+                    print(f"Error running coalesced update for {key}: {e}")
+        finally:
+            del self._tasks[key]
+
+    def cancel(self):
+        """Drop every pending run."""
+        self._dirty.clear()
+        for task in self._tasks.values():
+            task.cancel()
+
+    def stats(self):
+        """Return how many touches were folded into how many runs."""
+        stats = dict(self._stats)
+        stats['pending'] = len(self._tasks)
+        return stats
@@ -1,42 +1,340 @@
 import sqlite3
 import os
+import queue
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from utils.queries import QUERIES
+from utils.profiler import profiler
 
 # Database file path
-DB_PATH = os.path.join(os.path.dirname(__file__), 'stfc_bot.db')
+DB_PATH = os.getenv('DATABASE_PATH') or os.path.join(os.path.dirname(__file__), 'stfc_bot.db')
+
+# Connection pool tuning
+POOL_SIZE = int(os.getenv('DATABASE_POOL_SIZE', '4'))
+BUSY_TIMEOUT_MS = int(os.getenv('DATABASE_BUSY_TIMEOUT_MS', '5000'))
+STATEMENT_CACHE_SIZE = int(os.getenv('DATABASE_STATEMENT_CACHE_SIZE', '128'))
+# Shared cache makes connections fail fast on table locks instead of honouring the
+# busy timeout, so it is opt-in; WAL already lets readers run alongside a writer.
+SHARED_CACHE = os.getenv('DATABASE_SHARED_CACHE', '0').lower() in ('1', 'true', 'yes')
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection that remembers which named statements it has prepared.
+
+    The bookkeeping mirrors sqlite3's own LRU statement cache, so it tells whether
+    running a named query reuses a prepared statement or compiles a new one.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = OrderedDict()
+        # (table, serverId) writes of the open transaction, announced once it commits
+        self.pendingWrites = set()
+
+    def prepare(self, name):
+        """Look up a named statement, returning its SQL and whether it was already prepared."""
+        sql = QUERIES[name]
+        if sql in self.prepared:
+            self.prepared.move_to_end(sql)
+            return sql, True
+        self.prepared[sql] = name
+        if len(self.prepared) > STATEMENT_CACHE_SIZE:
+            self.prepared.popitem(last=False)
+        return sql, False
+
+
+class ConnectionPool:
+    """Keeps a small set of warm SQLite connections and hands them out on demand.
+
+    Connections are opened in WAL mode with a busy timeout and their own prepared
+    statement cache. When every pooled connection is in use a fresh one is opened,
+    and it is closed again on release if the pool is already full.
+    """
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self._stats = {'opened': 0, 'reused': 0, 'closed': 0}
+        self._statementStats = {'hits': 0, 'misses': 0}
+
+    def _connect(self):
+        if SHARED_CACHE:
+            conn = sqlite3.connect(
+                'file:{}?cache=shared'.format(self.path),
+                uri=True,
+                timeout=BUSY_TIMEOUT_MS / 1000,
+                check_same_thread=False,
+                cached_statements=STATEMENT_CACHE_SIZE,
+                factory=PooledConnection
+            )
+        else:
+            conn = sqlite3.connect(
+                self.path,
+                timeout=BUSY_TIMEOUT_MS / 1000,
+                check_same_thread=False,
+                cached_statements=STATEMENT_CACHE_SIZE,
+                factory=PooledConnection
+            )
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA busy_timeout={}'.format(BUSY_TIMEOUT_MS))
+        return conn
+
+    def acquire(self):
+        """Take an idle connection from the pool, or open a new one."""
+        try:
+            conn = self._idle.get_nowait()
+            with self._lock:
+                self._stats['reused'] += 1
+            return conn
+        except queue.Empty:
+            conn = self._connect()
+            with self._lock:
+                self._stats['opened'] += 1
+            return conn
+
+    def release(self, conn):
+        """Return a connection to the pool, closing it if the pool is full."""
+        if conn.in_transaction:
+            conn.rollback()
+        conn.pendingWrites.clear()
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+            with self._lock:
+                self._stats['closed'] += 1
+
+    @contextmanager
+    def connection(self):
+        """Context manager around acquire/release."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def recordStatement(self, hit):
+        """Count a named statement lookup as a statement cache hit or miss."""
+        with self._lock:
+            self._statementStats['hits' if hit else 'misses'] += 1
+
+    def statementStats(self):
+        """Return hit and miss counts of the named statement cache."""
+        with self._lock:
+            stats = dict(self._statementStats)
+        total = stats['hits'] + stats['misses']
+        stats['hitRatio'] = (stats['hits'] / total) if total else 0.0
+        return stats
+
+    def stats(self):
+        """Return how often connections were reused versus freshly opened."""
+        with self._lock:
+            stats = dict(self._stats)
+        total = stats['opened'] + stats['reused']
+        stats['idle'] = self._idle.qsize()
+        stats['reuseRatio'] = (stats['reused'] / total) if total else 0.0
+        return stats
+
+    def closeAll(self):
+        """Close every idle connection held by the pool."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+            with self._lock:
+                self._stats['closed'] += 1
+
+
+pool = ConnectionPool(DB_PATH)
+
+
+# Connection of the transaction running on the current thread, if any
+_local = threading.local()
+
+# Callbacks told about every committed write, see onWrite()
+_writeListeners = []
+
 
 def get_connection():
-    """Get a database connection."""
-    return sqlite3.connect(DB_PATH)
+    """Get a database connection. Callers must close it when done."""
+    return pool._connect()
+
+def _currentTransaction():
+    return getattr(_local, 'conn', None)
+
+def inTransaction():
+    """Whether the current thread is inside a transaction."""
+    return _currentTransaction() is not None
+
+@contextmanager
+def _connection():
+    """Yield the enclosing transaction's connection, or a pooled one."""
+    conn = _currentTransaction()
+    if conn is not None:
+        yield conn
+    else:
+        with pool.connection() as conn:
+            yield conn
+
+def _commit(conn):
+    # writes inside a transaction are committed together when it ends
+    if _currentTransaction() is None:
+        conn.commit()
+
+def onWrite(listener):
+    """Register listener(table, serverId), called after a write to table commits.
+
+    serverId is None when the write was not limited to one server, and table is
+    None when the whole database was reset.
+    """
+    _writeListeners.append(listener)
+
+def notifyWrite(table, serverId=None):
+    """Announce a write, deferred until commit when made inside a transaction."""
+    conn = _currentTransaction()
+    if conn is not None:
+        conn.pendingWrites.add((table, serverId))
+    else:
+        _announceWrites([(table, serverId)])
+
+def _announceWrites(writes):
+    for table, serverId in writes:
+        for listener in _writeListeners:
+            listener(table, serverId)
+
+def beginTransaction():
+    """Take a pooled connection and open a write transaction on it."""
+    conn = pool.acquire()
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+    except Exception:
+        pool.release(conn)
+        raise
+    return conn
+
+def commitTransaction(conn):
+    """Commit a transaction from beginTransaction and return its connection to the pool."""
+    writes = list(conn.pendingWrites)
+    try:
+        conn.commit()
+    finally:
+        pool.release(conn)
+    _announceWrites(writes)
+
+def rollbackTransaction(conn):
+    """Roll back a transaction from beginTransaction and return its connection to the pool."""
+    try:
+        conn.rollback()
+    finally:
+        pool.release(conn)
+
+@contextmanager
+def transaction():
+    """Unit of work: every write made inside the block is committed once, atomically.
+
+    Helpers such as executeQuery or saveAlliance called inside the block join the
+    transaction instead of committing on their own, and any error rolls all of it
+    back. Nested blocks join the outermost transaction; if one of them fails the
+    outer transaction is rolled back too, even when the error was handled.
+    """
+    if _currentTransaction() is not None:
+        try:
+            yield _currentTransaction()
+        except BaseException:
+            _local.failed = True
+            raise
+        return
+
+    conn = beginTransaction()
+    _local.conn = conn
+    _local.failed = False
+    try:
+        yield conn
+    except BaseException:
+        _local.conn = None
+        rollbackTransaction(conn)
+        raise
+    _local.conn = None
+    if _local.failed:
+        rollbackTransaction(conn)
+        raise sqlite3.DatabaseError('a nested unit of work failed, transaction rolled back')
+    commitTransaction(conn)
+
+def runTransaction(func, *args, **kwargs):
+    """Call func inside transaction(), so every write it makes is committed once."""
+    with transaction():
+        return func(*args, **kwargs)
+
+def getPoolStats():
+    """Get connection reuse statistics for the shared pool."""
+    return pool.stats()
 
-def queryDatabase(sql):
+def getStatementCacheStats():
+    """Get hit/miss statistics for named statements."""
+    return pool.statementStats()
+
+def getQueryProfile(limit=10):
+    """Get timing summaries of the statements with the most total time."""
+    return profiler.report(limit=limit)
+
+def queryDatabase(sql, params=None):
     """Execute a SELECT query and return results."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute(sql)
-        results = cursor.fetchall()
-        conn.close()
-        return results
+        with _connection() as conn:
+            return profiler.execute(conn, sql, params or (), fetch=True)
     except Exception as e:
+        if _currentTransaction() is not None:
+            raise
         print(f"Database query error: {e}")
         return []
 
 def executeQuery(sql, params=None):
     """Execute an INSERT, UPDATE, or DELETE query."""
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        if params:
-            cursor.execute(sql, params)
-        else:
-            cursor.execute(sql)
-        conn.commit()
-        conn.close()
-        return True
+        with _connection() as conn:
+            profiler.execute(conn, sql, params or ())
+            _commit(conn)
+            return True
     except Exception as e:
+        if _currentTransaction() is not None:
+            raise
         print(f"Database execute error: {e}")
         return False
 
+def fetchNamed(name, params=()):
+    """Run a named SELECT from utils/queries.py and return results."""
+    try:
+        with _connection() as conn:
+            sql, hit = conn.prepare(name)
+            pool.recordStatement(hit)
+            return profiler.execute(conn, sql, params, name=name, fetch=True)
+    except Exception as e:
+        if _currentTransaction() is not None:
+            raise
+        print(f"Database query error ({name}): {e}")
+        return []
+
+def executeNamed(name, params=()):
+    """Run a named INSERT, UPDATE, or DELETE from utils/queries.py."""
+    try:
+        with _connection() as conn:
+            sql, hit = conn.prepare(name)
+            pool.recordStatement(hit)
+            profiler.execute(conn, sql, params, name=name)
+            _commit(conn)
+            return True
+    except Exception as e:
+        if _currentTransaction() is not None:
+            raise
+        print(f"Database execute error ({name}): {e}")
+        return False
+
 # Alliance and Server management functions
 def saveAlliance(serverId, allianceId, subAlliance=0):
     """Save alliance information."""
@@ -44,15 +342,25 @@ def saveAlliance(serverId, allianceId, subAlliance=0):
         INSERT OR REPLACE INTO Alliance (ServerID, AllianceID, SubAlliance)
         VALUES (?, ?, ?)
     '''
-    return executeQuery(sql, (serverId, allianceId, subAlliance))
+    saved = executeQuery(sql, (serverId, allianceId, subAlliance))
+    notifyWrite('Alliance', serverId)
+    return saved
 
 def saveSettings(serverId, allianceName, manualRegister, createChannel, channelCategory, allowAllyIntelAccess=0):
-    """Save server settings."""
+    """Save server settings, keeping the warpoints channel."""
     sql = '''
-        INSERT OR REPLACE INTO Server (ServerID, AllianceName, ManualRegister, CreateChannel, ChannelCategory, AllowAllyIntelAccess)
+        INSERT INTO Server (ServerID, AllianceName, ManualRegister, CreateChannel, ChannelCategory, AllowAllyIntelAccess)
         VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (ServerID) DO UPDATE SET
+            AllianceName = excluded.AllianceName,
+            ManualRegister = excluded.ManualRegister,
+            CreateChannel = excluded.CreateChannel,
+            ChannelCategory = excluded.ChannelCategory,
+            AllowAllyIntelAccess = excluded.AllowAllyIntelAccess
     '''
-    return executeQuery(sql, (serverId, allianceName, manualRegister, createChannel, channelCategory, allowAllyIntelAccess))
+    saved = executeQuery(sql, (serverId, allianceName, manualRegister, createChannel, channelCategory, allowAllyIntelAccess))
+    notifyWrite('Server', serverId)
+    return saved
 
 def saveGeneralInfo(serverId, homeInfo='', roeRules='', alliesInfo='', napInfo='', cogInfo='', kosInfo='', warInfo=''):
     """Save general alliance information."""
@@ -60,17 +368,26 @@ def saveGeneralInfo(serverId, homeInfo='', roeRules='', alliesInfo='', napInfo='
         INSERT OR REPLACE INTO GeneralAllianceInfo (ServerID, HomeInfo, RoeRules, AlliesInfo, NAPInfo, COGInfo, KosInfo, WarInfo)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?)
     '''
-    return executeQuery(sql, (serverId, homeInfo, roeRules, alliesInfo, napInfo, cogInfo, kosInfo, warInfo))
+    saved = executeQuery(sql, (serverId, homeInfo, roeRules, alliesInfo, napInfo, cogInfo, kosInfo, warInfo))
+    notifyWrite('GeneralAllianceInfo', serverId)
+    return saved
 
 def setNewMaster(serverId, allianceId):
     """Set a new master alliance."""
-    # First, set all alliances as sub-alliances
-    sql1 = '''UPDATE Alliance SET SubAlliance = 1 WHERE ServerID = ?'''
-    executeQuery(sql1, (serverId,))
-    
-    # Then set the specified alliance as master
-    sql2 = '''UPDATE Alliance SET SubAlliance = 0 WHERE ServerID = ? AND AllianceID = ?'''
-    return executeQuery(sql2, (serverId, allianceId))
+    try:
+        with transaction():
+            # First, set all alliances as sub-alliances
+            sql1 = '''UPDATE Alliance SET SubAlliance = 1 WHERE ServerID = ?'''
+            executeQuery(sql1, (serverId,))
+
+            # Then set the specified alliance as master
+            sql2 = '''UPDATE Alliance SET SubAlliance = 0 WHERE ServerID = ? AND AllianceID = ?'''
+            executeQuery(sql2, (serverId, allianceId))
+            notifyWrite('Alliance', serverId)
+        return True
+    except Exception as e:
+        print(f"Error setting new master alliance: {e}")
+        return False
 
 # Role permissions functions
 def saveRolePermissions(serverId, role, memberRole=0, ambassadorRole=0, allyRole=0, adminRole=0, accessAmbassadorChannels=0):
@@ -80,30 +397,135 @@ def saveRolePermissions(serverId, role, memberRole=0, ambassadorRole=0, allyRole
         (ServerID, Role, MemberRole, AmbassadorRole, AllyRole, AdminRole, AccessAmbassadorChannels)
         VALUES (?, ?, ?, ?, ?, ?, ?)
     '''
-    return executeQuery(sql, (serverId, role, memberRole, ambassadorRole, allyRole, adminRole, accessAmbassadorChannels))
+    saved = executeQuery(sql, (serverId, role, memberRole, ambassadorRole, allyRole, adminRole, accessAmbassadorChannels))
+    notifyWrite('AllianceRolePermissions', serverId)
+    return saved
 
 # War-related functions
-def incrementMemberKillCount(serverId, allianceId, playerName, killCount):
-    """Increment member kill count."""
+def incrementMemberKillCount(serverId, playerId, playerName, allianceId, kills=1):
+    """Add kills to a member's kill count, creating the member on their first kill.
+
+    A count left over from an earlier war season starts again from zero.
+    """
     sql = '''
-        INSERT OR REPLACE INTO AllianceMember (ServerID, AllianceID, PlayerName, KillCount)
-        VALUES (?, ?, ?, ?)
+        INSERT INTO AllianceMember (ServerID, AllianceID, PlayerID, PlayerName, KillCount, Season)
+        VALUES (?, ?, ?, ?, ?, (SELECT COALESCE(MAX(WarSeason), 1) FROM Server WHERE ServerID = ?))
+        ON CONFLICT (ServerID, PlayerID) DO UPDATE SET
+            KillCount = CASE WHEN Season = excluded.Season THEN KillCount + excluded.KillCount ELSE excluded.KillCount END,
+            Season = excluded.Season,
+            AllianceID = excluded.AllianceID,
+            PlayerName = excluded.PlayerName
     '''
-    return executeQuery(sql, (serverId, allianceId, playerName, killCount))
+    # not announced through notifyWrite: the kill writer hands the new counts
+    # straight to the leaderboards instead of having them reloaded
+    return executeQuery(sql, (serverId, allianceId, str(playerId), playerName, kills, serverId))
+
+# Rollup bucket sizes in seconds, by rollup table
+KILL_BUCKETS = {'KillRollupHourly': 3600, 'KillRollupDaily': 86400}
+
+def saveKillEvents(events):
+    """Append kill events and add them to the hourly and daily rollups.
+
+    events: list of (serverId, playerId, allianceId, kills, createdAt, messageId),
+    createdAt in unix epoch seconds
+    """
+    sql = '''
+        INSERT INTO KillEvent (ServerID, PlayerID, AllianceID, Kills, CreatedAt, MessageID)
+        VALUES (?, ?, ?, ?, ?, ?)
+    '''
+    with transaction():
+        for serverId, playerId, allianceId, n, createdAt, messageId in events:
+            executeQuery(sql, (serverId, str(playerId), allianceId, n, int(createdAt), messageId))
+
+        # one upsert per player and bucket, however many of their events fall in it
+        for table, size in KILL_BUCKETS.items():
+            buckets = {}
+            for serverId, playerId, allianceId, n, createdAt, _ in events:
+                key = (serverId, int(createdAt) // size * size, str(playerId))
+                buckets[key] = (allianceId, buckets[key][1] + n if key in buckets else n)
+
+            sql = '''
+                INSERT INTO {} (ServerID, Bucket, PlayerID, AllianceID, Kills)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (ServerID, Bucket, PlayerID) DO UPDATE SET
+                    Kills = Kills + excluded.Kills,
+                    AllianceID = excluded.AllianceID
+            '''.format(table)
+            for key, (allianceId, n) in buckets.items():
+                executeQuery(sql, key + (allianceId, n))
+
+def saveKills(kills, events=()):
+    """Apply a batch of kills in one transaction and return the new kill counts.
+
+    kills: list of (serverId, playerId, playerName, allianceId, kills)
+    events: the kill events of the batch, see saveKillEvents
+    Returns {(serverId, playerId): killCount}
+    """
+    counts = {}
+    with transaction():
+        for serverId, playerId, playerName, allianceId, n in kills:
+            incrementMemberKillCount(serverId, playerId, playerName, allianceId, n)
+        if events:
+            saveKillEvents(events)
+        for serverId, playerId, _, _, _ in kills:
+            res = fetchNamed('memberKillCount', (serverId, str(playerId)))
+            counts[(serverId, playerId)] = res[0][0] if res else 0
+    return counts
 
-def setWarPointsChannel(serverId, channelName):
+def endWarSeason(serverId, endedAt):
+    """Archive the standings of a guild's war season and start the next one.
+
+    Returns the number of the season that ended, None when the server is not set up.
+    """
+    with transaction():
+        res = queryDatabase('SELECT WarSeason FROM Server WHERE ServerID = ?', (serverId,))
+        if not res:
+            return None
+        season = res[0][0] or 1
+
+        executeQuery('''
+            INSERT OR REPLACE INTO WarSeasonStanding (ServerID, Season, PlayerID, AllianceID, PlayerName, KillCount)
+            SELECT ServerID, Season, PlayerID, AllianceID, PlayerName, KillCount
+            FROM AllianceMember
+            WHERE ServerID = ? AND Season = ? AND KillCount > 0
+        ''', (serverId, season))
+        executeQuery('''
+            INSERT OR REPLACE INTO WarSeason (ServerID, Season, EndedAt, Players, Kills)
+            SELECT ?, ?, ?, COUNT(*), COALESCE(SUM(KillCount), 0)
+            FROM WarSeasonStanding
+            WHERE ServerID = ? AND Season = ?
+        ''', (serverId, season, int(endedAt), serverId, season))
+
+        # member rows are left in place, their counts no longer match the season
+        executeQuery('UPDATE Server SET WarSeason = ? WHERE ServerID = ?', (season + 1, serverId))
+        notifyWrite('Server', serverId)
+        notifyWrite('AllianceMember', serverId)
+    return season
+
+def setWarPointsChannel(serverId, channelId, channelName=None):
     """Set war points channel."""
-    sql = '''UPDATE Server SET WarPointsChannel = ? WHERE ServerID = ?'''
-    return executeQuery(sql, (channelName, serverId))
+    sql = '''UPDATE Server SET WarPointsChannelID = ?, WarPointsChannel = ? WHERE ServerID = ?'''
+    saved = executeQuery(sql, (channelId, channelName, serverId))
+    notifyWrite('Server', serverId)
+    return saved
+
+def setLiveBoardMessage(serverId, messageId):
+    """Set the message ID of the live leaderboard, None to stop updating it."""
+    sql = '''UPDATE Server SET LiveBoardMessageID = ? WHERE ServerID = ?'''
+    saved = executeQuery(sql, (messageId, serverId))
+    notifyWrite('Server', serverId)
+    return saved
 
 # Resource management functions
-def saveResource(resource, tier, system, region, reliabilityScore):
-    """Save resource information."""
+def saveResource(resource, tier, system, region, reliabilityScore, level=None):
+    """Save resource information, level being the level of the system."""
     sql = '''
-        INSERT OR REPLACE INTO Resources (Resource, Tier, System, Region, ReliabilityScore)
-        VALUES (?, ?, ?, ?, ?)
+        INSERT OR REPLACE INTO Resources (Resource, Tier, System, Region, ReliabilityScore, Level)
+        VALUES (?, ?, ?, ?, ?, ?)
     '''
-    return executeQuery(sql, (resource, tier, system, region, reliabilityScore))
+    saved = executeQuery(sql, (resource, tier, system, region, reliabilityScore, level))
+    notifyWrite('Resources')
+    return saved
 
 # Intelligence functions
 def saveIntellegence(serverId, allianceId, aoa=0, cognap=0, playerKos=0, galacticKos=0, allianceKos=0, nap=0, war=0):
@@ -113,7 +535,9 @@ def saveIntellegence(serverId, allianceId, aoa=0, cognap=0, playerKos=0, galacti
         (ServerID, AllianceID, AoA, COGNAP, PlayerKos, GalacticKos, AllianceKos, NAP, War)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
     '''
-    return executeQuery(sql, (serverId, allianceId, aoa, cognap, playerKos, galacticKos, allianceKos, nap, war))
+    saved = executeQuery(sql, (serverId, allianceId, aoa, cognap, playerKos, galacticKos, allianceKos, nap, war))
+    notifyWrite('AllianceIntelligence', serverId)
+    return saved
 
 def savePlayerIntelligence(serverId, playerName, playerAlliance, lastUpdate):
     """Save player intelligence."""
@@ -146,10 +570,17 @@ def removeROE(serverId, allianceId, playerName):
 def deleteServerData(serverId):
     """Delete all data for a server."""
     tables = ['Server', 'Alliance', 'AllianceRolePermissions', 'AllianceMember', 
-              'AllianceIntelligence', 'PlayerIntelligence', 'GeneralAllianceInfo', 'ROE']
-    
-    for table in tables:
-        sql = f'DELETE FROM {table} WHERE ServerID = ?'
-        executeQuery(sql, (serverId,))
-    
+              'AllianceIntelligence', 'PlayerIntelligence', 'GeneralAllianceInfo', 'ROE',
+              'KillEvent', 'KillRollupHourly', 'KillRollupDaily', 'WarSeason', 'WarSeasonStanding',
+              'KillScreenshot']
+
+    try:
+        with transaction():
+            for table in tables:
+                sql = f'DELETE FROM {table} WHERE ServerID = ?'
+                executeQuery(sql, (serverId,))
+                notifyWrite(table, serverId)
+    except Exception as e:
+        print(f"Error deleting server data: {e}")
+        return False
     return True
\ No newline at end of file
@@ -0,0 +1,138 @@
+import asyncio
+import io
+import os
+import discord
+from utils.emoji_registry import STFC_EMOJI_NAMES
+
+# Pillow is in requirements.txt. Without it the images are uploaded as shipped
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+    print("Pillow is not installed, STFC emoji images are uploaded without shrinking them")
+
+# Emoji images shipped with the bot, one <name>.png per STFC emoji
+IMG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'img')
+EMOJI_ZIP = 'data_stfc_emojis.zip'
+
+# Side of the square emoji images are shrunk to fit in
+EMOJI_SIZE = 128
+# Discord rejects emoji images larger than this
+MAX_EMOJI_BYTES = 256 * 1024
+
+# Most emojis uploaded to a guild at once
+EMOJI_UPLOAD_CONCURRENCY = int(os.getenv('EMOJI_UPLOAD_CONCURRENCY', '2'))
+# Attempts per emoji when Discord is rate limiting or failing
+EMOJI_UPLOAD_RETRIES = int(os.getenv('EMOJI_UPLOAD_RETRIES', '3'))
+# Longest rate limit waited out, longer ones fail the emoji
+EMOJI_MAX_RETRY_WAIT = float(os.getenv('EMOJI_MAX_RETRY_WAIT', '60'))
+
+
+def prepareEmojiImage(data):
+    """PNG bytes of an emoji image, shrunk to EMOJI_SIZE and optimized when Pillow is installed.
+
+    The shipped bytes are kept when they are already the smaller ones.
+    """
+    if Image is None:
+        return data
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img = img.convert('RGBA')
+            img.thumbnail((EMOJI_SIZE, EMOJI_SIZE), Image.LANCZOS)
+            out = io.BytesIO()
+            img.save(out, 'PNG', optimize=True)
+    except Exception as e:
+        print(f"Error preparing emoji image: {e}")
+        return data
+    return out.getvalue() if out.tell() < len(data) else data
+
+
+class EmojiAssets:
+    """The STFC emoji images and the emoji zip, read into memory once at startup."""
+
+    def __init__(self, directory=IMG_DIR):
+        self.directory = directory
+        self.images = {}
+        self.zipData = None
+
+    def load(self):
+        """Read and prepare every image. Blocking, run it off the event loop."""
+        images = {}
+        for name in STFC_EMOJI_NAMES:
+            try:
+                with open(os.path.join(self.directory, name + '.png'), 'rb') as f:
+                    data = prepareEmojiImage(f.read())
+            except OSError as e:
+                print(f"Error reading emoji image {name}: {e}")
+                continue
+            if len(data) > MAX_EMOJI_BYTES:
+                print(f"Emoji image {name} is larger than {MAX_EMOJI_BYTES} bytes, install Pillow to shrink it")
+                continue
+            images[name] = data
+        self.images = images
+
+        try:
+            with open(os.path.join(self.directory, EMOJI_ZIP), 'rb') as f:
+                self.zipData = f.read()
+        except OSError as e:
+            print(f"Error reading {EMOJI_ZIP}: {e}")
+        return self
+
+    def zipFile(self):
+        """The emoji zip as a discord.File, None when it could not be read."""
+        if self.zipData is None:
+            return None
+        return discord.File(io.BytesIO(self.zipData), filename=EMOJI_ZIP)
+
+
+emojiAssets = EmojiAssets()
+
+
+async def createEmoji(guild, name, image, reason):
+    """Create one emoji, retrying rate limits and server errors. Returns (emoji, error)."""
+    for attempt in range(EMOJI_UPLOAD_RETRIES):
+        try:
+            return await guild.create_custom_emoji(name=name, image=image, reason=reason), None
+        except discord.Forbidden:
+            return None, 'missing the Manage Emojis permission'
+        except discord.RateLimited as e:
+            # raised by discord.py for rate limits longer than it waits out itself
+            if e.retry_after > EMOJI_MAX_RETRY_WAIT:
+                return None, 'rate limited, retry in {} minutes'.format(round(e.retry_after / 60) or 1)
+            await asyncio.sleep(e.retry_after)
+        except discord.HTTPException as e:
+            if e.status != 429 and e.status < 500:
+                return None, e.text or 'rejected by Discord'
+            await asyncio.sleep(2 ** attempt)
+    return None, 'Discord kept failing, try again later'
+
+
+async def provisionEmojis(guild, registry, reason):
+    """Upload the STFC emojis a guild is missing.
+
+    At most EMOJI_UPLOAD_CONCURRENCY uploads run at once, and never more than
+    the guild has free emoji slots. Returns (created, failed), created being
+    the new emojis and failed a list of (name, reason).
+    """
+    missing = registry.missing()
+    failed = [(name, 'image not available') for name in missing if name not in emojiAssets.images]
+    toCreate = [name for name in missing if name in emojiAssets.images]
+
+    slots = guild.emoji_limit - sum(1 for e in guild.emojis if not e.animated)
+    if len(toCreate) > slots:
+        failed += [(name, 'no free emoji slot') for name in toCreate[max(slots, 0):]]
+        toCreate = toCreate[:max(slots, 0)]
+
+    semaphore = asyncio.Semaphore(EMOJI_UPLOAD_CONCURRENCY)
+
+    async def upload(name):
+        async with semaphore:
+            return name, await createEmoji(guild, name, emojiAssets.images[name], reason)
+
+    created = []
+    for name, (emoji, error) in await asyncio.gather(*[upload(name) for name in toCreate]):
+        if emoji is not None:
+            created.append(emoji)
+        else:
+            failed.append((name, error))
+    return created, failed
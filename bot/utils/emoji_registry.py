@@ -0,0 +1,65 @@
+from utils.search_filter import RESOURCES, REGIONS
+
+# Names of the STFC emojis, as shipped in img/ and img/data_stfc_emojis.zip
+STFC_EMOJI_NAMES = RESOURCES + REGIONS + ('0star', '2star', '3star', '4star')
+STFC_EMOJI_SET = frozenset(STFC_EMOJI_NAMES)
+
+
+class EmojiRegistry:
+    """The STFC emojis of one guild, by lower-cased name.
+
+    Built with one pass over the guild's emojis, so looking up an emoji or
+    whether the guild has all of them is a dict lookup afterwards.
+    """
+
+    def __init__(self, emojis=()):
+        self.emojis = {}
+        for e in emojis:
+            name = e.name.lower()
+            if name in STFC_EMOJI_SET and name not in self.emojis:
+                self.emojis[name] = e
+        self.complete = len(self.emojis) == len(STFC_EMOJI_NAMES)
+        # key of the pages rendered with these emojis, see utils/resource_pages.py
+        self.fingerprint = tuple(sorted((name, e.id) for name, e in self.emojis.items())) if self.complete else None
+
+    def get(self, name):
+        """The emoji called name, '' when the guild does not have it."""
+        return self.emojis.get(str(name).lower(), '')
+
+    def missing(self):
+        """Names of the STFC emojis the guild does not have."""
+        return [name for name in STFC_EMOJI_NAMES if name not in self.emojis]
+
+
+def getEmojiRegistry(emojis):
+    """emojis as an EmojiRegistry, building one when given a list of emojis."""
+    return emojis if isinstance(emojis, EmojiRegistry) else EmojiRegistry(emojis)
+
+
+class EmojiRegistries:
+    """EmojiRegistry of every guild, built on first use.
+
+    The resources cog replaces a guild's registry from on_guild_emojis_update
+    and drops it when the bot leaves the guild.
+    """
+
+    def __init__(self):
+        self._registries = {}
+
+    def get(self, guild):
+        registry = self._registries.get(guild.id)
+        if registry is None:
+            registry = self._registries[guild.id] = EmojiRegistry(guild.emojis)
+        return registry
+
+    def update(self, guild, emojis):
+        """Rebuild a guild's registry from its new emojis. Returns the old one, or None."""
+        old = self._registries.get(guild.id)
+        self._registries[guild.id] = EmojiRegistry(emojis)
+        return old
+
+    def remove(self, guildId):
+        self._registries.pop(guildId, None)
+
+
+emojiRegistries = EmojiRegistries()
@@ -1,8 +1,19 @@
 import sys
+import re
+import time
 import datetime
 from datetime import timedelta
 from utils.data_database import resetAllianceDatabase, createAllianceTables
-from utils.db import queryDatabase, removeROE
+from utils.db import fetchNamed, removeROE, transaction, inTransaction, KILL_BUCKETS
+from utils.queries import KILL_ROLLUPS
+from utils.guild_settings import getGuildSettings, MEMBER, AMBASSADOR, ALLY, ADMIN, ACCESS_AMBASSADOR_CHANNELS
+from utils.intel_snapshot import getIntelSnapshot, STANDINGS, GENERAL
+from utils.nickname import parseNickname
+from utils.page_sources import KeysetPages
+from utils.resource_index import resourceIndex
+from utils.search_filter import compileFilter
+from utils.emoji_registry import EmojiRegistry, getEmojiRegistry, STFC_EMOJI_SET
+from utils.table import Column, renderTable
 from utils.constants import ORDERED_REACTIONS, IN_MESSAGE_REACTIONS
 
 
@@ -15,112 +26,153 @@ from utils.constants import ORDERED_REACTIONS, IN_MESSAGE_REACTIONS
 
 
 def getPlayerIntel(serverId, allianceId, player):
-    sql = '''
-        SELECT *
-        FROM PlayerIntelligence
-        WHERE ServerID={}
-        AND PlayerName="{}"
-    '''.format(serverId, player)
-    res = queryDatabase(sql)
+    res = fetchNamed('playerIntel', (serverId, player))
     if len(res):
         return res[0]
     return []
 
 def getIntelPlayers(serverId):
-    sql = '''
-        SELECT *
-        FROM PlayerIntelligence
-        WHERE ServerID={}
-        ORDER BY PlayerAlliance, LastUpdate DESC
-    '''.format(serverId)
-    res = queryDatabase(sql)
+    res = fetchNamed('intelPlayers', (serverId,))
     if len(res):
         return res
     return []   
 
+def getIntelPlayerPages(serverId):
+    """KeysetPages of the PlayerIntelligence rows of a server, in getIntelPlayers order."""
+    def cursorOf(row):
+        alliance, updated = row[2] or '', row[3] or ''
+        return alliance, alliance, alliance, updated, updated, row[1]
+    return KeysetPages('intelPlayerPages', (serverId,), cursorOf)
+
 def getWarPointsChannel(serverId):
-    sql = '''
-        SELECT WarPointsChannel
-        FROM Server
-        WHERE ServerID={}
-    '''.format(serverId)
-    res = queryDatabase(sql)
-    if len(res):
-        return res[0][0]
-    return ''
+    return getGuildSettings(serverId).warPointsChannelId
+
 
+def getLiveBoardMessage(serverId):
+    return getGuildSettings(serverId).liveBoardMessageId
 
 
-    sql += ' ORDER BY KillCount desc'
+def getTotalKillCounts(serverId):
+    resp = fetchNamed('totalKillCounts', (serverId,))
+    if len(resp):
+        return  resp[0][0]
+    return 0
 
-    resp = queryDatabase(sql)
+
+def getMemberKillCounts(serverId, alliance):
+    if alliance:
+        resp = fetchNamed('allianceMemberKillCounts', (serverId, alliance))
+    else:
+        resp = fetchNamed('memberKillCounts', (serverId,))
 
     if not len(resp):
         return ['**No Player Kill Counts']
     return resp
 
 
-def getTotalKillCounts(serverId):
-    sql = '''
-        SELECT SUM(KillCount)
-        FROM AllianceMember
-        WHERE ServerID={}
-    '''.format(serverId)
-    resp = queryDatabase(sql)
-    if len(resp):
-        return  resp[0][0]
-    return 0
+# Windows of recent kills, e.g. 24h or 7d: hours are read from the hourly
+# rollups and days from the daily ones
+KILL_WINDOW = re.compile(r'^(\d{1,4})([hd])$', re.IGNORECASE)
+KILL_WINDOW_SIZES = {'h': 'hourly', 'd': 'daily'}
 
+def parseKillWindow(arg):
+    """(rollup size, number of buckets) of a window like 24h or 7d, None when arg is not one."""
+    match = KILL_WINDOW.match(arg or '')
+    if not match or int(match.group(1)) < 1:
+        return None
+    return KILL_WINDOW_SIZES[match.group(2).lower()], int(match.group(1))
 
-def getMemberKillCounts(serverId, alliance):
-    sql = '''
-        SELECT AllianceID, PlayerName, KillCount
-        FROM AllianceMember
-        WHERE ServerID={}
-    '''.format(serverId)
 
+def getKillWindowStart(size, span, now=None):
+    """Start of the first of the last span buckets, the current bucket included."""
+    bucket = KILL_BUCKETS[KILL_ROLLUPS[size]]
+    now = int(time.time() if now is None else now)
+    return now // bucket * bucket - (span - 1) * bucket
+
+
+def getWindowKillCounts(serverId, alliance, size, span, now=None):
+    """(AllianceID, PlayerName, KillCount) of the kills in a window, like getMemberKillCounts."""
+    since = getKillWindowStart(size, span, now)
     if alliance:
-        sql += ' AND AllianceID="{}"'.format(alliance)
+        return fetchNamed('windowKills:{}:alliance'.format(size), (serverId, since, alliance))
+    return fetchNamed('windowKills:' + size, (serverId, since))
 
-    sql += ' ORDER BY KillCount desc'
 
-    resp = queryDatabase(sql)
+def getKillTrend(serverId, alliance, size, span, now=None):
+    """(bucket start, kills) of every bucket in a window, oldest first, empty buckets included."""
+    since = getKillWindowStart(size, span, now)
+    if alliance:
+        resp = fetchNamed('killTrend:{}:alliance'.format(size), (serverId, since, alliance))
+    else:
+        resp = fetchNamed('killTrend:' + size, (serverId, since))
 
-    if not len(resp):
-        return ['**No Player Kill Counts']
-    return resp
-    
+    bucket = KILL_BUCKETS[KILL_ROLLUPS[size]]
+    kills = dict(resp)
+    return [(since + i * bucket, kills.get(since + i * bucket, 0)) for i in range(span)]
 
-def getFormattedMemberKillCounts(playerKills):
+
+def getWarSeason(serverId):
+    res = fetchNamed('warSeason', (serverId,))
+    return res[0][0] if res else 1
+
+
+def getWarSeasons(serverId):
+    """(Season, EndedAt, Players, Kills) of a guild's ended war seasons, latest first."""
+    return fetchNamed('warSeasons', (serverId,))
+
+
+def getSeasonKills(serverId, season, alliance):
+    if alliance:
+        res = fetchNamed('allianceSeasonKills', (serverId, season, alliance))
+    else:
+        res = fetchNamed('seasonKills', (serverId, season))
+    return res[0][0] if res else 0
+
+
+def getSeasonStandingPages(serverId, season, alliance):
+    """KeysetPages of (AllianceID, PlayerName, KillCount, rowid) of an ended war season, best first."""
+    if alliance:
+        return KeysetPages('allianceSeasonStandingPages', (serverId, season, alliance), lambda r: (r[2], r[2], r[2], r[3]))
+    return KeysetPages('seasonStandingPages', (serverId, season), lambda r: (r[2], r[2], r[2], r[3]))
+
+
+def getFormattedWarSeasons(seasons):
+
+    resultStr = ''
+    for season, endedAt, players, kills in seasons:
+        ended = datetime.datetime.fromtimestamp(endedAt, datetime.timezone.utc).strftime('%Y-%m-%d')
+        resultStr += '`Season {:<4}` `ended {}` `{:>4} players` `{:>6} kills`\n'.format(season, ended, players, kills)
+
+    return resultStr
+
+
+def getFormattedKillTrend(trend, size):
 
     resultStr = ''
-    for player in playerKills:
-        i = len(player[0])
-        resultStr += '`{}'.format(player[0])
-        while i < 5:
-            i += 1
-            resultStr += '.'
-        resultStr += '` '
-
-        i = len(player[1])
-        resultStr += '`{}'.format(player[1])
-        while i < 18:
-            i += 1
-            resultStr += '.'
-        resultStr += '` '
-        resultStr += '`{}`\n'.format(player[2])
+    most = max([kills for _, kills in trend] + [1])
+    dateFormat = '%m-%d %H:00' if size == 'hourly' else '%Y-%m-%d'
+    for bucket, kills in trend:
+        day = datetime.datetime.fromtimestamp(bucket, datetime.timezone.utc)
+        resultStr += '`{}` `{:>5}` {}\n'.format(day.strftime(dateFormat), kills, '\u2588' * round(kills * 20 / most))
 
     return resultStr
+    
+
+# `TEST.` `Kirk..............` `12`
+KILL_COUNT_COLUMNS = [
+    Column(0, 5),
+    Column(1, 18),
+    Column(2),
+]
+
+
+def getFormattedMemberKillCounts(playerKills):
+    return renderTable(playerKills, KILL_COUNT_COLUMNS)
 
 
 
 def getKillCount(playerId):
-    sql = '''
-        SELECT KillCount
-        FROM AllianceMember
-        WHERE PlayerID="{}"
-    '''.format(playerId)
-    res = queryDatabase(sql)
+    res = fetchNamed('killCount', (str(playerId),))
 
     if len(res):
         return res[0][0]
@@ -128,38 +180,27 @@ def getKillCount(playerId):
 
 
 
+# date: String, a mm/dd/yyyy date
+def getShortDate(date):
+    strpDate = date.split('/')
+    strpDate = '{}/{}/{}'.format(strpDate[0], strpDate[1], strpDate[2][2:])
+    return strpDate if strpDate else 'Unknown'
+
+
+# `TEST.` `Kirk..............` **01/02/24**
+PLAYER_LIST_COLUMNS = [
+    Column(lambda player: player[2] if player[2] else '????', 5),
+    Column(3, 18),
+    Column(lambda player: getShortDate(player[6]), wrap='**'),
+]
+
+
 def getFormattedPlayersList(players):
-    
-    resultStr = ''
-    for player in players:
-        i = len(player[2]) if player[2] else 4
-        resultStr += '`{}'.format(player[2] if player[2] else '????')
-        while i < 5:
-            i += 1
-            resultStr += '.'
-        resultStr += '` '
-
-        i = len(player[3])
-        resultStr += '`{}'.format(player[3])
-        while i < 18:
-            i += 1
-            resultStr += '.'
-        resultStr += '` '
-
-        strpDate = player[6].split('/')
-        strpDate = '{}/{}/{}'.format(strpDate[0], strpDate[1], strpDate[2][2:])
-        resultStr += '**{}**\n'.format(strpDate if strpDate else 'Unknown')
-    return resultStr
+    return renderTable(players, PLAYER_LIST_COLUMNS)
 
 def cleanROEviolations(serverId, query):
     now = datetime.datetime.now()
-    sql = '''
-        SELECT LastUpdated, AllianceID, PlayerName
-        FROM ROE
-        WHERE ServerID={}
-    '''.format(serverId) 
-
-    results = queryDatabase(sql)
+    results = fetchNamed('roeDates', (serverId,))
     for r in results:
         dateObj = datetime.datetime.strptime('{} {}'.format(r[0], '12:00:00.0'), '%Y-%m-%d %H:%M:%S.%f')
         diff = now - dateObj
@@ -174,259 +215,112 @@ def cleanROEviolations(serverId, query):
 
 def getROEViolations(serverId, query):
     cleanROEviolations(serverId, query)
-    sql = '''
-        SELECT AllianceID, Violations, PlayerName
-        FROM ROE
-        WHERE ServerID={}
-    '''.format(serverId)
-
     if query:
-        sql += 'AND AllianceID="{}"'.format(query)
-    resp = queryDatabase(sql)
+        resp = fetchNamed('allianceRoeViolations', (serverId, query))
+    else:
+        resp = fetchNamed('roeViolations', (serverId,))
 
     if not len(resp):
         return ['**No ROE Violations']
     return resp
     
 
+def getROEViolationPages(serverId, query):
+    """KeysetPages of (AllianceID, Violations, PlayerName, rowid) ROE violations, of one alliance when query is given."""
+    cleanROEviolations(serverId, query)
+    if query:
+        return KeysetPages('allianceRoeViolationPages', (serverId, query), lambda r: (r[3],), 10)
+    return KeysetPages('roeViolationPages', (serverId,), lambda r: (r[3],), 10)
+    
+
+# `[TEST].` `Kirk...........` `2 count`
+ROE_VIOLATION_COLUMNS = [
+    Column(lambda r: '[{}]'.format(r[0].upper() if r[0].lower() != 'n/a' else '????'), 7),
+    Column(lambda r: r[2] if r[2] != None else '.', 15),
+    Column(lambda r: '{} count'.format(r[1])),
+]
+
+
 def getFormattedROEViolations(resp):
-    roeList = ''
-    for r in resp:
-        roeList += '`[{}]'.format(r[0].upper() if r[0].lower() != 'n/a' else '????')
-        i = len(r[0]) if r[0].lower() and r[0].lower() != 'n/a' else 4
-        while i < 5:
-            roeList += '.'
-            i += 1
-        roeList += '` '
-        roeList += '`{}'.format(r[2] if r[2] != None else '.')
-        i = len(r[2]) if r[2] != None else 1
-        while i < 15:
-            roeList += '.'
-            i += 1
-        roeList += '`'
-        roeList += ' `{} count`\n'.format(r[1])
-    return roeList
+    return renderTable(resp, ROE_VIOLATION_COLUMNS)
     
 
 def getAllies(serverId):
-    sql = '''
-        SELECT AllianceID
-        FROM AllianceIntelligence
-        WHERE ServerID={}
-        AND AoA=1
-    '''.format(serverId)
-    resp = queryDatabase(sql)
-    if len(resp):
-        reduced = reduceResults(resp)
-        strResult = ''
-        for r in reduced:
-            strResult += '{}, '.format(r) 
-        return strResult
-    return ''
+    return getIntelSnapshot(serverId, STANDINGS).intelList('AoA')
 
 
 def getCOG(serverId):
-    sql = '''
-        SELECT AllianceID
-        FROM AllianceIntelligence
-        WHERE ServerID={}
-        AND COGNAP=1
-    '''.format(serverId)
-    resp = queryDatabase(sql)
-    if len(resp):
-        reduced = reduceResults(resp)
-        strResult = ''
-        for r in reduced:
-            strResult += '{}, '.format(r) 
-        return strResult
-    return ''
+    return getIntelSnapshot(serverId, STANDINGS).intelList('COGNAP')
 
 
 def getPlayerKos(serverId):
-    sql = '''
-        SELECT AllianceID
-        FROM AllianceIntelligence
-        WHERE ServerID={}
-        AND PlayerKos=1
-    '''.format(serverId)
-    resp = queryDatabase(sql)
-    if len(resp):
-        reduced = reduceResults(resp)
-        strResult = ''
-        for r in reduced:
-            strResult += '{}, '.format(r) 
-        return strResult
-    return ''
+    return getIntelSnapshot(serverId, STANDINGS).intelList('PlayerKos')
 
 def getGalacticKos(serverId):
-    sql = '''
-        SELECT AllianceID
-        FROM AllianceIntelligence
-        WHERE ServerID={}
-        AND GalacticKos=1
-    '''.format(serverId)
-    resp = queryDatabase(sql)
-    if len(resp):
-        reduced = reduceResults(resp)
-        strResult = ''
-        for r in reduced:
-            strResult += '{}, '.format(r) 
-        return strResult
-    return ''
+    return getIntelSnapshot(serverId, STANDINGS).intelList('GalacticKos')
 
 def getAllianceKos(serverId):
-    sql = '''
-        SELECT AllianceID
-        FROM AllianceIntelligence
-        WHERE ServerID={}
-        AND AllianceKos=1
-    '''.format(serverId)
-    resp = queryDatabase(sql)
-    if len(resp):
-        reduced = reduceResults(resp)
-        strResult = ''
-        for r in reduced:
-            strResult += '{}, '.format(r) 
-        return strResult
-    return ''
+    return getIntelSnapshot(serverId, STANDINGS).intelList('AllianceKos')
 
 
 def getNaps(serverId):
-    sql = '''
-        SELECT AllianceID
-        FROM AllianceIntelligence
-        WHERE ServerID={}
-        AND NAP=1
-    '''.format(serverId)
-    resp = queryDatabase(sql)
-    if len(resp):
-        reduced = reduceResults(resp)
-        strResult = ''
-        for r in reduced:
-            strResult += '{}, '.format(r) 
-        return strResult
-    return ''
+    return getIntelSnapshot(serverId, STANDINGS).intelList('NAP')
 
 
 def getWar(serverId):
-    sql = '''
-        SELECT AllianceID
-        FROM AllianceIntelligence
-        WHERE ServerID={}
-        AND War=1
-    '''.format(serverId)
-    resp = queryDatabase(sql)
-    if len(resp):
-        reduced = reduceResults(resp)
-        strResult = ''
-        for r in reduced:
-            strResult += '{}, '.format(r) 
-        return strResult
-    return ''
+    return getIntelSnapshot(serverId, STANDINGS).intelList('War')
 
 
 def getRoeRules(serverId):
-    sql = '''
-        Select RoeRules
-        FROM GeneralAllianceInfo
-        WHERE ServerID={}
-    '''.format(serverId)
-    resp = queryDatabase(sql)
-    if len(resp):
-        return resp[0][0]
-    return ''
+    return getIntelSnapshot(serverId, GENERAL).generalInfo('roe')
 
 
 def getAlliesInfo(serverId):
-    sql = '''
-        Select AlliesInfo
-        FROM GeneralAllianceInfo
-        WHERE ServerID={}
-    '''.format(serverId)
-    resp = queryDatabase(sql)
-    if len(resp):
-        return resp[0][0]
-    return ''
+    return getIntelSnapshot(serverId, GENERAL).generalInfo('ally')
 
 
 def getNapInfo(serverId):
-    sql = '''
-        Select NAPInfo
-        FROM GeneralAllianceInfo
-        WHERE ServerID={}
-    '''.format(serverId)
-    resp = queryDatabase(sql)
-    if len(resp):
-        return resp[0][0]
-    return ''
+    return getIntelSnapshot(serverId, GENERAL).generalInfo('nap')
 
 
 def getCogInfo(serverId):
-    sql = '''
-        Select COGInfo
-        FROM GeneralAllianceInfo
-        WHERE ServerID={}
-    '''.format(serverId)
-    resp = queryDatabase(sql)
-    if len(resp):
-        return resp[0][0]
-    return ''
+    return getIntelSnapshot(serverId, GENERAL).generalInfo('cog')
 
 
 def getKosInfo(serverId):
-    sql = '''
-        Select KosInfo
-        FROM GeneralAllianceInfo
-        WHERE ServerID={}
-    '''.format(serverId)
-    resp = queryDatabase(sql)
-    if len(resp):
-        return resp[0][0]
-    return ''
+    return getIntelSnapshot(serverId, GENERAL).generalInfo('kos')
 
 
 def getWarInfo(serverId):
-    sql = '''
-        Select WarInfo
-        FROM GeneralAllianceInfo
-        WHERE ServerID={}
-    '''.format(serverId)
-    resp = queryDatabase(sql)
-    if len(resp):
-        return resp[0][0]
-    return ''
+    return getIntelSnapshot(serverId, GENERAL).generalInfo('war')
 
 
+# Comma separated intel, broken into lines of about newline entries.
+# Long lists are longer than an embed field allows, add them with addFieldChunks
 def getFieldIntel(inputStr, newline):
-    returnStr = ''
+    parts = []
     count = 0
     for a in inputStr.split(','):
         count += 1
         if count < newline:
-            returnStr += '{}, '.format(a)
+            parts.append('{}, '.format(a))
         else:
             count = 0
-            returnStr += '\n{}, '.format(a)
-    return returnStr[:(len(returnStr) - 2)]
+            parts.append('\n{}, '.format(a))
+    return ''.join(parts)[:-2]
 
 
 def getHomeInfo(serverId):
-    sql = '''
-        Select HomeInfo
-        FROM GeneralAllianceInfo
-        WHERE ServerID={}
-    '''.format(serverId)
-    resp = queryDatabase(sql)
-    if len(resp):
-        return resp[0][0]
-    return ''
+    return getIntelSnapshot(serverId, GENERAL).generalInfo('home')
 
 
-# emojis: List of dicrod emoji objects
+# emojis: An EmojiRegistry, or a list of discord emoji objects
 #  emoji: String, representing the name of emoji to get
 def getEmoji(emojis, emoji):
+    if isinstance(emojis, EmojiRegistry):
+        return emojis.get(emoji)
     for e in emojis:
-        if e.name.lower() == emoji.lower():
+        if e.name.lower() == str(emoji).lower():
             return e
     return ''
 
@@ -435,88 +329,34 @@ def getEmoji(emojis, emoji):
 #     tier: Integer value for stfc resouce grade (values 1, 2, 3, and 4)
 #   system: String representationf of the stfc system the resource is located in
 def getResourceReliability(resource, tier, system):
-    addition = ''
-    sql = '''
-        SELECT ReliabilityScore
-        FROM Resources
-        WHERE Resource="{}"
-        AND System="{}"
-    '''.format(resource.lower(), system.lower())
     if tier:
-        addition = ' AND Tier={}'.format(tier)
-
-    res = queryDatabase(sql + addition)
-    return res[0][0]
-
-
-# resource: String reperesentation of an stfc resource
-#     tier: Integer value for stfc resouce grade (values 1, 2, 3, and 4)
-#   region: String representation of the stfc region the resource is located in
-def getResourceResults(resource, tier, region):
-    sql = 'select * FROM Resources'
-    whereClause = ' WHERE'
-    filter = ''
-    numFilters = 0
-    if resource:
-        numFilters += 1
-        filter += ' Resource="{}"'.format(resource.lower())
-    if tier:
-        numFilters += 1
-        if numFilters > 1:
-            filter += ' AND Tier="{}"'.format(int(tier))
-        else:
-            filter += ' Tier="{}"'.format(int(tier))
-    if region:
-        numFilters += 1
-        if numFilters > 1:
-            filter += ' AND Region="{}"'.format(region.lower())
-        else:
-            filter += ' region="{}"'.format(region.lower())
+        res = fetchNamed('resourceReliabilityTier', (resource.lower(), system.lower(), int(tier)))
+    else:
+        res = fetchNamed('resourceReliability', (resource.lower(), system.lower()))
+    # 0 for a resource nobody reported yet
+    return res[0][0] if res else 0
 
-    if numFilters > 0:
-        sql = sql + whereClause
-    
-    return queryDatabase(sql+filter+' ORDER BY Resource == "dilithium", Resource, Tier DESC, Region')
 
+# searchFilter: A SearchFilter from getSearchFilter
+# Answered from the in-memory resource index, which is only read from the
+# database on first use and after a resource was saved. Inside a transaction
+# the filter runs as SQL, to see the transaction's own writes
+def getResourceResults(searchFilter):
+    if inTransaction():
+        return fetchNamed('resourceSearch', searchFilter.sqlParams())
+    return resourceIndex.get().search(searchFilter)
 
-#     args: A list of arguments, representing a resources search query
-#   footer: a string value of the footer for the resources embed
-# resource: String reperesentation of an stfc resource
-#     tier: Integer value for stfc resouce grade (values 1, 2, 3, and 4)
-#   system: String representationf of the stfc system the resource is located in
-def getSearchQuerys(args, footer, resource, region, tier):
-    footer = 'FILTERS:'
 
-    resource = tier = region = ''
-    # loop through search parameters, and set resource, region, and tier variable
-    for arg in args:
-        arg = str(arg)
-        if arg.lower() == 'crystal' or arg.lower() == 'ore' or arg.lower() == 'gas' or arg.lower() == 'dilithium' or arg.lower() == 'latinum':
-            footer += ' "{}" '.format(arg) # add filter name to footer for info purposes
-            resource = arg
-        if arg.lower() == 'federation' or arg.lower() == 'romulan' or arg.lower() == 'klingon' or arg.lower() == 'neutral':
-            footer += ' "{}" '.format(arg) # add filter name to footer for info purposes
-            region = arg
-        if arg[0] == '1' or arg[0] == '2' or arg[0] == '3' or arg[0] == '4':
-            footer += ' "grade {}" '.format(arg[0]) # add filter name to footer for info purposes
-            tier = arg[0]
-    
-    # If user did not include any search paramaters, then filters is none
-    if not len(args):
-        footer += 'none'
-
-    return footer, resource, region, tier
+# args: A list of arguments, representing a resources search query, e.g. gas ore 3+ -neutral level>=20
+# Returns the compiled SearchFilter, its footer text is searchFilter.describe()
+def getSearchFilter(args):
+    return compileFilter(args)
 
 
 #  nickname: string representation of users server nickname
 def getAllianceIdFromNick(nickname):
-    try:
-        nick = nickname.split()[0]
-        if (nick and nick[0] == '[' and nick[-1] == ']'):
-            return nick[1:(len(nick)-1)]
-        return None
-    except:
-        return None
+    parsed = parseNickname(nickname)
+    return parsed[0] if parsed else None
 
 
 # members: list of discord member objects
@@ -529,15 +369,9 @@ def getMember(member, members):
 
 
 def getMasterAllianceId(serverId):
-    sql = '''
-        SELECT AllianceID
-        FROM Alliance
-        WHERE ServerID={}
-        AND SubAlliance=0
-    '''.format(serverId)
-    res = queryDatabase(sql)
-    if res and len(res) > 0:
-        return res[0][0].upper()
+    masterId = getGuildSettings(serverId).masterAllianceId
+    if masterId:
+        return masterId.upper()
     return None
 
 
@@ -546,14 +380,7 @@ def getMasterAllianceId(serverId):
 #      roles: list of discord role objects
 # categories: list of discord category objects
 def getSettings(serverId, roles, categories):
-    sql = '''
-        SELECT S.AllianceName, S.CreateChannel, S.ChannelCategory, R.Role, R.MemberRole, R.AmbassadorRole, R.AllyRole, R.AdminRole, R.AccessAmbassadorChannels, S.AllowAllyIntelAccess
-        FROM Server AS S
-        JOIN AllianceRolePermissions As R ON S.ServerID=R.ServerID
-        WHERE S.ServerID={}
-    '''.format(serverId)
-
-    resp = queryDatabase(sql)
+    resp = fetchNamed('settings', (serverId,))
     memberRoles = []
     ambassadorRoles = []
     allyRoles = []
@@ -619,68 +446,32 @@ def getCategory(channels, category):
 
 # serverId: id for current server, from discord guild object
 def getAllianceIds(serverId):
-    sql = '''
-        SELECT A.AllianceID
-        FROM Alliance AS A
-        WHERE A.ServerID={}
-    '''.format(serverId)
-    res = queryDatabase(sql)
-    return reduceResults(res)
+    return getGuildSettings(serverId).allianceIds
 
 
 # serverId: id for current server, from discord guild object
 def getAllianceName(serverId):
-    sql = '''
-        SELECT S.AllianceName
-        FROM Server AS S
-        WHERE S.ServerID={}
-    '''.format(serverId)
-    res = queryDatabase(sql)
-    return res[0][0]
+    return getGuildSettings(serverId).allianceName
 
 
 # serverId: id for current server, from discord guild object
 def getMemberRoles(serverId):
-    sql = '''
-        SELECT R.Role
-        FROM AllianceRolePermissions AS R
-        WHERE R.ServerID={}
-        AND R.MemberRole=1
-    '''.format(serverId)
-    return reduceResults(queryDatabase(sql))
+    return getGuildSettings(serverId).rolesWith(MEMBER)
 
 
 # serverId: id for current server, from discord guild object
 def getAmbassadorRoles(serverId):
-    sql = '''
-        SELECT R.Role
-        FROM AllianceRolePermissions AS R
-        WHERE R.ServerID={}
-        AND R.AmbassadorRole=1
-    '''.format(serverId)
-    return reduceResults(queryDatabase(sql))
+    return getGuildSettings(serverId).rolesWith(AMBASSADOR)
 
 
 # serverId: id for current server, from discord guild object
 def getAllyRoles(serverId):
-    sql = '''
-        SELECT R.Role
-        FROM AllianceRolePermissions AS R
-        WHERE R.ServerID={}
-        AND R.AllyRole=1
-    '''.format(serverId)
-    return reduceResults(queryDatabase(sql))
+    return getGuildSettings(serverId).rolesWith(ALLY)
 
 
 # serverId: id for current server, from discord guild object
 def getAmbassadorCategory(serverId):
-    sql = '''
-        SELECT S.ChannelCategory
-        FROM Server AS S
-        WHERE S.ServerID={}
-    '''.format(serverId)
-    res = queryDatabase(sql)
-    return res[0][0]
+    return getGuildSettings(serverId).channelCategory
 
 
 
@@ -730,193 +521,78 @@ def selectedRole(selectedRoles, role):
 
 # serverId: id for current server, from discord guild object
 def manualRegisterAllowed(serverId):
-    sql = '''
-        SELECT S.ManualRegister
-        FROM Server AS S
-        WHERE S.ServerID={}
-    '''.format(serverId)
-    
-    res = queryDatabase(sql)
-    return res[0]
+    return getGuildSettings(serverId).manualRegister
 
 
 # serverId: id for current server, from discord guild object
 def createChannelAllowed(serverId):
-    sql = '''
-        SELECT S.CreateChannel
-        FROM Server AS S
-        WHERE S.ServerID={}
-    '''.format(serverId)
-    
-    res = queryDatabase(sql)
-    if len(res):
-        return res[0][0]
+    settings = getGuildSettings(serverId)
+    if settings.registered:
+        return settings.createChannel
     return False
 
 
 def hasIntel(serverId):
-    sql = '''
-        SELECT *
-        FROM AllianceIntelligence
-        WHERE ServerID={}
-    '''.format(serverId) 
-    res = queryDatabase(sql)
-    return len(res)
+    return getIntelSnapshot(serverId, STANDINGS).hasIntel
 
 def hasGeneralInfo(serverId):
-    sql = '''
-        SELECT *
-        FROM GeneralAllianceInfo
-        WHERE ServerID={}
-    '''.format(serverId) 
-    res = queryDatabase(sql)
-    return len(res)
+    return getIntelSnapshot(serverId, GENERAL).hasGeneralInfo
 
 
+# serverId: id for current server, from discord guild object
+# userRoles: list of discord role objects
 def isAllianceMember(serverId, userRoles):
-    for role in userRoles:
-        sql = '''
-            SELECT R.AdminRole
-            FROM AllianceRolePermissions AS R
-            WHERE R.ServerID={}
-            AND R.Role='{}'
-        '''.format(serverId, role.name.lower())
-        res = queryDatabase(sql)
-
-        if len(res) and res[0][0]:
-            return True
-
-        sql = '''
-            SELECT R.MemberRole
-            FROM AllianceRolePermissions AS R
-            WHERE R.ServerID={}
-            AND R.Role='{}'
-        '''.format(serverId, role.name.lower())
-        res = queryDatabase(sql)
-
-        if len(res) and res[0][0]:
-            return True
-    return False
+    # admin or member role
+    return getGuildSettings(serverId).hasPermission(ADMIN | MEMBER, [r.name for r in userRoles])
 
+# serverId: id for current server, from discord guild object
+# userRoles: list of discord role objects
 def isAllyWithIntelPermission(serverId, userRoles):
-    sql = '''
-        SELECT Role
-        From AllianceRolePermissions
-        WHERE ServerID={}
-        AND AllyRole=1
-        AND AmbassadorRole=0;
-    '''.format(serverId)
-    res = queryDatabase(sql) 
-    if len(res):
-        allyRole = res[0][0]
-        for role in userRoles:
-            if role.name.lower() == allyRole.lower():
-                return True
-    return False
+    # any ally role that is not also an ambassador role
+    settings = getGuildSettings(serverId)
+    allyRoles = settings.rolesMatching(ALLY, [r.name for r in userRoles])
+    return bool(allyRoles - settings.roleIndex[AMBASSADOR])
 
 
 # serverId: id for current server, from discord guild object
 #    roles: list of discord role objects
 def hasAdminPermission(serverId, roles):
-    for role in roles:
-        sql = '''
-            SELECT R.AdminRole
-            FROM AllianceRolePermissions AS R
-            WHERE R.ServerID={}
-            AND R.Role='{}'
-        '''.format(serverId, role.name.lower())
-
-        res = queryDatabase(sql)
-        if len(res) and res[0][0]:
-            return True
-    return False
+    return getGuildSettings(serverId).hasPermission(ADMIN, [r.name for r in roles])
 
 
 # serverId: id for current server, from discord guild object
 #     role: discord role object
 def canAccessPrivateChannel(serverId, role):
-    sql = '''
-        SELECT R.AccessAmbassadorChannels
-        FROM AllianceRolePermissions AS R
-        WHERE R.ServerID={}
-        AND R.Role='{}'
-    '''.format(serverId, role.name.lower())
-    
-    res = queryDatabase(sql)
-    if len(res):
-        return res[0][0]
-    return False
+    return getGuildSettings(serverId).hasPermission(ACCESS_AMBASSADOR_CHANNELS, [role.name])
+
+
+# serverId: id for current server, from discord guild object
+#    roles: list of discord role objects
+def getPrivateChannelRoles(serverId, roles):
+    allowed = getGuildSettings(serverId).rolesMatching(ACCESS_AMBASSADOR_CHANNELS, [r.name for r in roles])
+    return [r for r in roles if r.name.lower() in allowed]
 
 
 # serverId: Discord server id number
 def serverRegistered(serverId):
-    sql = '''
-        SELECT A.ServerID
-        FROM Alliance AS A
-        WHERE A.ServerID={}
-    '''.format(serverId)
-
-    res = queryDatabase(sql)
-    return len(res)
+    return len(getGuildSettings(serverId).alliances)
 
 
 #      serverId: Discord server id number
 # newAllianceId: String of new alliance id
 def isInAlliance(serverId, newAllianceId):
-    sql = '''
-        SELECT A.AllianceID
-        FROM Alliance AS A
-        WHERE A.ServerID={}
-    '''.format(serverId)
-    res = queryDatabase(sql)
-
-    for id in res:
-        if id[0].lower() == newAllianceId.lower():
-            return True
-    return False
+    return getGuildSettings(serverId).hasAlliance(newAllianceId)
 
 
+# emojis: An EmojiRegistry, or a list of discord emoji objects
 def hasSTFCEmojis(emojis):
-    numEmojisFound = 0
-    for e in emojis:
-        if e.name.lower() == 'crystal':
-            numEmojisFound += 1
-        if e.name.lower() == 'gas':
-            numEmojisFound += 1
-        if e.name.lower() == 'dilithium':
-            numEmojisFound += 1
-        if e.name.lower() == 'latinum':
-            numEmojisFound += 1
-        if e.name.lower() == 'ore':
-            numEmojisFound += 1
-        if e.name.lower() == 'federation':
-            numEmojisFound += 1
-        if e.name.lower() == 'neutral':
-            numEmojisFound += 1
-        if e.name.lower() == 'klingon':
-            numEmojisFound += 1
-        if e.name.lower() == 'romulan':
-            numEmojisFound += 1
-        if e.name[0] == '0':
-            numEmojisFound += 1
-        if e.name[0] == '2':
-            numEmojisFound += 1
-        if e.name[0] == '3':
-            numEmojisFound += 1
-        if e.name[0] == '4':
-            numEmojisFound += 1
-    return numEmojisFound == 13
+    return getEmojiRegistry(emojis).complete
 
 
 # reaction: A discord reaction object
 def checkForSTFCEmoji(reaction):
     try:
-        if reaction.emoji.name== 'crystal' or reaction.emoji.name == 'ore' or reaction.emoji.name == 'gas' or reaction.emoji.name == 'dilithium' or reaction.emoji.name == 'latinum':
-            return True
-        if reaction.emoji.name == 'federation' or reaction.emoji.name == 'romulan' or reaction.emoji.name == 'klingon' or reaction.emoji.name == 'neutral':
-            return True
-        if reaction.emoji.name[0] == '1' or reaction.emoji.name[0] == '2' or reaction.emoji.name[0] == '3' or reaction.emoji.name[0] == '4':
-            return True
+        return reaction.emoji.name.lower() in STFC_EMOJI_SET
     except:
         return False 
 
@@ -928,18 +604,28 @@ def checkForSTFCEmoji(reaction):
 
 
 
-# emojis: A list of discord Emoji objects
+# `ore.......` `3*` `Sol(Federation)...........` `federation`
+RESOURCE_COLUMN = Column(4, 10)
+TIER_COLUMN = Column(lambda vals: '{}*'.format(vals[5]) if vals[5] else '', 2)
+# to keep things nice and tidy, format system name to be MIN 14 characters long
+SYSTEM_COLUMN = Column(lambda vals: '{}({})'.format(vals[1], vals[2]), lambda vals: 16 + len(vals[2]))
+REGION_COLUMN = Column(3)
+RESOURCE_COLUMNS = [RESOURCE_COLUMN, TIER_COLUMN, SYSTEM_COLUMN, REGION_COLUMN]
+
+
+# emojis: An EmojiRegistry, or a list of discord Emoji objects
 #   vals: list of Strings representing resource search params
 def prepareResourceResults(emojis, vals):
-    resource      = '`{}{}`'.format(vals[4], '.' * (10 - len(vals[4])))
-    tier          = '`{}*`'.format(vals[5]) if vals[5] else '`..`'
-    region        = '`{}`'.format(vals[3])
-    hasEmojis     = hasSTFCEmojis(emojis)
+    emojis        = getEmojiRegistry(emojis)
+    resource      = RESOURCE_COLUMN.render(vals)
+    tier          = TIER_COLUMN.render(vals)
+    region        = REGION_COLUMN.render(vals)
+    hasEmojis     = emojis.complete
     regionName    =  '{}'.format(vals[3].title()) if hasEmojis else ''
     if hasEmojis:
-        emojiResource = getEmoji(emojis, vals[4])
-        emojiTier     = getEmoji(emojis, '{}star'.format(vals[5]))
-        emojiRegion   = getEmoji(emojis, vals[3])
+        emojiResource = emojis.get(vals[4])
+        emojiTier     = emojis.get('{}star'.format(vals[5]))
+        emojiRegion   = emojis.get(vals[3])
 
 
     if hasEmojis and emojiResource:
@@ -949,16 +635,20 @@ def prepareResourceResults(emojis, vals):
     if hasEmojis and emojiTier:
         tier = emojiTier
 
-    # to keep things nice and tidy, format system name to be MIN 14 characters long
-    systemName = '`{}({})'.format(vals[1], vals[2])
-    i = len(vals[1])
-    while i < 14:
-        systemName += '.'
-        i += 1
-    systemName += '`'
+    systemName = SYSTEM_COLUMN.render(vals)
     return '{} {} {} {}{}\n'.format(str(resource), str(tier), systemName, region, regionName)
 
 
+#  emojis: An EmojiRegistry, or a list of discord Emoji objects
+# results: list of resource search results
+def getFormattedResourceResults(emojis, results):
+    emojis = getEmojiRegistry(emojis)
+    # without the server's STFC emojis every row is plain text
+    if not emojis.complete:
+        return renderTable(results, RESOURCE_COLUMNS)
+    return ''.join([prepareResourceResults(emojis, result) for result in results])
+
+
 #        args: a list of string search parameters
 # searchParam: The param to remove from args
 def removeSearchParam(args, searchParam):
@@ -1036,7 +726,7 @@ def getSelectedRoles(roles, reaction, roleSelection):
 def getSetupSummary(title, serverId, alliance, allianceId, manual, private, allyAcces, category,
                     memberRoles, ambassadorRoles, allyRoles, registerRoles, pvtRoles):
 
-    res = queryDatabase('SELECT AllianceID FROM Alliance WHERE ServerID={}'.format(serverId))
+    res = getAllianceIds(serverId)
 
     summary = '**{}**\n\nBelow is your server settings.\n\n'.format(title)
     summary += '**ALLIANCE:** {}\n'.format(alliance)
@@ -1046,7 +736,7 @@ def getSetupSummary(title, serverId, alliance, allianceId, manual, private, ally
     else:
         summary += '**ALLIANCE-IDS:**\n'
         for id in res:
-            summary += '× {}\n'.format(id[0])
+            summary += '× {}\n'.format(id)
         summary += '\n'
 
     if manual:
@@ -1105,18 +795,16 @@ def getSetupSummary(title, serverId, alliance, allianceId, manual, private, ally
 #   serverId: discord server id, integer
 # allianceId: an alliance acronym, 4 letter string
 def determineFirstTimeSetup(serverId, allianceId):
-    sql = 'SELECT AllianceID FROM Alliance WHERE ServerID={} AND SubAlliance=0'.format(serverId)
-    alliancesExist = queryDatabase(sql)
-    sql = 'SELECT AllianceID FROM Alliance WHERE ServerID={} AND AllianceID="{}"'.format(serverId, allianceId)
-    thisAllianceExists = queryDatabase(sql)
+    settings = getGuildSettings(serverId)
 
     # Not first time set up if server is registered and this alliance id is not
-    if len(alliancesExist) and not len(thisAllianceExists):
-        return alliancesExist[0][0]
+    if settings.masterAllianceId and allianceId not in settings.alliances:
+        return settings.masterAllianceId
     return None
 
 
 # completely wipe the database,a nd recreate tables
 def databaseReset():
-    resetAllianceDatabase()
-    createAllianceTables()
+    with transaction():
+        resetAllianceDatabase()
+        createAllianceTables()
@@ -0,0 +1,82 @@
+import threading
+from collections import OrderedDict
+from utils.db import onWrite, inTransaction
+
+
+class GuildCache:
+    """Bounded LRU of per-guild snapshots, invalidated by utils.db writes.
+
+    loader(serverId) builds the snapshot of a guild from the given tables, and
+    every write to one of those tables drops the snapshot of the guild it touched
+    once the write commits. A per-guild generation counter keeps a load that
+    raced with such a write from caching what it read before the write. Reads
+    made inside a transaction can see its uncommitted writes, so they bypass the
+    cache altogether.
+    """
+
+    def __init__(self, loader, tables, size):
+        self.loader = loader
+        self.tables = tables
+        self.size = size
+        self._cache = OrderedDict()
+        self._generations = {}
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    def get(self, serverId):
+        """Cached snapshot of a guild, loading it from the database on a miss."""
+        if inTransaction():
+            return self.loader(serverId)
+
+        with self._lock:
+            snapshot = self._cache.get(serverId)
+            if snapshot is not None:
+                self._cache.move_to_end(serverId)
+                self._stats['hits'] += 1
+                return snapshot
+            self._stats['misses'] += 1
+            generation = (self._epoch, self._generations.get(serverId, 0))
+
+        snapshot = self.loader(serverId)
+
+        with self._lock:
+            if generation == (self._epoch, self._generations.get(serverId, 0)):
+                self._cache[serverId] = snapshot
+                self._cache.move_to_end(serverId)
+                if len(self._cache) > self.size:
+                    self._cache.popitem(last=False)
+                    self._stats['evictions'] += 1
+        return snapshot
+
+    def invalidate(self, serverId=None):
+        """Drop one guild's snapshot, or every snapshot when serverId is None."""
+        with self._lock:
+            self._stats['invalidations'] += 1
+            if serverId is None:
+                self._cache.clear()
+                self._generations.clear()
+                self._epoch += 1
+            else:
+                self._cache.pop(serverId, None)
+                self._generations[serverId] = self._generations.get(serverId, 0) + 1
+
+    def onWrite(self, table, serverId):
+        if table is None or table in self.tables:
+            self.invalidate(serverId)
+
+    def stats(self):
+        """Return hit, miss and eviction counts of the cache."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._cache)
+        total = stats['hits'] + stats['misses']
+        stats['hitRatio'] = (stats['hits'] / total) if total else 0.0
+        return stats
+
+
+def guildCache(loader, tables, size):
+    """Create a GuildCache and subscribe it to database writes."""
+    cache = GuildCache(loader, tables, size)
+    onWrite(cache.onWrite)
+    return cache
@@ -0,0 +1,113 @@
+import os
+from collections import OrderedDict
+from utils.db import fetchNamed
+from utils.guild_cache import guildCache
+
+# Most guilds whose settings are kept in memory at once
+GUILD_SETTINGS_CACHE_SIZE = int(os.getenv('GUILD_SETTINGS_CACHE_SIZE', '256'))
+
+# Tables a GuildSettings snapshot is built from
+SETTINGS_TABLES = ('Server', 'Alliance', 'AllianceRolePermissions')
+
+# Role permission bits, one per permission column of AllianceRolePermissions
+MEMBER = 1
+AMBASSADOR = 2
+ALLY = 4
+ADMIN = 8
+ACCESS_AMBASSADOR_CHANNELS = 16
+
+# Permission bits in the column order of the guildRoles query
+ROLE_PERMISSIONS = (MEMBER, AMBASSADOR, ALLY, ADMIN, ACCESS_AMBASSADOR_CHANNELS)
+
+
+class GuildSettings:
+    """Read-only snapshot of one guild's configuration.
+
+    Holds the Server row, every registered alliance with its master/sub flag and
+    the permissions of every configured role, so the settings getters in
+    utils/functions.py can answer without touching SQLite.
+
+    Role permissions are compiled into a bitmask per role and, for every
+    permission bit, the set of lowercased role names that have it. Checking a
+    member's roles is then one set intersection.
+    """
+
+    def __init__(self, serverId, server, alliances, roles):
+        self.serverId = serverId
+        self.registered = server is not None
+        server = server or (None,) * 7
+        self.allianceName = server[0]
+        self.manualRegister = server[1]
+        self.createChannel = server[2]
+        self.channelCategory = server[3]
+        self.allowAllyIntelAccess = server[4]
+        self.warPointsChannelId = server[5]
+        self.liveBoardMessageId = server[6]
+
+        # AllianceID -> SubAlliance, in the order the alliances were saved
+        self.alliances = OrderedDict((r[0], r[1]) for r in alliances)
+        # Role name as saved -> permission bitmask
+        self.roles = OrderedDict()
+        for r in roles:
+            mask = 0
+            for bit, granted in zip(ROLE_PERMISSIONS, r[1:]):
+                if granted:
+                    mask |= bit
+            self.roles[r[0]] = mask
+
+        # Permission bit -> lowercased names of the roles that have it
+        self.roleIndex = {
+            bit: frozenset(role.lower() for role, mask in self.roles.items() if mask & bit)
+            for bit in ROLE_PERMISSIONS
+        }
+
+    @property
+    def allianceIds(self):
+        return list(self.alliances)
+
+    @property
+    def masterAllianceId(self):
+        for allianceId, subAlliance in self.alliances.items():
+            if subAlliance == 0:
+                return allianceId
+        return None
+
+    def hasAlliance(self, allianceId):
+        """Case insensitive check for a registered alliance."""
+        return any(a.lower() == allianceId.lower() for a in self.alliances)
+
+    def rolesWith(self, permission):
+        """Names of the roles, as saved, that have a permission bit."""
+        return [role for role, mask in self.roles.items() if mask & permission]
+
+    def rolesMatching(self, permissions, roleNames):
+        """The given role names that have any of the permission bits."""
+        granted = frozenset()
+        for bit in ROLE_PERMISSIONS:
+            if permissions & bit:
+                granted |= self.roleIndex[bit]
+        return granted & {name.lower() for name in roleNames}
+
+    def hasPermission(self, permissions, roleNames):
+        """Whether any of the given role names has any of the permission bits."""
+        return bool(self.rolesMatching(permissions, roleNames))
+
+
+def loadGuildSettings(serverId):
+    """Build the settings snapshot of a guild from the database."""
+    server = fetchNamed('guildServer', (serverId,))
+    alliances = fetchNamed('guildAlliances', (serverId,))
+    roles = fetchNamed('guildRoles', (serverId,))
+    return GuildSettings(serverId, server[0] if server else None, alliances, roles)
+
+
+settingsCache = guildCache(loadGuildSettings, SETTINGS_TABLES, GUILD_SETTINGS_CACHE_SIZE)
+
+
+def getGuildSettings(serverId):
+    """Get the cached settings snapshot of a guild."""
+    return settingsCache.get(serverId)
+
+def getGuildSettingsStats():
+    """Get hit/miss statistics for the guild settings cache."""
+    return settingsCache.stats()
@@ -0,0 +1,106 @@
+import os
+import threading
+from utils.db import fetchNamed
+from utils.guild_cache import guildCache
+from utils.queries import INTEL_FLAGS
+
+# Most guilds whose intel is kept in memory at once
+INTEL_CACHE_SIZE = int(os.getenv('INTEL_CACHE_SIZE', '128'))
+
+# Tables an IntelSnapshot is built from
+INTEL_TABLES = ('AllianceIntelligence', 'GeneralAllianceInfo')
+
+# Columns of the generalInfo query, by the keys the intel and setup commands use
+GENERAL_INFO = ('home', 'roe', 'ally', 'nap', 'cog', 'kos', 'war')
+
+# Parts of a snapshot that can be loaded
+STANDINGS = 'standings'
+GENERAL = 'general'
+
+
+class IntelSnapshot:
+    """Alliance intel of one guild, loaded lazily part by part.
+
+    The standings part comes from a single AllianceIntelligence scan grouped by
+    flag, the general part from the GeneralAllianceInfo row. Each part is read
+    the first time it is needed, so a command only pays for what it renders.
+    Call load() from a database thread for the parts a command will use.
+    """
+
+    def __init__(self, serverId):
+        self.serverId = serverId
+        self._lock = threading.Lock()
+        self._standings = None
+        self._intelCount = 0
+        self._general = None
+
+    def load(self, *parts):
+        """Read the given parts from the database, unless already loaded."""
+        with self._lock:
+            if STANDINGS in parts and self._standings is None:
+                rows = fetchNamed('intelStandings', (self.serverId,))
+                standings = {flag: [] for flag in INTEL_FLAGS}
+                for row in rows:
+                    for flag, value in zip(INTEL_FLAGS, row[1:]):
+                        if value == 1:
+                            standings[flag].append(row[0])
+                self._intelCount = len(rows)
+                self._standings = standings
+            if GENERAL in parts and self._general is None:
+                rows = fetchNamed('generalInfo', (self.serverId,))
+                self._general = dict(zip(GENERAL_INFO, rows[0])) if rows else {}
+        return self
+
+    @property
+    def standings(self):
+        """Intel flag -> alliance ids that have it, e.g. standings['AoA']."""
+        return self.load(STANDINGS)._standings
+
+    @property
+    def general(self):
+        """General alliance info keyed by GENERAL_INFO, empty when none was saved."""
+        return self.load(GENERAL)._general
+
+    @property
+    def hasIntel(self):
+        return self.load(STANDINGS)._intelCount
+
+    @property
+    def hasGeneralInfo(self):
+        return len(self.general) > 0
+
+    def generalInfo(self, key):
+        """One general info text, '' when none was saved."""
+        return self.general.get(key, '')
+
+    def intelList(self, flag):
+        """Alliance ids with an intel flag as 'A, B, ', '' when there are none."""
+        return ''.join('{}, '.format(a) for a in self.standings[flag])
+
+    def descriptions(self):
+        """General info texts keyed by GENERAL_INFO."""
+        return {key: self.generalInfo(key) for key in GENERAL_INFO}
+
+    def intelLists(self):
+        """Formatted intel lists keyed the way the intel command uses them."""
+        return {
+            "aoa": self.intelList('AoA'),
+            "nap": self.intelList('NAP'),
+            "playerKos": self.intelList('PlayerKos'),
+            "allianceKos": self.intelList('AllianceKos'),
+            "galacticKos": self.intelList('GalacticKos'),
+            "war": self.intelList('War'),
+            "cog": self.intelList('COGNAP')
+        }
+
+
+intelCache = guildCache(IntelSnapshot, INTEL_TABLES, INTEL_CACHE_SIZE)
+
+
+def getIntelSnapshot(serverId, *parts):
+    """Get the cached intel snapshot of a guild, with the given parts loaded."""
+    return intelCache.get(serverId).load(*parts)
+
+def getIntelCacheStats():
+    """Get hit/miss statistics for the intel snapshot cache."""
+    return intelCache.stats()
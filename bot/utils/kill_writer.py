@@ -0,0 +1,185 @@
+import asyncio
+import os
+import time
+from utils.async_db import db
+from utils.db import saveKills, transaction
+from utils.leaderboard import leaderboards
+from utils.screenshots import claimScreenshot
+
+# Most kill reports written in one transaction
+KILL_BATCH_SIZE = int(os.getenv('KILL_BATCH_SIZE', '200'))
+# How long the writer waits for more reports after the first one of a batch
+KILL_FLUSH_MS = int(os.getenv('KILL_FLUSH_MS', '250'))
+
+
+class DuplicateScreenshot(Exception):
+    """Raised by KillWriter.record when every screenshot of a kill was recorded before."""
+
+    def __init__(self, claim):
+        self.playerId, self.messageId, self.channelId = claim
+        super().__init__('screenshot already recorded for {}'.format(self.playerId))
+
+
+class KillReport:
+    """One recorded kill, waiting in the queue for the writer."""
+
+    def __init__(self, serverId, playerId, playerName, allianceId, kills=1, messageId=None, createdAt=None,
+                 screenshots=(), channelId=None):
+        self.serverId = serverId
+        self.playerId = playerId
+        self.playerName = playerName
+        self.allianceId = allianceId
+        self.kills = kills
+        self.messageId = messageId
+        self.createdAt = time.time() if createdAt is None else createdAt
+        self.screenshots = screenshots
+        self.channelId = channelId
+        self.done = asyncio.get_running_loop().create_future()
+
+
+def saveKillReports(batch):
+    """Claim the screenshots of a batch of kill reports and save its kills, in one transaction.
+
+    A report whose screenshots were all claimed before is a duplicate and not
+    counted. Returns (kills, counts, duplicates): the coalesced kills as passed
+    to saveKills, their new kill counts, and {index in batch: first claim}.
+    """
+    kills = {}
+    events = []
+    duplicates = {}
+    with transaction():
+        for i, r in enumerate(batch):
+            claims = [claimScreenshot(r.serverId, fingerprint, r.playerId, r.messageId, r.channelId, r.createdAt)
+                      for fingerprint in r.screenshots]
+            if claims and all(claims):
+                duplicates[i] = claims[0]
+                continue
+
+            # coalesce the reports of each player into one upsert
+            key = (r.serverId, r.playerId)
+            n = kills[key][4] + r.kills if key in kills else r.kills
+            kills[key] = (r.serverId, r.playerId, r.playerName, r.allianceId, n)
+            events.append((r.serverId, r.playerId, r.allianceId, r.kills, r.createdAt, r.messageId))
+        counts = saveKills(list(kills.values()), events) if kills else {}
+    return kills, counts, duplicates
+
+
+class KillWriter:
+    """Background task that writes kill reports to the database in batches.
+
+    Reports are queued by the war cog and picked up by a single writer task.
+    Reports that arrive close together are coalesced per player and written as
+    one transaction of KillCount = KillCount + n upserts, so a burst of
+    screenshots costs one commit instead of one per screenshot. Every report
+    is also appended to the kill event log, and its screenshots claimed, in the
+    same transaction. Awaiting
+    record() returns the player's new kill count once their batch committed.
+    """
+
+    def __init__(self, batchSize=KILL_BATCH_SIZE, flushMs=KILL_FLUSH_MS):
+        self.batchSize = batchSize
+        self.flushMs = flushMs
+        self._queue = None
+        self._task = None
+        self._closing = False
+        self._stats = {'reports': 0, 'batches': 0, 'rows': 0}
+
+    def start(self):
+        """Start the writer task on the running event loop, or restart it when it exited."""
+        if self._task is None or self._task.done():
+            if self._task is not None and not self._task.cancelled() and self._task.exception():
+                print(f"Kill writer stopped, restarting it: {self._task.exception()}")
+            if self._queue is None:
+                self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def record(self, serverId, playerId, playerName, allianceId, kills=1, messageId=None, createdAt=None,
+                     screenshots=(), channelId=None):
+        """Queue a kill report and wait until it is written. Returns the new kill count.
+
+        messageId and createdAt (unix epoch seconds, default now) are kept in the kill event log.
+        screenshots are the fingerprints of the kill's screenshots, claimed together with the
+        kill; raises DuplicateScreenshot when all of them were claimed before.
+        """
+        if self._closing:
+            raise RuntimeError('kill writer is shut down')
+        self.start()
+        report = KillReport(serverId, playerId, playerName, allianceId, kills, messageId, createdAt,
+                            screenshots, channelId)
+        self._queue.put_nowait(report)
+        return await report.done
+
+    async def _run(self):
+        while True:
+            report = await self._queue.get()
+            if report is None:
+                return
+            batch = [report]
+
+            # let a burst build up, then take everything queued so far
+            if self.flushMs and not self._closing:
+                await asyncio.sleep(self.flushMs / 1000)
+            stop = False
+            while len(batch) < self.batchSize and not self._queue.empty():
+                report = self._queue.get_nowait()
+                if report is None:
+                    stop = True
+                    break
+                batch.append(report)
+
+            try:
+                await self._write(batch)
+            except Exception as e:
+                print(f"Error writing kill reports: {e}")
+                self._fail(batch, e)
+            if stop:
+                return
+
+    def _fail(self, batch, e):
+        for report in batch:
+            if not report.done.done():
+                report.done.set_exception(e)
+
+    async def _write(self, batch):
+        try:
+            kills, counts, duplicates = await db.run(saveKillReports, batch)
+        except Exception as e:
+            print(f"Error saving kill reports: {e}")
+            self._fail(batch, e)
+            return
+
+        # the kills are committed, their reports are answered even if the leaderboards fail
+        try:
+            self._stats['reports'] += len(batch)
+            self._stats['batches'] += 1
+            self._stats['rows'] += len(kills)
+            for (serverId, playerId), (_, _, playerName, allianceId, _) in kills.items():
+                if (serverId, playerId) in counts:
+                    leaderboards.record(serverId, playerId, playerName, allianceId, counts[(serverId, playerId)])
+        except Exception as e:
+            print(f"Error updating leaderboards: {e}")
+        finally:
+            for i, report in enumerate(batch):
+                if report.done.done():
+                    continue
+                if i in duplicates:
+                    report.done.set_exception(DuplicateScreenshot(duplicates[i]))
+                else:
+                    report.done.set_result(counts.get((report.serverId, report.playerId)))
+
+    async def close(self):
+        """Write every queued report, then stop the writer task."""
+        self._closing = True
+        if self._task is not None:
+            self._queue.put_nowait(None)
+            await self._task
+            self._task = None
+
+    def stats(self):
+        """Return how many reports were written in how many batches."""
+        stats = dict(self._stats)
+        stats['queued'] = self._queue.qsize() if self._queue else 0
+        return stats
+
+
+killWriter = KillWriter()
@@ -0,0 +1,145 @@
+import asyncio
+from bisect import bisect_left, insort
+from utils.async_db import db
+from utils.db import fetchNamed, onWrite
+
+
+class Leaderboard:
+    """Kill counts of one guild, kept sorted for ranking.
+
+    Players are kept in a sorted list of (-kills, playerId) keys, one for the
+    whole guild and one per alliance tag, next to running kill totals, so
+    pages, ranks and totals never need the database once the board is loaded.
+    Looking up a rank is a binary search, O(log n). Updating a player finds
+    its keys by binary search too, but removing and inserting them shifts the
+    list, O(n) per update; for a guild's few hundred players that is one short
+    memmove.
+    """
+
+    def __init__(self, rows=()):
+        self._players = {}
+        self._keys = []
+        self._allianceKeys = {}
+        self._allianceTotals = {}
+        self.total = 0
+        for allianceId, playerId, playerName, killCount in rows:
+            # rows written before player IDs were stored cannot be ranked
+            if playerId is not None:
+                self.set(playerId, playerName, allianceId, killCount or 0)
+
+    def set(self, playerId, playerName, allianceId, kills):
+        """Set a player's kill count, name and alliance tag."""
+        playerId = str(playerId)
+        old = self._players.get(playerId)
+        if old is not None:
+            oldKills, _, oldAlliance = old
+            self._remove(self._keys, (-oldKills, playerId))
+            self._remove(self._allianceKeys[oldAlliance], (-oldKills, playerId))
+            self._allianceTotals[oldAlliance] -= oldKills
+            self.total -= oldKills
+
+        self._players[playerId] = (kills, playerName, allianceId)
+        insort(self._keys, (-kills, playerId))
+        insort(self._allianceKeys.setdefault(allianceId, []), (-kills, playerId))
+        self._allianceTotals[allianceId] = self._allianceTotals.get(allianceId, 0) + kills
+        self.total += kills
+
+    @staticmethod
+    def _remove(keys, key):
+        idx = bisect_left(keys, key)
+        if idx < len(keys) and keys[idx] == key:
+            keys.pop(idx)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def allianceTotal(self, allianceId):
+        return self._allianceTotals.get(allianceId, 0)
+
+    def count(self, allianceId=''):
+        """Number of ranked players, of one alliance tag when given."""
+        return len(self._allianceKeys.get(allianceId, ())) if allianceId else len(self._keys)
+
+    def rows(self, allianceId='', start=0, end=None):
+        """(AllianceID, PlayerName, KillCount) rows by kill count, like getMemberKillCounts."""
+        keys = self._allianceKeys.get(allianceId, []) if allianceId else self._keys
+        result = []
+        for _, playerId in keys[start:end]:
+            kills, playerName, playerAlliance = self._players[playerId]
+            result.append((playerAlliance, playerName, kills))
+        return result
+
+    def player(self, playerId):
+        """(kills, rank) of a player, or None when they have no kills yet.
+
+        Players with the same kill count share a rank.
+        """
+        entry = self._players.get(str(playerId))
+        if entry is None:
+            return None
+        return entry[0], bisect_left(self._keys, (-entry[0],)) + 1
+
+
+class Leaderboards:
+    """Per-guild leaderboards, loaded from AllianceMember on first use.
+
+    The kill writer reports every player's new total after its batch commits.
+    Other writes to AllianceMember, such as deleting a server's data, drop the
+    guild's board so it is reloaded. All boards are owned by the event loop.
+    """
+
+    def __init__(self):
+        self._boards = {}
+        self._loading = {}
+        self._generations = {}
+        self._loop = None
+
+    async def get(self, serverId):
+        """The leaderboard of a guild, loading it on first use."""
+        self._loop = asyncio.get_running_loop()
+        board = self._boards.get(serverId)
+        if board is not None:
+            return board
+        if serverId not in self._loading:
+            self._loading[serverId] = self._loop.create_task(self._load(serverId))
+        return await asyncio.shield(self._loading[serverId])
+
+    async def _load(self, serverId):
+        try:
+            while True:
+                generation = self._generations.get(serverId, 0)
+                rows = await db.run(fetchNamed, 'leaderboard', (serverId,))
+                if generation == self._generations.get(serverId, 0):
+                    break
+            board = self._boards[serverId] = Leaderboard(rows)
+            return board
+        finally:
+            del self._loading[serverId]
+
+    def record(self, serverId, playerId, playerName, allianceId, kills):
+        """Apply a player's committed kill count to a loaded board."""
+        board = self._boards.get(serverId)
+        if board is not None:
+            board.set(playerId, playerName, allianceId, kills)
+        else:
+            # a board being loaded may have read the count before it changed
+            self._generations[serverId] = self._generations.get(serverId, 0) + 1
+
+    def invalidate(self, serverId=None):
+        """Drop one guild's board, or every board when serverId is None."""
+        if serverId is None:
+            self._boards.clear()
+            for loading in self._loading:
+                self._generations[loading] = self._generations.get(loading, 0) + 1
+        else:
+            self._boards.pop(serverId, None)
+            self._generations[serverId] = self._generations.get(serverId, 0) + 1
+
+    def onWrite(self, table, serverId):
+        # called on a database thread, boards belong to the event loop
+        if self._loop is not None and not self._loop.is_closed() and (table is None or table == 'AllianceMember'):
+            self._loop.call_soon_threadsafe(self.invalidate, serverId)
+
+
+leaderboards = Leaderboards()
+onWrite(leaderboards.onWrite)
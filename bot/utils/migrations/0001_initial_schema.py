@@ -0,0 +1,120 @@
+# Initial schema: the tables created by createAllianceTables before migrations existed.
+# Uses IF NOT EXISTS so databases created by older versions adopt it unchanged.
+
+
+def upgrade(conn):
+    cursor = conn.cursor()
+
+    # Server table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Server (
+            ServerID INTEGER PRIMARY KEY,
+            AllianceName TEXT,
+            ManualRegister INTEGER DEFAULT 0,
+            CreateChannel INTEGER DEFAULT 0,
+            ChannelCategory TEXT,
+            WarPointsChannel TEXT,
+            AllowAllyIntelAccess INTEGER DEFAULT 0
+        )
+    ''')
+
+    # Alliance table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Alliance (
+            ServerID INTEGER,
+            AllianceID TEXT,
+            SubAlliance INTEGER DEFAULT 0,
+            PRIMARY KEY (ServerID, AllianceID)
+        )
+    ''')
+
+    # Alliance Role Permissions table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS AllianceRolePermissions (
+            ServerID INTEGER,
+            Role TEXT,
+            MemberRole INTEGER DEFAULT 0,
+            AmbassadorRole INTEGER DEFAULT 0,
+            AllyRole INTEGER DEFAULT 0,
+            AdminRole INTEGER DEFAULT 0,
+            AccessAmbassadorChannels INTEGER DEFAULT 0,
+            PRIMARY KEY (ServerID, Role)
+        )
+    ''')
+
+    # Alliance Member table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS AllianceMember (
+            ServerID INTEGER,
+            AllianceID TEXT,
+            PlayerID TEXT,
+            PlayerName TEXT,
+            KillCount INTEGER DEFAULT 0,
+            PRIMARY KEY (ServerID, PlayerID)
+        )
+    ''')
+
+    # Alliance Intelligence table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS AllianceIntelligence (
+            ServerID INTEGER,
+            AllianceID TEXT,
+            AoA INTEGER DEFAULT 0,
+            COGNAP INTEGER DEFAULT 0,
+            PlayerKos INTEGER DEFAULT 0,
+            GalacticKos INTEGER DEFAULT 0,
+            AllianceKos INTEGER DEFAULT 0,
+            NAP INTEGER DEFAULT 0,
+            War INTEGER DEFAULT 0,
+            PRIMARY KEY (ServerID, AllianceID)
+        )
+    ''')
+
+    # Player Intelligence table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS PlayerIntelligence (
+            ServerID INTEGER,
+            PlayerName TEXT,
+            PlayerAlliance TEXT,
+            LastUpdate TEXT,
+            PRIMARY KEY (ServerID, PlayerName)
+        )
+    ''')
+
+    # General Alliance Info table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS GeneralAllianceInfo (
+            ServerID INTEGER PRIMARY KEY,
+            HomeInfo TEXT,
+            RoeRules TEXT,
+            AlliesInfo TEXT,
+            NAPInfo TEXT,
+            COGInfo TEXT,
+            KosInfo TEXT,
+            WarInfo TEXT
+        )
+    ''')
+
+    # ROE (Rules of Engagement) table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ROE (
+            ServerID INTEGER,
+            AllianceID TEXT,
+            PlayerName TEXT,
+            Violations INTEGER DEFAULT 1,
+            LastUpdated TEXT,
+            PRIMARY KEY (ServerID, AllianceID, PlayerName)
+        )
+    ''')
+
+    # Resources table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Resources (
+            Resource TEXT,
+            Tier INTEGER,
+            System TEXT,
+            Region TEXT,
+            ReliabilityScore INTEGER DEFAULT 0,
+            PRIMARY KEY (Resource, Tier, System)
+        )
+    ''')
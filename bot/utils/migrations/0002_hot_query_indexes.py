@@ -0,0 +1,22 @@
+# Secondary indexes for the hot query paths.
+from utils.queries import INTEL_FLAGS
+
+
+def upgrade(conn):
+    cursor = conn.cursor()
+
+    # getKillCount looks players up without a ServerID
+    cursor.execute('CREATE INDEX IF NOT EXISTS IdxAllianceMemberPlayer ON AllianceMember (PlayerID)')
+
+    # kill count leaderboards per server
+    cursor.execute('CREATE INDEX IF NOT EXISTS IdxAllianceMemberKills ON AllianceMember (ServerID, KillCount DESC)')
+
+    # ROE clean up scans violations per server by date
+    cursor.execute('CREATE INDEX IF NOT EXISTS IdxRoeUpdated ON ROE (ServerID, LastUpdated)')
+
+    # resources search filters by region and tier
+    cursor.execute('CREATE INDEX IF NOT EXISTS IdxResourcesRegionTier ON Resources (Region, Tier)')
+
+    # intel lists select one flag per server, e.g. all allies of a server
+    for flag in INTEL_FLAGS:
+        cursor.execute('CREATE INDEX IF NOT EXISTS IdxIntel{0} ON AllianceIntelligence (ServerID, {0})'.format(flag))
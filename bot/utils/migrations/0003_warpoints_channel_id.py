@@ -0,0 +1,9 @@
+# Store the warpoints channel by Discord channel ID. WarPointsChannel keeps the
+# channel name; rows saved before this migration only have the name and get
+# their ID filled in once the bot sees the guild again.
+
+
+def upgrade(conn):
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(Server)')]
+    if 'WarPointsChannelID' not in columns:
+        conn.execute('ALTER TABLE Server ADD COLUMN WarPointsChannelID INTEGER')
@@ -0,0 +1,35 @@
+# Append-only log of recorded kills, with hourly and daily rollups kept up to
+# date by the kill writer so windowed leaderboards never scan raw events.
+# Timestamps and buckets are unix epoch seconds, buckets are UTC hour/day starts.
+
+
+def upgrade(conn):
+    cursor = conn.cursor()
+
+    # KillEvent table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS KillEvent (
+            EventID INTEGER PRIMARY KEY,
+            ServerID INTEGER,
+            PlayerID TEXT,
+            AllianceID TEXT,
+            Kills INTEGER DEFAULT 1,
+            CreatedAt INTEGER,
+            MessageID INTEGER
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS IdxKillEventCreated ON KillEvent (ServerID, CreatedAt)')
+
+    # Rollup tables, one row per guild, bucket and player
+    for table in ('KillRollupHourly', 'KillRollupDaily'):
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS {0} (
+                ServerID INTEGER,
+                Bucket INTEGER,
+                PlayerID TEXT,
+                AllianceID TEXT,
+                Kills INTEGER DEFAULT 0,
+                PRIMARY KEY (ServerID, Bucket, PlayerID)
+            )
+        '''.format(table))
+        cursor.execute('CREATE INDEX IF NOT EXISTS Idx{0}Alliance ON {0} (ServerID, AllianceID, Bucket)'.format(table))
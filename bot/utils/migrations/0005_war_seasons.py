@@ -0,0 +1,43 @@
+# War seasons. Server.WarSeason is the guild's current season and every
+# AllianceMember row remembers the season its KillCount belongs to, so starting
+# a season is one UPDATE: counts of earlier seasons are ignored by the
+# leaderboard queries and restart from zero on the player's next kill. Ended
+# seasons are archived in WarSeasonStanding, summarized in WarSeason.
+
+
+def upgrade(conn):
+    cursor = conn.cursor()
+
+    columns = [row[1] for row in cursor.execute('PRAGMA table_info(Server)')]
+    if 'WarSeason' not in columns:
+        cursor.execute('ALTER TABLE Server ADD COLUMN WarSeason INTEGER DEFAULT 1')
+
+    columns = [row[1] for row in cursor.execute('PRAGMA table_info(AllianceMember)')]
+    if 'Season' not in columns:
+        cursor.execute('ALTER TABLE AllianceMember ADD COLUMN Season INTEGER DEFAULT 1')
+
+    # WarSeason table, one row per ended season
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS WarSeason (
+            ServerID INTEGER,
+            Season INTEGER,
+            EndedAt INTEGER,
+            Players INTEGER DEFAULT 0,
+            Kills INTEGER DEFAULT 0,
+            PRIMARY KEY (ServerID, Season)
+        )
+    ''')
+
+    # WarSeasonStanding table, final kill counts of ended seasons
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS WarSeasonStanding (
+            ServerID INTEGER,
+            Season INTEGER,
+            PlayerID TEXT,
+            AllianceID TEXT,
+            PlayerName TEXT,
+            KillCount INTEGER,
+            PRIMARY KEY (ServerID, Season, PlayerID)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS IdxWarSeasonStandingKills ON WarSeasonStanding (ServerID, Season, KillCount DESC)')
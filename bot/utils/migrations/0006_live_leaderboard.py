@@ -0,0 +1,8 @@
+# Message ID of the live leaderboard pinned in a guild's warpoints channel,
+# NULL when the guild has none.
+
+
+def upgrade(conn):
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(Server)')]
+    if 'LiveBoardMessageID' not in columns:
+        conn.execute('ALTER TABLE Server ADD COLUMN LiveBoardMessageID INTEGER')
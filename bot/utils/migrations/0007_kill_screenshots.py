@@ -0,0 +1,28 @@
+# Fingerprints of the screenshots kills were recorded for, so the same
+# screenshot is only counted once per guild. Exact fingerprints are looked up
+# by the primary key. A difference hash is also split into four 16 bit bands,
+# each indexed: two hashes at most 3 bits apart share at least one band, so
+# near duplicates are found by probing the band indexes instead of a scan.
+
+
+def upgrade(conn):
+    cursor = conn.cursor()
+
+    # KillScreenshot table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS KillScreenshot (
+            ServerID INTEGER,
+            Hash TEXT,
+            Band0 INTEGER,
+            Band1 INTEGER,
+            Band2 INTEGER,
+            Band3 INTEGER,
+            PlayerID TEXT,
+            MessageID INTEGER,
+            ChannelID INTEGER,
+            CreatedAt INTEGER,
+            PRIMARY KEY (ServerID, Hash)
+        )
+    ''')
+    for band in range(4):
+        cursor.execute('CREATE INDEX IF NOT EXISTS IdxKillScreenshotBand{0} ON KillScreenshot (ServerID, Band{0})'.format(band))
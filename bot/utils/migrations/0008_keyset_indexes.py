@@ -0,0 +1,21 @@
+# Indexes in the order the paged listings read them, so every page is one
+# index range scan that starts right after the previous page's last row.
+# Within equal keys an index is ordered by rowid, which makes rowid the
+# tie breaker of the keyset cursors.
+
+
+def upgrade(conn):
+    cursor = conn.cursor()
+
+    # .intel ROE violations, in the order violations were first recorded
+    cursor.execute('CREATE INDEX IF NOT EXISTS IdxRoeServer ON ROE (ServerID)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS IdxRoeAlliance ON ROE (ServerID, AllianceID)')
+
+    # .intel on players, by alliance and most recently updated first
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS IdxPlayerIntelList
+        ON PlayerIntelligence (ServerID, IFNULL(PlayerAlliance, ''), IFNULL(LastUpdate, '') DESC, PlayerName)
+    ''')
+
+    # .warpoints season <n> <TAG>
+    cursor.execute('CREATE INDEX IF NOT EXISTS IdxWarSeasonStandingAlliance ON WarSeasonStanding (ServerID, Season, AllianceID, KillCount DESC)')
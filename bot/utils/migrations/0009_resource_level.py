@@ -0,0 +1,8 @@
+# Level of the system a resource was found in, which .addresource asks for.
+# NULL for resources saved before it was stored.
+
+
+def upgrade(conn):
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(Resources)')]
+    if 'Level' not in columns:
+        conn.execute('ALTER TABLE Resources ADD COLUMN Level INTEGER')
@@ -0,0 +1,58 @@
+import datetime
+import importlib
+import os
+import re
+from utils.db import transaction
+
+# Migration files live next to this module and are named NNNN_description.py.
+# Each one defines upgrade(conn), which receives the connection of the
+# transaction it runs in. A migration is applied once, in version order, and
+# recorded in the schema_version table.
+MIGRATION_FILE = re.compile(r'^(\d{4})_(\w+)\.py$')
+
+
+def getMigrations():
+    """List (version, name) of every migration file, in the order they apply."""
+    migrations = []
+    for filename in os.listdir(os.path.dirname(__file__)):
+        match = MIGRATION_FILE.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), filename[:-3]))
+    return sorted(migrations)
+
+
+def getSchemaVersion():
+    """Highest migration version applied to the database, 0 if none."""
+    with transaction() as conn:
+        _createVersionTable(conn)
+        res = conn.execute('SELECT MAX(Version) FROM schema_version').fetchall()
+    return res[0][0] or 0
+
+
+def runMigrations():
+    """Apply every migration that has not run yet. Each one commits atomically."""
+    with transaction() as conn:
+        _createVersionTable(conn)
+        applied = {r[0] for r in conn.execute('SELECT Version FROM schema_version')}
+
+    for version, name in getMigrations():
+        if version in applied:
+            continue
+        module = importlib.import_module('{}.{}'.format(__name__, name))
+        with transaction() as conn:
+            module.upgrade(conn)
+            conn.execute(
+                'INSERT INTO schema_version (Version, Name, AppliedAt) VALUES (?, ?, ?)',
+                (version, name, datetime.datetime.now().isoformat(sep=' ', timespec='seconds'))
+            )
+        print(f"Applied database migration {name}")
+
+
+def _createVersionTable(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            Version INTEGER PRIMARY KEY,
+            Name TEXT,
+            AppliedAt TEXT
+        )
+    ''')
@@ -0,0 +1,46 @@
+import os
+import re
+from functools import lru_cache
+
+# Display names whose parse result is remembered
+NICKNAME_CACHE_SIZE = int(os.getenv('NICKNAME_CACHE_SIZE', '4096'))
+
+# Alliance tag used when a member's names carry none
+UNKNOWN_TAG = '???'
+
+# A leading alliance tag in [TAG], (TAG), <TAG> or {TAG} brackets, followed by
+# the player name with or without a space: "[TAG] name", "(TAG)name", ...
+_TAGGED_NAME = re.compile(r'''
+    ^\s*
+    (?:
+        \[ \s* (?P<square>[^\[\]]+?) \s* \]
+      | \( \s* (?P<round>[^()]+?) \s* \)
+      | <  \s* (?P<angle>[^<>]+?) \s* >
+      | \{ \s* (?P<curly>[^{}]+?) \s* \}
+    )
+    \s* (?P<name>.*?) \s*$
+''', re.VERBOSE)
+
+
+@lru_cache(maxsize=NICKNAME_CACHE_SIZE)
+def parseNickname(displayName):
+    """Split a display name into (tag, name), or None when it has no alliance tag."""
+    if not displayName:
+        return None
+    match = _TAGGED_NAME.match(displayName)
+    if match is None:
+        return None
+    tag = match.group('square') or match.group('round') or match.group('angle') or match.group('curly')
+    return tag, match.group('name')
+
+
+def parseMember(member):
+    """(tag, name) of a discord member, from their nickname or else their user name.
+
+    Falls back to (UNKNOWN_TAG, user name) when neither carries a tag.
+    """
+    for displayName in (member.nick, member.name):
+        parsed = parseNickname(displayName)
+        if parsed and parsed[1]:
+            return parsed
+    return UNKNOWN_TAG, member.name
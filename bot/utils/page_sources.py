@@ -0,0 +1,57 @@
+import math
+from utils.db import fetchNamed
+
+# Rows shown per page by the paged listings
+PAGE_SIZE = 15
+
+
+class KeysetPages:
+    """Pages of a named query, read one page at a time with a keyset cursor.
+
+    Each listing has three statements in utils/queries.py: '<name>:count'
+    counts the rows, '<name>:first' reads the first page and '<name>:after'
+    reads the page after a cursor. Both page statements take the listing
+    params, then (for ':after') the cursor values, then the page size. The
+    cursor of a page is cursorOf(last row of the page before it), so only the
+    cursors of visited pages are kept, never the rows.
+
+    Methods query the database, call them from a database thread.
+    """
+
+    def __init__(self, name, params, cursorOf, perPage=PAGE_SIZE):
+        self.name = name
+        self.params = tuple(params)
+        self.cursorOf = cursorOf
+        self.perPage = perPage
+        self._count = None
+        self._cursors = {0: None}
+
+    def count(self):
+        """Number of rows, counted once per listing."""
+        if self._count is None:
+            res = fetchNamed(self.name + ':count', self.params)
+            self._count = res[0][0] if res else 0
+        return self._count
+
+    def pageCount(self):
+        return max(1, math.ceil(self.count() / self.perPage))
+
+    def fetch(self, page):
+        """Rows of one page, pages numbered from 0."""
+        # pages are flipped one at a time, a jump walks forward from the last known cursor
+        known = max(p for p in self._cursors if p <= page)
+        rows = self._read(known)
+        while known < page and rows:
+            known += 1
+            rows = self._read(known) if known in self._cursors else []
+        return rows if known == page else []
+
+    def _read(self, page):
+        cursor = self._cursors[page]
+        if cursor is None:
+            rows = fetchNamed(self.name + ':first', self.params + (self.perPage,))
+        else:
+            rows = fetchNamed(self.name + ':after', self.params + tuple(cursor) + (self.perPage,))
+        if len(rows) == self.perPage:
+            self._cursors[page + 1] = self.cursorOf(rows[-1])
+        return rows
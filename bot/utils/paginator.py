@@ -0,0 +1,170 @@
+import math
+from abc import ABC, abstractmethod
+import discord
+from utils.async_db import db
+
+# Seconds a paginator waits for the next button press
+PAGINATOR_TIMEOUT = 120.0
+
+# Footer of a paginator's last page once it stopped listening
+CLOSED_FOOTER = 'CONNECTION CLOSED: Session timed out'
+
+
+class PageSource(ABC):
+    """Where a Paginator gets its pages from.
+
+    Pages are numbered from 0 and fetched only when they are shown, so a
+    source can read its entries lazily.
+    """
+
+    @abstractmethod
+    async def pageCount(self):
+        """Number of pages, at least 1."""
+
+    @abstractmethod
+    async def getPage(self, page):
+        """Entries of one page."""
+
+    @abstractmethod
+    def formatPage(self, entries, page, pageCount):
+        """discord.Embed showing the entries of a page."""
+
+
+class ListPageSource(PageSource):
+    """Pages of a list, turned into embeds by formatter(entries, page, pageCount)."""
+
+    def __init__(self, entries, perPage, formatter):
+        self.entries = entries
+        self.perPage = perPage
+        self.formatter = formatter
+
+    async def pageCount(self):
+        return max(1, math.ceil(len(self.entries) / self.perPage))
+
+    async def getPage(self, page):
+        start = page * self.perPage
+        return self.entries[start:start + self.perPage]
+
+    def formatPage(self, entries, page, pageCount):
+        return self.formatter(entries, page, pageCount)
+
+
+class KeysetPageSource(PageSource):
+    """Pages of a utils.page_sources.KeysetPages listing, read from the database one page at a time.
+
+    Only the page being shown is held in memory, whatever the size of the listing.
+    """
+
+    def __init__(self, pages, formatter):
+        self.pages = pages
+        self.formatter = formatter
+
+    async def pageCount(self):
+        return await db.run(self.pages.pageCount)
+
+    async def getPage(self, page):
+        return await db.run(self.pages.fetch, page)
+
+    def formatPage(self, entries, page, pageCount):
+        return self.formatter(entries, page, pageCount)
+
+
+class LeaderboardPageSource(PageSource):
+    """Pages of a utils.leaderboard.Leaderboard, of one alliance tag when given.
+
+    Rows of a page are read from the shared board when the page is shown, so a
+    paging session holds no copy of the standings.
+    """
+
+    def __init__(self, board, alliance, perPage, formatter):
+        self.board = board
+        self.alliance = alliance
+        self.perPage = perPage
+        self.formatter = formatter
+
+    async def pageCount(self):
+        return max(1, math.ceil(self.board.count(self.alliance) / self.perPage))
+
+    async def getPage(self, page):
+        return self.board.rows(self.alliance, page * self.perPage, (page + 1) * self.perPage)
+
+    def formatPage(self, entries, page, pageCount):
+        return self.formatter(entries, page, pageCount)
+
+
+class Paginator(discord.ui.View):
+    """Shows a PageSource on one message, paged with buttons.
+
+    Only the member who ran the command can press the buttons. Each press is
+    answered with a single edit of the message, carrying the new page and the
+    updated buttons. When the view times out, one last edit disables the
+    buttons. Subclasses can add their own items and call show() from them.
+    """
+
+    def __init__(self, source, author, timeout=PAGINATOR_TIMEOUT, closedFooter=CLOSED_FOOTER):
+        super().__init__(timeout=timeout)
+        self.source = source
+        self.author = author
+        self.closedFooter = closedFooter
+        self.page = 0
+        self.pages = 1
+        self.embed = None
+        self.message = None
+
+    async def start(self, ctx):
+        """Send the first page. Results of a single page are sent without buttons."""
+        self.embed = await self.render()
+        if self.pages <= 1 and self.isPagingOnly():
+            self.stop()
+            self.message = await ctx.send(embed=self.embed)
+        else:
+            self.message = await ctx.send(embed=self.embed, view=self)
+        return self.message
+
+    def isPagingOnly(self):
+        return all(item in (self.prevPage, self.nextPage) for item in self.children)
+
+    async def render(self):
+        """Embed of the current page, with the buttons set up for it."""
+        self.pages = await self.source.pageCount()
+        self.page = max(0, min(self.page, self.pages - 1))
+        entries = await self.source.getPage(self.page)
+        self.prevPage.disabled = self.page == 0
+        self.nextPage.disabled = self.page >= self.pages - 1
+        return self.source.formatPage(entries, self.page, self.pages)
+
+    async def show(self, interaction, embed=None):
+        """Answer an interaction by editing the message to the current page, or to embed."""
+        self.embed = embed or await self.render()
+        await interaction.response.edit_message(embed=self.embed, view=self)
+
+    async def interaction_check(self, interaction):
+        if interaction.user.id == self.author.id:
+            return True
+        await interaction.response.send_message('Only {} can page these results.'.format(self.author.display_name), ephemeral=True)
+        return False
+
+    def closingFooter(self):
+        return self.closedFooter
+
+    async def on_timeout(self):
+        for item in self.children:
+            item.disabled = True
+        if self.message is None:
+            return
+        if self.embed is not None and self.closingFooter():
+            self.embed.set_footer(text=self.closingFooter())
+        try:
+            await self.message.edit(embed=self.embed, view=self)
+        except discord.HTTPException:
+            pass
+
+    @discord.ui.button(emoji='\N{LEFTWARDS BLACK ARROW}', style=discord.ButtonStyle.secondary)
+    async def prevPage(self, interaction, button):
+        self.page -= 1
+        await self.show(interaction)
+
+    @discord.ui.button(emoji='\N{BLACK RIGHTWARDS ARROW}', style=discord.ButtonStyle.secondary)
+    async def nextPage(self, interaction, button):
+        self.page += 1
+        await self.show(interaction)
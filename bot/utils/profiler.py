@@ -0,0 +1,165 @@
+import os
+import re
+import threading
+import time
+from collections import deque
+
+# Profiling can be switched off entirely, e.g. for benchmarks
+PROFILING = os.getenv('DATABASE_PROFILING', '1').lower() in ('1', 'true', 'yes')
+# Statements slower than this are written to the slow query log
+SLOW_QUERY_MS = float(os.getenv('DATABASE_SLOW_QUERY_MS', '100'))
+# Optional file the slow query log is appended to, on top of the console
+SLOW_QUERY_LOG = os.getenv('DATABASE_SLOW_QUERY_LOG', '')
+# Latest timings kept per statement to compute percentiles from
+PROFILE_SAMPLES = int(os.getenv('DATABASE_PROFILE_SAMPLES', '500'))
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_SPACE = re.compile(r'\s+')
+# "SCAN TABLE Alliance" on older SQLite, "SCAN Alliance" since 3.36; index scans say USING
+_FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)$')
+_EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'WITH')
+
+
+def normalizeStatement(sql):
+    """Reduce a statement to its shape: literals become ?, whitespace is collapsed."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('(?)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a sorted list."""
+    if not samples:
+        return 0.0
+    rank = max(0, min(len(samples) - 1, int(round(pct / 100 * len(samples))) - 1))
+    return samples[rank]
+
+
+class StatementStats:
+    """Timings of one normalized statement."""
+
+    def __init__(self, name, sql):
+        self.name = name
+        self.sql = sql
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.slow = 0
+        self.samples = deque(maxlen=PROFILE_SAMPLES)
+        self.explained = False
+        self.fullScans = []
+        self.plan = []
+
+    def summary(self):
+        samples = sorted(self.samples)
+        return {
+            'name': self.name,
+            'sql': self.sql,
+            'count': self.count,
+            'totalMs': self.total * 1000,
+            'maxMs': self.max * 1000,
+            'p50Ms': percentile(samples, 50) * 1000,
+            'p95Ms': percentile(samples, 95) * 1000,
+            'p99Ms': percentile(samples, 99) * 1000,
+            'slow': self.slow,
+            'fullScans': list(self.fullScans),
+            'plan': list(self.plan)
+        }
+
+
+class QueryProfiler:
+    """Collects per-statement latency for every query run through utils.db.
+
+    Statements are grouped by name when they come from utils/queries.py and by
+    their normalized SQL otherwise. Anything slower than SLOW_QUERY_MS goes to
+    the slow query log, and the first run of each statement is explained so
+    that full table scans can be reported alongside its timings.
+    """
+
+    def __init__(self, slowMs=SLOW_QUERY_MS, logPath=SLOW_QUERY_LOG, enabled=PROFILING):
+        self.slowMs = slowMs
+        self.logPath = logPath
+        self.enabled = enabled
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def execute(self, conn, sql, params=(), name=None, fetch=False):
+        """Run a statement on conn, timing it. Returns the rows when fetch is set."""
+        if not self.enabled:
+            cursor = conn.execute(sql, params)
+            return cursor.fetchall() if fetch else None
+
+        start = time.perf_counter()
+        cursor = conn.execute(sql, params)
+        rows = cursor.fetchall() if fetch else None
+        elapsed = time.perf_counter() - start
+
+        entry = self._record(name, sql, elapsed)
+        if not entry.explained:
+            self._explain(conn, entry, sql, params)
+        if elapsed * 1000 >= self.slowMs:
+            self._logSlow(entry, elapsed, params)
+        return rows
+
+    def _record(self, name, sql, elapsed):
+        key = name or normalizeStatement(sql)
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                entry = self._stats[key] = StatementStats(name or key, normalizeStatement(sql))
+            entry.count += 1
+            entry.total += elapsed
+            entry.max = max(entry.max, elapsed)
+            entry.samples.append(elapsed)
+            if elapsed * 1000 >= self.slowMs:
+                entry.slow += 1
+        return entry
+
+    def _explain(self, conn, entry, sql, params):
+        entry.explained = True
+        if not sql.lstrip().upper().startswith(_EXPLAINABLE):
+            return
+        try:
+            plan = [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params)]
+        except Exception as e:
+            print(f"Query plan error ({entry.name}): {e}")
+            return
+        scans = [m.group(1) for m in (_FULL_SCAN.match(step) for step in plan) if m]
+        with self._lock:
+            entry.plan = plan
+            entry.fullScans = scans
+        if scans:
+            print("Full table scan of {} in query {}: {}".format(', '.join(scans), entry.name, ' | '.join(plan)))
+
+    def _logSlow(self, entry, elapsed, params):
+        label = entry.sql if entry.name == entry.sql else '{} {}'.format(entry.name, entry.sql)
+        line = 'Slow query ({:.1f} ms): {} params={!r}'.format(elapsed * 1000, label, tuple(params))
+        print(line)
+        if self.logPath:
+            try:
+                with open(self.logPath, 'a') as log:
+                    log.write('{} {}\n'.format(time.strftime('%Y-%m-%d %H:%M:%S'), line))
+            except OSError as e:
+                print(f"Slow query log error: {e}")
+
+    def report(self, sortBy='totalMs', limit=10):
+        """Summaries of the most expensive statements, worst first."""
+        with self._lock:
+            summaries = [entry.summary() for entry in self._stats.values()]
+        summaries.sort(key=lambda s: s[sortBy], reverse=True)
+        return summaries[:limit]
+
+    def fullScans(self):
+        """Summaries of every statement whose plan contains a full table scan."""
+        with self._lock:
+            return [entry.summary() for entry in self._stats.values() if entry.fullScans]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+profiler = QueryProfiler()
@@ -0,0 +1,268 @@
+# Named, parameterized SQL statements used by the helpers in utils/functions.py.
+# Each name always maps to the same SQL text, so every pooled connection prepares
+# a statement once and reuses it from its statement cache afterwards. Values are
+# always bound through "?" placeholders, never formatted into the SQL.
+
+
+# Flag columns of the AllianceIntelligence table
+INTEL_FLAGS = ['AoA', 'COGNAP', 'PlayerKos', 'GalacticKos', 'AllianceKos', 'NAP', 'War']
+
+
+QUERIES = {
+
+    # PLAYER INTELLIGENCE
+    'playerIntel': '''
+        SELECT *
+        FROM PlayerIntelligence
+        WHERE ServerID=?
+        AND PlayerName=?
+    ''',
+    'intelPlayers': '''
+        SELECT *
+        FROM PlayerIntelligence
+        WHERE ServerID=?
+        ORDER BY PlayerAlliance, LastUpdate DESC
+    ''',
+
+    # WAR
+    'warPointsChannels': '''
+        SELECT ServerID, WarPointsChannelID
+        FROM Server
+        WHERE WarPointsChannelID IS NOT NULL
+    ''',
+    'warPointsChannel': '''
+        SELECT WarPointsChannelID
+        FROM Server
+        WHERE ServerID=?
+    ''',
+    'legacyWarPointsChannels': '''
+        SELECT ServerID, WarPointsChannel
+        FROM Server
+        WHERE WarPointsChannelID IS NULL
+        AND WarPointsChannel IS NOT NULL
+        AND WarPointsChannel != ''
+    ''',
+    # kill counts only count in the season they were recorded in, see
+    # utils/migrations/0005_war_seasons.py
+    'totalKillCounts': '''
+        SELECT SUM(M.KillCount)
+        FROM AllianceMember AS M
+        LEFT JOIN Server AS S ON S.ServerID=M.ServerID
+        WHERE M.ServerID=?
+        AND M.Season=COALESCE(S.WarSeason, 1)
+    ''',
+    'memberKillCounts': '''
+        SELECT M.AllianceID, M.PlayerName, M.KillCount
+        FROM AllianceMember AS M
+        LEFT JOIN Server AS S ON S.ServerID=M.ServerID
+        WHERE M.ServerID=?
+        AND M.Season=COALESCE(S.WarSeason, 1)
+        ORDER BY M.KillCount desc
+    ''',
+    'allianceMemberKillCounts': '''
+        SELECT M.AllianceID, M.PlayerName, M.KillCount
+        FROM AllianceMember AS M
+        LEFT JOIN Server AS S ON S.ServerID=M.ServerID
+        WHERE M.ServerID=?
+        AND M.AllianceID=?
+        AND M.Season=COALESCE(S.WarSeason, 1)
+        ORDER BY M.KillCount desc
+    ''',
+    'killCount': '''
+        SELECT M.KillCount
+        FROM AllianceMember AS M
+        LEFT JOIN Server AS S ON S.ServerID=M.ServerID
+        WHERE M.PlayerID=?
+        AND M.Season=COALESCE(S.WarSeason, 1)
+    ''',
+    'leaderboard': '''
+        SELECT M.AllianceID, M.PlayerID, M.PlayerName, M.KillCount
+        FROM AllianceMember AS M
+        LEFT JOIN Server AS S ON S.ServerID=M.ServerID
+        WHERE M.ServerID=?
+        AND M.Season=COALESCE(S.WarSeason, 1)
+    ''',
+    'memberKillCount': '''
+        SELECT KillCount
+        FROM AllianceMember
+        WHERE ServerID=?
+        AND PlayerID=?
+    ''',
+
+    'killScreenshot': '''
+        SELECT Hash, PlayerID, MessageID, ChannelID
+        FROM KillScreenshot
+        WHERE ServerID=?
+        AND Hash=?
+    ''',
+    'similarScreenshots': '''
+        SELECT Hash, PlayerID, MessageID, ChannelID
+        FROM KillScreenshot
+        WHERE ServerID=?
+        AND (Band0=? OR Band1=? OR Band2=? OR Band3=?)
+    ''',
+
+    # WAR SEASONS
+    'warSeason': '''
+        SELECT COALESCE(MAX(WarSeason), 1)
+        FROM Server
+        WHERE ServerID=?
+    ''',
+    'seasonKills': '''
+        SELECT Kills
+        FROM WarSeason
+        WHERE ServerID=?
+        AND Season=?
+    ''',
+    'allianceSeasonKills': '''
+        SELECT COALESCE(SUM(KillCount), 0)
+        FROM WarSeasonStanding
+        WHERE ServerID=?
+        AND Season=?
+        AND AllianceID=?
+    ''',
+    'warSeasons': '''
+        SELECT Season, EndedAt, Players, Kills
+        FROM WarSeason
+        WHERE ServerID=?
+        ORDER BY Season desc
+    ''',
+
+    # ROE
+    'roeDates': '''
+        SELECT LastUpdated, AllianceID, PlayerName
+        FROM ROE
+        WHERE ServerID=?
+    ''',
+    'roeViolations': '''
+        SELECT AllianceID, Violations, PlayerName
+        FROM ROE
+        WHERE ServerID=?
+    ''',
+    'allianceRoeViolations': '''
+        SELECT AllianceID, Violations, PlayerName
+        FROM ROE
+        WHERE ServerID=?
+        AND AllianceID=?
+    ''',
+
+    # ALLIANCE INTELLIGENCE
+    'intelStandings': '''
+        SELECT AllianceID, {}
+        FROM AllianceIntelligence
+        WHERE ServerID=?
+    '''.format(', '.join(INTEL_FLAGS)),
+    'generalInfo': '''
+        SELECT HomeInfo, RoeRules, AlliesInfo, NAPInfo, COGInfo, KosInfo, WarInfo
+        FROM GeneralAllianceInfo
+        WHERE ServerID=?
+    ''',
+
+    # RESOURCES
+    'resourceReliability': '''
+        SELECT ReliabilityScore
+        FROM Resources
+        WHERE Resource=?
+        AND LOWER(System)=?
+    ''',
+    'resourceReliabilityTier': '''
+        SELECT ReliabilityScore
+        FROM Resources
+        WHERE Resource=?
+        AND LOWER(System)=?
+        AND Tier=?
+    ''',
+
+    # SERVER AND ALLIANCE SETTINGS
+    'settings': '''
+        SELECT S.AllianceName, S.CreateChannel, S.ChannelCategory, R.Role, R.MemberRole, R.AmbassadorRole, R.AllyRole, R.AdminRole, R.AccessAmbassadorChannels, S.AllowAllyIntelAccess
+        FROM Server AS S
+        JOIN AllianceRolePermissions As R ON S.ServerID=R.ServerID
+        WHERE S.ServerID=?
+    ''',
+
+    # GUILD SETTINGS SNAPSHOT, see utils/guild_settings.py
+    'guildServer': '''
+        SELECT AllianceName, ManualRegister, CreateChannel, ChannelCategory, AllowAllyIntelAccess, WarPointsChannelID, LiveBoardMessageID
+        FROM Server
+        WHERE ServerID=?
+    ''',
+    'guildAlliances': '''
+        SELECT AllianceID, SubAlliance
+        FROM Alliance
+        WHERE ServerID=?
+    ''',
+    'guildRoles': '''
+        SELECT Role, MemberRole, AmbassadorRole, AllyRole, AdminRole, AccessAmbassadorChannels
+        FROM AllianceRolePermissions
+        WHERE ServerID=?
+    ''',
+    # every resource in the order the resources search shows them, see utils/resource_index.py
+    'resources': '''
+        SELECT * FROM Resources
+        ORDER BY Resource == 'dilithium', Resource, Tier DESC, Region, System
+    ''',
+    # the resources matching a compiled SearchFilter, see SearchFilter.sqlParams
+    'resourceSearch': '''
+        SELECT * FROM Resources
+        WHERE (?1 IS NULL OR Resource IN (SELECT value FROM json_each(?1)))
+        AND Resource NOT IN (SELECT value FROM json_each(?2))
+        AND (?3 IS NULL OR Tier IN (SELECT value FROM json_each(?3)))
+        AND (?4 IS NULL OR Region IN (SELECT value FROM json_each(?4)))
+        AND Region NOT IN (SELECT value FROM json_each(?5))
+        AND (?6 IS NULL OR Level >= ?6)
+        AND (?7 IS NULL OR Level <= ?7)
+        ORDER BY Resource == 'dilithium', Resource, Tier DESC, Region, System
+    ''',
+}
+
+
+# Kill rollup tables by bucket size, see utils/migrations/0004_kill_events.py
+KILL_ROLLUPS = {'hourly': 'KillRollupHourly', 'daily': 'KillRollupDaily'}
+
+# Windowed leaderboards and kill trends, e.g. 'windowKills:daily', 'killTrend:hourly:alliance'.
+# Rows are (AllianceID, PlayerName, KillCount) like memberKillCounts, and (Bucket, Kills)
+for _size, _table in KILL_ROLLUPS.items():
+    for _alliance in ('', ' AND R.AllianceID=?'):
+        _suffix = ':alliance' if _alliance else ''
+        QUERIES['windowKills:' + _size + _suffix] = '''
+            SELECT COALESCE(M.AllianceID, R.AllianceID), COALESCE(M.PlayerName, R.PlayerID), SUM(R.Kills)
+            FROM {} AS R
+            LEFT JOIN AllianceMember AS M ON M.ServerID=R.ServerID AND M.PlayerID=R.PlayerID
+            WHERE R.ServerID=? AND R.Bucket>=?{}
+            GROUP BY R.PlayerID
+            ORDER BY 3 DESC
+        '''.format(_table, _alliance)
+        QUERIES['killTrend:' + _size + _suffix] = '''
+            SELECT R.Bucket, SUM(R.Kills)
+            FROM {} AS R
+            WHERE R.ServerID=? AND R.Bucket>=?{}
+            GROUP BY R.Bucket
+            ORDER BY R.Bucket
+        '''.format(_table, _alliance)
+
+
+# Paged listings read with keyset cursors, see utils/page_sources.py:
+# (name, columns, table, filter, cursor condition, order). A cursor condition
+# starts with a range on its first key, so the index is entered at the cursor.
+KEYSET_LISTINGS = [
+    ('roeViolationPages', 'AllianceID, Violations, PlayerName, rowid', 'ROE',
+     'ServerID=?', 'rowid>?', 'rowid'),
+    ('allianceRoeViolationPages', 'AllianceID, Violations, PlayerName, rowid', 'ROE',
+     'ServerID=? AND AllianceID=?', 'rowid>?', 'rowid'),
+    ('intelPlayerPages', '*', 'PlayerIntelligence',
+     'ServerID=?',
+     "IFNULL(PlayerAlliance, '')>=? AND (IFNULL(PlayerAlliance, '')>? OR (IFNULL(PlayerAlliance, '')=? AND "
+     "(IFNULL(LastUpdate, '')<? OR (IFNULL(LastUpdate, '')=? AND PlayerName>?))))",
+     "IFNULL(PlayerAlliance, ''), IFNULL(LastUpdate, '') DESC, PlayerName"),
+    ('seasonStandingPages', 'AllianceID, PlayerName, KillCount, rowid', 'WarSeasonStanding',
+     'ServerID=? AND Season=?', 'KillCount<=? AND (KillCount<? OR (KillCount=? AND rowid>?))', 'KillCount DESC, rowid'),
+    ('allianceSeasonStandingPages', 'AllianceID, PlayerName, KillCount, rowid', 'WarSeasonStanding',
+     'ServerID=? AND Season=? AND AllianceID=?', 'KillCount<=? AND (KillCount<? OR (KillCount=? AND rowid>?))', 'KillCount DESC, rowid'),
+]
+
+for _name, _columns, _table, _where, _after, _order in KEYSET_LISTINGS:
+    QUERIES[_name + ':count'] = 'SELECT COUNT(*) FROM {} WHERE {}'.format(_table, _where)
+    QUERIES[_name + ':first'] = 'SELECT {} FROM {} WHERE {} ORDER BY {} LIMIT ?'.format(_columns, _table, _where, _order)
+    QUERIES[_name + ':after'] = 'SELECT {} FROM {} WHERE {} AND {} ORDER BY {} LIMIT ?'.format(
+        _columns, _table, _where, _after, _order)
@@ -0,0 +1,118 @@
+import threading
+from utils.db import fetchNamed, onWrite, inTransaction
+
+# Filters of the resources search, with the Resources column each one matches
+RESOURCE_FILTERS = (('resource', 0), ('tier', 1), ('region', 3))
+# Column of the system level, see utils/migrations/0009_resource_level.py
+LEVEL_COLUMN = 5
+
+
+class ResourceIndex:
+    """Every row of the Resources table, indexed for the resources search.
+
+    Rows are kept in the order the search shows them. Every resource, tier and
+    region value has a bitset of the rows that have it, bit i standing for row
+    i, so a compiled SearchFilter is a few integer ORs and ANDs and the
+    matching rows come out already in display order.
+    """
+
+    def __init__(self, rows):
+        self.rows = tuple(rows)
+        self.all = (1 << len(self.rows)) - 1
+        self.postings = {name: {} for name, _ in RESOURCE_FILTERS}
+        for i, row in enumerate(self.rows):
+            for name, column in RESOURCE_FILTERS:
+                values = self.postings[name]
+                values[row[column]] = values.get(row[column], 0) | (1 << i)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def any(self, name, values):
+        """Bitset of the rows whose name column has one of values."""
+        postings = self.postings[name]
+        match = 0
+        for value in values:
+            match |= postings.get(value, 0)
+        return match
+
+    def search(self, searchFilter):
+        """Rows passing a compiled SearchFilter, in display order."""
+        match = self.all
+        if searchFilter.resources:
+            match &= self.any('resource', searchFilter.resources)
+        if searchFilter.notResources:
+            match &= ~self.any('resource', searchFilter.notResources)
+        if searchFilter.tiers is not None:
+            match &= self.any('tier', searchFilter.tiers)
+        if searchFilter.regions:
+            match &= self.any('region', searchFilter.regions)
+        if searchFilter.notRegions:
+            match &= ~self.any('region', searchFilter.notRegions)
+
+        if match == self.all:
+            result = list(self.rows)
+        else:
+            result = []
+            while match:
+                low = match & -match
+                result.append(self.rows[low.bit_length() - 1])
+                match ^= low
+        # system levels are bounds rather than values, they are checked row by row
+        if searchFilter.minLevel is not None or searchFilter.maxLevel is not None:
+            result = [row for row in result if searchFilter.levelMatches(row[LEVEL_COLUMN])]
+        return result
+
+
+class ResourceIndexCache:
+    """The current ResourceIndex, rebuilt after every write to Resources.
+
+    Resources is global and read-mostly: the index is loaded on first use and
+    dropped once a write to the table commits, so the next search reloads it.
+    A generation counter keeps a load that raced with a write from keeping what
+    it read before the write, and reads inside a transaction bypass the index.
+    """
+
+    def __init__(self):
+        self._index = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {'loads': 0, 'invalidations': 0}
+
+    def peek(self):
+        """The loaded index, or None when it has to be read from the database first."""
+        return self._index
+
+    def get(self):
+        """The index, loading it from the database when needed. Call from a database thread."""
+        if inTransaction():
+            return ResourceIndex(fetchNamed('resources'))
+
+        with self._lock:
+            while self._index is None:
+                generation = self._generation
+                index = ResourceIndex(fetchNamed('resources'))
+                self._stats['loads'] += 1
+                if generation == self._generation:
+                    self._index = index
+            return self._index
+
+    def invalidate(self):
+        self._index = None
+        self._generation += 1
+        self._stats['invalidations'] += 1
+
+    def onWrite(self, table, serverId):
+        if table is None or table == 'Resources':
+            self.invalidate()
+
+    def stats(self):
+        """Return how often the index was loaded and dropped, and its size."""
+        stats = dict(self._stats)
+        index = self._index
+        stats['rows'] = len(index) if index is not None else 0
+        return stats
+
+
+resourceIndex = ResourceIndexCache()
+onWrite(resourceIndex.onWrite)
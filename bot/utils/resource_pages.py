@@ -0,0 +1,159 @@
+import math
+import os
+import threading
+from collections import OrderedDict
+from utils.async_db import db
+from utils.db import onWrite
+from utils.emoji_registry import getEmojiRegistry
+from utils.functions import getFormattedResourceResults
+from utils.paginator import PageSource
+from utils.resource_index import resourceIndex
+
+# Most rendered resource pages kept in memory, across all guilds
+RESOURCE_PAGE_CACHE_SIZE = int(os.getenv('RESOURCE_PAGE_CACHE_SIZE', '512'))
+
+# Results on one page of the resources command
+RESOURCE_PAGE_SIZE = 15
+
+
+class ResourcePageCache:
+    """Bounded LRU of rendered resource search pages, shared by every guild.
+
+    Pages are keyed by (filter arguments, page, emoji fingerprint) and the
+    number of results by the filter arguments, so the same search run in any
+    guild with the same emojis is neither searched nor formatted again. Every
+    write to Resources clears the cache once it commits, and a guild changing
+    its emojis drops the pages rendered with its old ones. A generation
+    counter keeps a page rendered before such a write from being stored.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._pages = OrderedDict()
+        self._counts = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    @property
+    def generation(self):
+        """Bumped by every invalidation."""
+        return self._generation
+
+    def _get(self, entries, key):
+        with self._lock:
+            value = entries.get(key)
+            if value is None:
+                self._stats['misses'] += 1
+                return None
+            entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return value
+
+    def _put(self, entries, key, value, generation):
+        with self._lock:
+            if generation != self._generation:
+                return
+            entries[key] = value
+            entries.move_to_end(key)
+            if len(entries) > self.size:
+                entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def count(self, args):
+        """Number of results of a search, None when not cached."""
+        return self._get(self._counts, args)
+
+    def putCount(self, args, count, generation):
+        self._put(self._counts, args, count, generation)
+
+    def page(self, args, page, fingerprint):
+        """Rendered rows of a page, None when not cached."""
+        return self._get(self._pages, (args, page, fingerprint))
+
+    def putPage(self, args, page, fingerprint, text, generation):
+        self._put(self._pages, (args, page, fingerprint), text, generation)
+
+    def invalidate(self):
+        """Drop every page and count."""
+        with self._lock:
+            self._pages.clear()
+            self._counts.clear()
+            self._generation += 1
+            self._stats['invalidations'] += 1
+
+    def dropEmojis(self, fingerprint):
+        """Drop the pages rendered with a guild's old emojis."""
+        if fingerprint is None:
+            return
+        with self._lock:
+            for key in [key for key in self._pages if key[2] == fingerprint]:
+                del self._pages[key]
+
+    def onWrite(self, table, serverId):
+        if table is None or table == 'Resources':
+            self.invalidate()
+
+    def stats(self):
+        """Return hit/miss statistics and the number of cached pages."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['pages'] = len(self._pages)
+        total = stats['hits'] + stats['misses']
+        stats['hitRatio'] = (stats['hits'] / total) if total else 0.0
+        return stats
+
+
+resourcePages = ResourcePageCache(RESOURCE_PAGE_CACHE_SIZE)
+onWrite(resourcePages.onWrite)
+
+
+def getResourcePageStats():
+    """Get hit/miss statistics for the resource page cache."""
+    return resourcePages.stats()
+
+
+class ResourcePageSource(PageSource):
+    """Pages of a resources search, read from the shared page cache.
+
+    Entries of a page are its rendered rows. The search itself only runs when
+    a page or the result count is not cached, at most once per source.
+    """
+
+    def __init__(self, searchFilter, emojis, formatter, perPage=RESOURCE_PAGE_SIZE):
+        self.searchFilter = searchFilter
+        self.emojis = getEmojiRegistry(emojis)
+        self.fingerprint = self.emojis.fingerprint
+        self.formatter = formatter
+        self.perPage = perPage
+        self._results = None
+        self._generation = None
+
+    async def results(self):
+        if self._results is None:
+            # pages of results searched before a write to Resources are not cached
+            self._generation = resourcePages.generation
+            index = resourceIndex.peek() or await db.run(resourceIndex.get)
+            self._results = index.search(self.searchFilter)
+        return self._results
+
+    async def pageCount(self):
+        args = self.searchFilter.args
+        count = resourcePages.count(args)
+        if count is None:
+            count = len(await self.results())
+            resourcePages.putCount(args, count, self._generation)
+        return max(1, math.ceil(count / self.perPage))
+
+    async def getPage(self, page):
+        args = self.searchFilter.args
+        text = resourcePages.page(args, page, self.fingerprint)
+        if text is None:
+            results = await self.results()
+            start = page * self.perPage
+            text = getFormattedResourceResults(self.emojis, results[start:start + self.perPage])
+            resourcePages.putPage(args, page, self.fingerprint, text, self._generation)
+        return text
+
+    def formatPage(self, entries, page, pageCount):
+        return self.formatter(entries, page, pageCount)
@@ -0,0 +1,182 @@
+import asyncio
+import hashlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from utils.db import executeQuery, fetchNamed, transaction
+
+# Pillow is in requirements.txt. Without it screenshots are fingerprinted by
+# their bytes, which still catches the same file posted twice but not a
+# re-encoded copy
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+    print("Pillow is not installed, only byte-identical kill screenshots are caught as duplicates")
+
+# Whether kill screenshots are checked for duplicates at all
+SCREENSHOT_DEDUP = os.getenv('SCREENSHOT_DEDUP', '1').lower() in ('1', 'true', 'yes')
+# Most attachments downloaded at once, over all guilds
+SCREENSHOT_FETCH_CONCURRENCY = int(os.getenv('SCREENSHOT_FETCH_CONCURRENCY', '4'))
+# Attachments larger than this are not downloaded or fingerprinted
+SCREENSHOT_MAX_BYTES = int(os.getenv('SCREENSHOT_MAX_BYTES', str(8 * 1024 * 1024)))
+# Worker processes that hash screenshots
+SCREENSHOT_HASH_WORKERS = int(os.getenv('SCREENSHOT_HASH_WORKERS', '2'))
+# Most differing bits between two difference hashes of the same screenshot.
+# 0 only refuses identical fingerprints: kill reports share one layout, so two
+# different kills can hash a few bits apart. Capped at 3, the most the band
+# index finds every match for
+SCREENSHOT_HASH_DISTANCE = min(int(os.getenv('SCREENSHOT_HASH_DISTANCE', '0')), 3)
+# Directory that stands in for Discord's CDN when testing: attachments are read
+# from <directory>/<attachment filename> instead of being downloaded
+SCREENSHOT_SOURCE_DIR = os.getenv('SCREENSHOT_SOURCE_DIR')
+
+# File extensions treated as screenshots when an attachment has no content type
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.bmp')
+
+# Size of the grayscale thumbnail the difference hash compares, one bit per
+# horizontally adjacent pixel pair
+HASH_WIDTH = 9
+HASH_HEIGHT = 8
+
+
+def hashImage(data):
+    """Fingerprint of an image: 'd:' + its 64 bit difference hash, or 's:' + sha256 of the bytes.
+
+    The difference hash survives re-encoding and resizing of the same screenshot.
+    Bytes that Pillow cannot read, or any bytes without Pillow, get the sha256.
+    Runs in a worker process.
+    """
+    if Image is not None:
+        try:
+            with Image.open(io.BytesIO(data)) as img:
+                pixels = img.convert('L').resize((HASH_WIDTH, HASH_HEIGHT), Image.LANCZOS).tobytes()
+            bits = 0
+            for row in range(HASH_HEIGHT):
+                for col in range(HASH_WIDTH - 1):
+                    left = pixels[row * HASH_WIDTH + col]
+                    bits = (bits << 1) | (left > pixels[row * HASH_WIDTH + col + 1])
+            return 'd:{:016x}'.format(bits)
+        except Exception:
+            pass
+    return 's:' + hashlib.sha256(data).hexdigest()
+
+
+def hashBands(fingerprint):
+    """The four 16 bit bands of a difference hash, (None,) * 4 for a sha256 fingerprint."""
+    if not fingerprint.startswith('d:'):
+        return (None,) * 4
+    bits = int(fingerprint[2:], 16)
+    return tuple((bits >> shift) & 0xffff for shift in (48, 32, 16, 0))
+
+
+def hashDistance(a, b):
+    """Number of differing bits between two difference hashes."""
+    return bin(int(a[2:], 16) ^ int(b[2:], 16)).count('1')
+
+
+def claimScreenshot(serverId, fingerprint, playerId, messageId, channelId, createdAt):
+    """Record a kill screenshot unless the guild has seen it before.
+
+    A screenshot is seen when its fingerprint was recorded, or with
+    SCREENSHOT_HASH_DISTANCE above 0 one that close to it. Returns None when
+    the screenshot is new, else the (PlayerID, MessageID, ChannelID) it was
+    first recorded with. Called by the kill writer in the transaction that
+    counts the kill, so a screenshot is only claimed by a counted kill.
+    """
+    bands = hashBands(fingerprint)
+    with transaction():
+        res = fetchNamed('killScreenshot', (serverId, fingerprint))
+        if not res and bands[0] is not None and SCREENSHOT_HASH_DISTANCE:
+            res = [row for row in fetchNamed('similarScreenshots', (serverId,) + bands)
+                   if hashDistance(row[0], fingerprint) <= SCREENSHOT_HASH_DISTANCE]
+        if res:
+            return res[0][1:]
+
+        sql = '''
+            INSERT INTO KillScreenshot (ServerID, Hash, Band0, Band1, Band2, Band3, PlayerID, MessageID, ChannelID, CreatedAt)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        '''
+        executeQuery(sql, (serverId, fingerprint) + bands + (str(playerId), messageId, channelId, int(createdAt)))
+    return None
+
+
+def isImage(attachment):
+    contentType = getattr(attachment, 'content_type', None)
+    if contentType:
+        return contentType.startswith('image/')
+    return attachment.filename.lower().endswith(IMAGE_EXTENSIONS)
+
+
+class ScreenshotHasher:
+    """Downloads kill screenshots and fingerprints them off the event loop.
+
+    Downloads share one semaphore, so a burst of screenshots never has more
+    than SCREENSHOT_FETCH_CONCURRENCY requests to the CDN in flight. Hashing is
+    CPU work and runs in a process pool, the event loop only awaits it.
+    """
+
+    def __init__(self, concurrency=SCREENSHOT_FETCH_CONCURRENCY, workers=SCREENSHOT_HASH_WORKERS,
+                 sourceDir=SCREENSHOT_SOURCE_DIR, maxBytes=SCREENSHOT_MAX_BYTES):
+        self.concurrency = concurrency
+        self.workers = workers
+        self.sourceDir = sourceDir
+        self.maxBytes = maxBytes
+        self._fetching = None
+        self._pool = None
+        self._stats = {'fetched': 0, 'hashed': 0, 'skipped': 0, 'failed': 0}
+
+    async def fetch(self, attachment):
+        """Bytes of an attachment, read from the CDN or from sourceDir."""
+        if self._fetching is None:
+            self._fetching = asyncio.Semaphore(self.concurrency)
+        async with self._fetching:
+            if self.sourceDir:
+                path = os.path.join(self.sourceDir, os.path.basename(attachment.filename))
+                data = await asyncio.get_running_loop().run_in_executor(None, self._readFile, path)
+            else:
+                data = await attachment.read()
+        self._stats['fetched'] += 1
+        return data
+
+    @staticmethod
+    def _readFile(path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    async def hash(self, data):
+        """Fingerprint of image bytes, computed in the process pool."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        fingerprint = await asyncio.get_running_loop().run_in_executor(self._pool, hashImage, data)
+        self._stats['hashed'] += 1
+        return fingerprint
+
+    async def fingerprint(self, attachment):
+        """Fingerprint of a screenshot attachment, None when it is not an image or cannot be read."""
+        if not isImage(attachment) or (attachment.size or 0) > self.maxBytes:
+            self._stats['skipped'] += 1
+            return None
+        try:
+            return await self.hash(await self.fetch(attachment))
+        except Exception as e:
+            self._stats['failed'] += 1
+            print(f"Error fingerprinting screenshot {attachment.filename}: {e}")
+            return None
+
+    async def fingerprints(self, attachments):
+        """Fingerprints of a message's attachments, None for those that have none."""
+        return await asyncio.gather(*(self.fingerprint(a) for a in attachments))
+
+    def close(self):
+        """Stop the hashing processes."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self):
+        """Return how many screenshots were fetched, hashed, skipped and failed."""
+        return dict(self._stats)
+
+
+screenshots = ScreenshotHasher()
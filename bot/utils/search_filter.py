@@ -0,0 +1,184 @@
+import json
+import re
+from functools import lru_cache
+
+# Values the .resources filters understand
+RESOURCES = ('crystal', 'ore', 'gas', 'dilithium', 'latinum')
+REGIONS = ('federation', 'klingon', 'romulan', 'neutral')
+TIERS = (1, 2, 3, 4)
+
+# Most compiled filters kept, keyed by their normalized arguments
+FILTER_CACHE_SIZE = 256
+
+# 3, 3*, 3star, 3+ (3 and up), 3- (3 and below), 2-4
+BARE_TIER = re.compile(r'^([1-4])(?:\*|star)?([+-]?)$|^([1-4])-([1-4])$')
+# tier>=3, grade<4, level>=20, lvl=20-30
+COMPARISON = re.compile(r'^(tier|grade|level|lvl)(>=|<=|>|<|=)(\d+)(?:-(\d+))?$')
+
+
+def getBounds(op, low, high):
+    """(min, max) of a comparison, either can be None."""
+    if high is not None:
+        return (low, high) if op == '=' else (None, None)
+    return {
+        '>=': (low, None),
+        '>': (low + 1, None),
+        '<=': (None, low),
+        '<': (None, low - 1),
+        '=': (low, low),
+    }[op]
+
+
+class SearchFilter:
+    """A compiled .resources filter, built by compileFilter.
+
+    Arguments of the same kind are alternatives and exclusions subtract, so
+    "gas ore -neutral" is gas or ore outside neutral space. Tier and level
+    comparisons are bounds that all have to hold. Rows are matched with
+    matches() in memory or with the 'resourceSearch' query and sqlParams(),
+    and utils/resource_index.py answers them from its bitsets.
+    """
+
+    def __init__(self, args):
+        self.args = args
+        self.tokens = {'resource': [], 'tier': [], 'region': [], 'level': []}
+        self.ignored = []
+        resources, notResources = set(), set()
+        regions, notRegions = set(), set()
+        tiers, notTiers, tierBounds = set(), set(), set(TIERS)
+        minLevel = maxLevel = None
+
+        for arg in args:
+            negate = arg[0] in '-!' and len(arg) > 1
+            word = arg[1:] if negate else arg
+            if word in RESOURCES:
+                (notResources if negate else resources).add(word)
+                self.tokens['resource'].append(arg)
+                continue
+            if word in REGIONS:
+                (notRegions if negate else regions).add(word)
+                self.tokens['region'].append(arg)
+                continue
+
+            match = BARE_TIER.match(word)
+            if match:
+                if match.group(3):
+                    values = set(range(int(match.group(3)), int(match.group(4)) + 1))
+                else:
+                    tier = int(match.group(1))
+                    values = {t for t in TIERS if {'+': t >= tier, '-': t <= tier, '': t == tier}[match.group(2)]}
+                (notTiers if negate else tiers).update(values)
+                self.tokens['tier'].append(arg)
+                continue
+
+            match = COMPARISON.match(word)
+            low = high = None
+            if match:
+                high = int(match.group(4)) if match.group(4) else None
+                low, high = getBounds(match.group(2), int(match.group(3)), high)
+            if low is not None or high is not None:
+                if match.group(1) in ('tier', 'grade'):
+                    values = {t for t in TIERS if (low is None or t >= low) and (high is None or t <= high)}
+                    if negate:
+                        notTiers.update(values)
+                    else:
+                        tierBounds &= values
+                    self.tokens['tier'].append(arg)
+                    continue
+                # the opposite of a one sided level bound is the other side
+                if negate and (low is None) != (high is None):
+                    low, high = (None, low - 1) if high is None else (high + 1, None)
+                    negate = False
+                if not negate:
+                    minLevel = low if minLevel is None or (low is not None and low > minLevel) else minLevel
+                    maxLevel = high if maxLevel is None or (high is not None and high < maxLevel) else maxLevel
+                    self.tokens['level'].append(arg)
+                    continue
+
+            self.ignored.append(arg)
+
+        self.resources = frozenset(resources)
+        self.notResources = frozenset(notResources)
+        self.regions = frozenset(regions)
+        self.notRegions = frozenset(notRegions)
+        # None when no tier filter was given, so rows without a tier (dilithium) still match
+        self.tiers = frozenset(((tiers or set(TIERS)) & tierBounds) - notTiers) if self.tokens['tier'] else None
+        self.minLevel = minLevel
+        self.maxLevel = maxLevel
+
+    def __bool__(self):
+        return any(self.tokens.values())
+
+    def matches(self, row):
+        """Whether a Resources row (Resource, Tier, System, Region, ReliabilityScore, Level) passes the filter."""
+        resource, tier, region, level = row[0], row[1], row[3], row[5]
+        if (self.resources and resource not in self.resources) or resource in self.notResources:
+            return False
+        if (self.regions and region not in self.regions) or region in self.notRegions:
+            return False
+        if self.tiers is not None and tier not in self.tiers:
+            return False
+        return self.levelMatches(level)
+
+    def levelMatches(self, level):
+        if self.minLevel is None and self.maxLevel is None:
+            return True
+        return level is not None and (self.minLevel is None or level >= self.minLevel) and (self.maxLevel is None or level <= self.maxLevel)
+
+    def sqlParams(self):
+        """Parameters of the 'resourceSearch' query for this filter."""
+        def values(items):
+            return json.dumps(sorted(items)) if items else None
+        return (
+            values(self.resources), json.dumps(sorted(self.notResources)),
+            json.dumps(sorted(self.tiers)) if self.tiers is not None else None,
+            values(self.regions), json.dumps(sorted(self.notRegions)),
+            self.minLevel, self.maxLevel,
+        )
+
+    def selected(self, field):
+        """The value of a field when the filter picks exactly one, as the menus show it, else ''."""
+        tokens = self.tokens[field]
+        if len(tokens) != 1 or tokens[0][0] in '-!':
+            return ''
+        if field == 'tier':
+            return str(min(self.tiers)) if self.tiers and len(self.tiers) == 1 else ''
+        return tokens[0]
+
+    def withValue(self, field, value):
+        """The filter with every argument of a field replaced by value, or removed when value is ''."""
+        args = [a for f, tokens in self.tokens.items() if f != field for a in tokens] + self.ignored
+        return compileFilter(args + ([value] if value else []))
+
+    def describe(self):
+        """The footer text of the filter, e.g. 'FILTERS: "gas" "grade 3+" "not neutral"'."""
+        names = []
+        for field in ('resource', 'tier', 'region', 'level'):
+            for token in self.tokens[field]:
+                negate = token[0] in '-!'
+                word = token[1:] if negate else token
+                if field == 'tier' and BARE_TIER.match(word):
+                    word = 'grade {}'.format(word.replace('star', '').replace('*', ''))
+                names.append('"{}{}"'.format('not ' if negate else '', word))
+        footer = 'FILTERS: ' + (' '.join(names) if names else 'none')
+        if self.ignored:
+            footer += ' (ignored: {})'.format(' '.join(self.ignored))
+        return footer
+
+
+def normalizeArgs(args):
+    """Lower-cased, de-duplicated and sorted filter arguments, the key of the filter cache."""
+    return tuple(sorted({str(arg).strip().lower() for arg in args if str(arg).strip()}))
+
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def compileNormalized(args):
+    return SearchFilter(args)
+
+
+def compileFilter(args):
+    """Compile .resources arguments, e.g. ['gas', 'ore', '3+', '-neutral', 'level>=20'], into a SearchFilter.
+
+    Arguments are tokenized once per distinct argument set, compiled filters are cached.
+    """
+    return compileNormalized(normalizeArgs(args))
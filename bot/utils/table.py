@@ -0,0 +1,112 @@
+# Fixed-width text tables for embeds: every row is one line of padded cells,
+# e.g. `TEST.` `Kirk..............` `12`
+
+# Discord's limits on embed text
+EMBED_DESCRIPTION_LIMIT = 4096
+EMBED_FIELD_LIMIT = 1024
+EMBED_TOTAL_LIMIT = 6000
+EMBED_FIELD_COUNT_LIMIT = 25
+
+
+class Column:
+    """One column of a table.
+
+    value is the index of the cell in a row, or a function of the row giving
+    the cell. The cell text is padded with fill up to width characters; text
+    longer than width is kept whole. width can also be a function of the row,
+    or None to pad every cell to the widest one in the table.
+    The padded text is put between wrap, '`' for inline code by default.
+    """
+
+    def __init__(self, value, width=0, fill='.', wrap='`'):
+        self.value = value
+        self.width = width
+        self.fill = fill
+        self.wrap = wrap
+
+    def cells(self, rows):
+        """The rendered cells of this column, one per row."""
+        value, width, fill, wrap = self.value, self.width, self.fill, self.wrap
+        if callable(value):
+            texts = [str(value(row)) for row in rows]
+        else:
+            texts = [str(row[value]) for row in rows]
+        if width is None:
+            width = max(map(len, texts), default=0)
+
+        if callable(width):
+            widths = [width(row) for row in rows]
+            return [wrap + text.ljust(w, fill) + wrap for text, w in zip(texts, widths)]
+        return [wrap + text.ljust(width, fill) + wrap for text in texts]
+
+    def render(self, row):
+        """The rendered cell of one row."""
+        text = str(self.value(row) if callable(self.value) else row[self.value])
+        width = self.width(row) if callable(self.width) else self.width or 0
+        return self.wrap + text.ljust(width, self.fill) + self.wrap
+
+
+def renderLines(rows, columns, sep=' '):
+    """One rendered line per row.
+
+    Tables are rendered a column at a time, so every cell is padded once and
+    every line is put together with a single join.
+    """
+    if not isinstance(rows, (list, tuple)):
+        rows = list(rows)
+    return [sep.join(cells) for cells in zip(*[column.cells(rows) for column in columns])]
+
+
+def renderTable(rows, columns, sep=' '):
+    """The rows as one string, every line ending in a newline."""
+    lines = renderLines(rows, columns, sep)
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+def chunkLines(lines, limit=EMBED_DESCRIPTION_LIMIT, breakAt=', '):
+    """Join lines into as few strings of at most limit characters as possible.
+
+    Every line ends in a newline. A line that does not fit in what is left of
+    a chunk is broken after its last breakAt that fits, or cut when none does.
+    """
+    chunks = []
+    chunk = []
+    size = 0
+    for line in lines:
+        while True:
+            room = limit - size - 1
+            if len(line) <= room:
+                chunk.append(line + '\n')
+                size += len(line) + 1
+                break
+            cut = line.rfind(breakAt, 0, room - len(breakAt) + 1)
+            if cut > 0:
+                cut += len(breakAt)
+            elif not chunk:
+                cut = room
+            if cut > 0:
+                chunk.append(line[:cut].rstrip() + '\n')
+                line = line[cut:].lstrip()
+            chunks.append(''.join(chunk))
+            chunk = []
+            size = 0
+    if chunk:
+        chunks.append(''.join(chunk))
+    return chunks
+
+
+def addFieldChunks(embed, name, text, inline=False):
+    """Add text to an embed as one field, or as several when it is too long for one.
+
+    Fields that would take the embed over EMBED_TOTAL_LIMIT or
+    EMBED_FIELD_COUNT_LIMIT are left out and the last field says how many were.
+    """
+    chunks = chunkLines(text.split('\n'), EMBED_FIELD_LIMIT)
+    for i, chunk in enumerate(chunks):
+        fieldName = name if i == 0 else '{} (cont.)'.format(name)
+        # leave room for the note and for fields added after this one
+        if i and (len(embed) + len(fieldName) + len(chunk) > EMBED_TOTAL_LIMIT - 256
+                  or len(embed.fields) >= EMBED_FIELD_COUNT_LIMIT - 4):
+            embed.add_field(name=fieldName, value='*... {} more not shown*'.format(len(chunks) - i), inline=inline)
+            return
+        embed.add_field(name=fieldName, value=chunk.rstrip('\n') or '.', inline=inline)
@@ -0,0 +1,62 @@
+import threading
+from utils.db import fetchNamed, onWrite
+
+
+class WarPointsRegistry:
+    """In-memory map of guild ID to warpoints channel ID.
+
+    WarCog.on_message sees every message of every guild, so it checks this map
+    instead of the database: a message that is not in its guild's warpoints
+    channel is rejected with one dict lookup. The map is loaded once at startup
+    and reloaded for a guild whenever its Server row is written.
+    """
+
+    def __init__(self):
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Read every guild's warpoints channel from the database."""
+        channels = {serverId: channelId for serverId, channelId in fetchNamed('warPointsChannels')}
+        with self._lock:
+            self._channels = channels
+        return len(channels)
+
+    def reload(self, serverId):
+        """Re-read one guild's warpoints channel from the database."""
+        res = fetchNamed('warPointsChannel', (serverId,))
+        channelId = res[0][0] if res else None
+        with self._lock:
+            if channelId is None:
+                self._channels.pop(serverId, None)
+            else:
+                self._channels[serverId] = channelId
+
+    def get(self, serverId):
+        return self._channels.get(serverId)
+
+    def isWarChannel(self, serverId, channelId):
+        return self._channels.get(serverId) == channelId
+
+    def onWrite(self, table, serverId):
+        if table is None:
+            with self._lock:
+                self._channels = {}
+        elif table == 'Server':
+            if serverId is None:
+                self.load()
+            else:
+                self.reload(serverId)
+
+
+warChannels = WarPointsRegistry()
+onWrite(warChannels.onWrite)
+
+
+def loadWarPointsChannels():
+    """Load the warpoints channel registry, returns how many guilds have one."""
+    return warChannels.load()
+
+def getLegacyWarPointsChannels():
+    """(serverId, channel name) of warpoints channels saved before channel IDs were stored."""
+    return fetchNamed('legacyWarPointsChannels')